@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, dprs, evaluate, reports, risk, upload, users
+from app.api.v1.endpoints import auth, dprs, evaluate, jobs, reports, risk, upload, users
 
 api_router = APIRouter()
 
@@ -10,4 +10,5 @@ api_router.include_router(upload.router, prefix="/upload", tags=["Upload"])
 api_router.include_router(dprs.router, prefix="/dprs", tags=["DPRs"])
 api_router.include_router(evaluate.router, prefix="/evaluate", tags=["Evaluation"])
 api_router.include_router(risk.router, prefix="/risk", tags=["Risk"])
-api_router.include_router(reports.router, prefix="/reports", tags=["Reports"])
\ No newline at end of file
+api_router.include_router(reports.router, prefix="/reports", tags=["Reports"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
\ No newline at end of file
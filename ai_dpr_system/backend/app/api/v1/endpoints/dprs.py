@@ -1,47 +1,113 @@
-from typing import Any, List
+import mimetypes
+import os
+import re
+from datetime import datetime
+from typing import Any, List, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.core.auth import get_current_active_user
-from app.db.session import get_db
+from app.core.storage import get_file_size, stream_file_from_storage
+from app.db.session import get_async_db
 from app.models.dpr import DPR
+from app.models.evaluation import Evaluation
+from app.models.risk_assessment import RiskAssessment
 from app.schemas.dpr import DPRResponse
 from app.schemas.user import User
+from app.utils.cache import dashboard_cache
+from app.utils.file import content_disposition
+from app.utils.pagination import NEXT_CURSOR_HEADER, paginate, split_page
 
 router = APIRouter()
 
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Overall risk score bands (lower bound exclusive, upper bound inclusive),
+# matching the levels shown in the frontend
+RISK_BANDS = {
+    "low": (None, 33),
+    "medium": (33, 66),
+    "high": (66, None),
+}
+
 
 @router.get("/", response_model=List[DPRResponse])
 async def read_dprs(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    dpr_status: Optional[str] = Query(None, alias="status"),
+    uploaded_by: Optional[UUID] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    risk_band: Optional[str] = Query(None, pattern="^(low|medium|high)$"),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Retrieve DPRs
+    Retrieve DPRs, newest first
+    
+    Results are paginated with opaque cursors: pass the X-Next-Cursor
+    header of a response as `cursor` to get the next page (the header is
+    absent on the last page). `risk_band` filters on the latest risk
+    assessment of each DPR.
     """
+    query = select(DPR)
     # If user is admin or reviewer, they can see all DPRs
-    if current_user.is_admin or current_user.is_reviewer:
-        dprs = db.query(DPR).offset(skip).limit(limit).all()
-    else:
+    if not (current_user.is_admin or current_user.is_reviewer):
         # Regular users can only see their own DPRs
-        dprs = db.query(DPR).filter(DPR.uploaded_by == current_user.id).offset(skip).limit(limit).all()
+        query = query.where(DPR.uploaded_by == current_user.id)
+    
+    if dpr_status is not None:
+        query = query.where(DPR.status == dpr_status)
+    if uploaded_by is not None:
+        query = query.where(DPR.uploaded_by == uploaded_by)
+    if created_after is not None:
+        query = query.where(DPR.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(DPR.created_at < created_before)
+    if risk_band is not None:
+        latest_risk = (
+            select(RiskAssessment.overall_risk_score)
+            .where(RiskAssessment.dpr_id == DPR.id)
+            .order_by(RiskAssessment.created_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        lower, upper = RISK_BANDS[risk_band]
+        query = query.where(latest_risk.is_not(None))
+        if lower is not None:
+            query = query.where(latest_risk > lower)
+        if upper is not None:
+            query = query.where(latest_risk <= upper)
+    
+    try:
+        query = paginate(query, DPR, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
+    result = await db.execute(query)
+    dprs, next_cursor = split_page(result.scalars().all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return dprs
 
 
 @router.get("/{dpr_id}", response_model=DPRResponse)
 async def read_dpr(
     dpr_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
     Get a specific DPR by ID
     """
-    dpr = db.query(DPR).filter(DPR.id == dpr_id).first()
+    dpr = await db.scalar(select(DPR).where(DPR.id == dpr_id))
     
     if not dpr:
         raise HTTPException(
@@ -59,36 +125,129 @@ async def read_dpr(
     return dpr
 
 
+@router.get("/{dpr_id}/file")
+async def download_dpr_file(
+    dpr_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Download the file of a DPR
+
+    The file is streamed from storage in chunks. A single byte range can
+    be requested with the Range header (e.g. "bytes=0-1048575").
+    """
+    dpr = await db.scalar(select(DPR).where(DPR.id == dpr_id))
+    
+    if not dpr:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="DPR not found",
+        )
+    
+    # Check if user has permission to view this DPR
+    if not current_user.is_admin and not current_user.is_reviewer and dpr.uploaded_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    
+    size = await get_file_size(dpr.file_path)
+    if size is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="DPR file not found",
+        )
+    
+    file_name = os.path.basename(dpr.file_path)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition(file_name),
+    }
+    media_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+    
+    start, end = 0, size - 1
+    status_code = status.HTTP_200_OK
+    if range_header:
+        match = _RANGE_RE.match(range_header.strip())
+        first, last = match.groups() if match else ("", "")
+        if first:
+            start = int(first)
+            if last:
+                end = min(int(last), size - 1)
+        elif last:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(last))
+        if not (first or last) or start > end or start >= size:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Invalid or unsatisfiable range",
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        stream_file_from_storage(dpr.file_path, start, end),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
 @router.get("/dashboard/stats", response_model=dict)
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
     Get dashboard statistics
+    
+    Counts per status and the average compliance and risk scores come
+    from one grouped query, and are cached for DASHBOARD_CACHE_TTL
+    seconds (invalidated when a DPR is added, removed or changes status
+    and the change is committed).
     """
-    if current_user.is_admin or current_user.is_reviewer:
-        # Get stats for all DPRs for admins/reviewers
-        total_dprs = db.query(DPR).count()
-        pending_dprs = db.query(DPR).filter(DPR.status == "pending").count()
-        evaluated_dprs = db.query(DPR).filter(DPR.status == "evaluated").count()
-        risk_assessed_dprs = db.query(DPR).filter(DPR.status == "risk_assessed").count()
-    else:
-        # Get stats only for user's own DPRs
-        total_dprs = db.query(DPR).filter(DPR.uploaded_by == current_user.id).count()
-        pending_dprs = db.query(DPR).filter(
-            DPR.status == "pending", DPR.uploaded_by == current_user.id
-        ).count()
-        evaluated_dprs = db.query(DPR).filter(
-            DPR.status == "evaluated", DPR.uploaded_by == current_user.id
-        ).count()
-        risk_assessed_dprs = db.query(DPR).filter(
-            DPR.status == "risk_assessed", DPR.uploaded_by == current_user.id
-        ).count()
-    
-    return {
-        "total_dprs": total_dprs,
-        "pending_dprs": pending_dprs,
-        "evaluated_dprs": evaluated_dprs,
-        "risk_assessed_dprs": risk_assessed_dprs,
-    }
\ No newline at end of file
+    # Admins/reviewers see stats for all DPRs, other users for their own
+    see_all = current_user.is_admin or current_user.is_reviewer
+    cache_key = "all" if see_all else str(current_user.id)
+    stats = dashboard_cache.get(cache_key)
+    if stats is not None:
+        return stats
+    
+    owned = aliased(DPR)
+    avg_compliance = select(func.avg(Evaluation.compliance_score))
+    avg_risk = select(func.avg(RiskAssessment.overall_risk_score))
+    query = select(DPR.status, func.count(DPR.id))
+    if not see_all:
+        avg_compliance = avg_compliance.join(owned, Evaluation.dpr_id == owned.id).where(
+            owned.uploaded_by == current_user.id
+        )
+        avg_risk = avg_risk.join(owned, RiskAssessment.dpr_id == owned.id).where(
+            owned.uploaded_by == current_user.id
+        )
+        query = query.where(DPR.uploaded_by == current_user.id)
+    
+    result = await db.execute(
+        query.add_columns(avg_compliance.scalar_subquery(), avg_risk.scalar_subquery())
+        .group_by(DPR.status)
+    )
+    
+    status_counts = {}
+    avg_compliance_score = avg_risk_score = None
+    for dpr_status, count, avg_compliance_score, avg_risk_score in result.all():
+        status_counts[dpr_status or "unknown"] = count
+    
+    stats = {
+        "total_dprs": sum(status_counts.values()),
+        "pending_dprs": status_counts.get("pending", 0),
+        "evaluated_dprs": status_counts.get("evaluated", 0),
+        "risk_assessed_dprs": status_counts.get("risk_assessed", 0),
+        "status_counts": status_counts,
+        "avg_compliance_score": avg_compliance_score,
+        "avg_risk_score": avg_risk_score,
+    }
+    dashboard_cache.set(cache_key, stats)
+    return stats
\ No newline at end of file
@@ -1,30 +1,21 @@
-from typing import Any, Dict
+import asyncio
+from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_active_user
+from app.core.tasks import run_evaluation
 from app.db.session import get_db
-from app.ml.compliance import check_compliance
-from app.ml.extraction import extract_sections
-from app.ml.ocr import process_document
-from app.models.dpr import DPR
-from app.models.evaluation import Evaluation
-from app.schemas.evaluation import EvaluationCreate, EvaluationResponse
+from app.models.dpr import DPR, dpr as crud_dpr
+from app.models.evaluation import evaluation as crud_evaluation
+from app.schemas.evaluation import EvaluationResponse, EvaluationSummary
 from app.schemas.user import User
 
 router = APIRouter()
 
 
-@router.post("/{dpr_id}", response_model=EvaluationResponse)
-async def evaluate_dpr(
-    dpr_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-) -> Any:
-    """
-    Evaluate a DPR document for compliance and quality
-    """
+def _get_evaluable_dpr(db: Session, dpr_id: str, current_user: User) -> DPR:
     # Get the DPR from database
     dpr = db.query(DPR).filter(DPR.id == dpr_id).first()
     if not dpr:
@@ -40,36 +31,30 @@ async def evaluate_dpr(
             detail="Not enough permissions",
         )
     
+    return dpr
+
+
+@router.post("/{dpr_id}", response_model=EvaluationResponse)
+async def evaluate_dpr(
+    dpr_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Evaluate a DPR document for compliance and quality
+    
+    The evaluation awaits the document pipeline, so this stays async and
+    its database work runs in a worker thread.
+    """
+    dpr = await asyncio.to_thread(_get_evaluable_dpr, db, dpr_id, current_user)
+    
     try:
-        # Process the document with OCR if needed
-        text_content = await process_document(dpr.file_path)
-        
-        # Extract sections from the text content
-        sections = await extract_sections(text_content)
-        
-        # Check compliance against guidelines
-        compliance_results = await check_compliance(sections)
-        
-        # Create evaluation record
-        evaluation_in = EvaluationCreate(
-            dpr_id=dpr_id,
-            evaluated_by=current_user.id,
-            compliance_score=compliance_results["overall_score"],
-            compliance_details=compliance_results["details"],
-            extracted_sections=sections,
-            status="completed",
-        )
-        
-        evaluation = Evaluation.create(db, obj_in=evaluation_in)
-        
-        # Update DPR status
-        dpr.status = "evaluated"
-        db.add(dpr)
-        db.commit()
+        # Run OCR, section extraction and compliance checks, and store the result
+        evaluation = await run_evaluation(db, dpr, evaluated_by=current_user.id)
         
         return evaluation
     except Exception as e:
-        db.rollback()
+        await asyncio.to_thread(db.rollback)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error evaluating DPR: {str(e)}",
@@ -77,23 +62,50 @@ async def evaluate_dpr(
 
 
 @router.get("/{dpr_id}", response_model=EvaluationResponse)
-async def get_evaluation_results(
+def get_evaluation_results(
     dpr_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Get evaluation results for a DPR
+    Get the latest evaluation results for a DPR
     """
-    # Get the evaluation from database
-    evaluation = db.query(Evaluation).filter(Evaluation.dpr_id == dpr_id).first()
+    # Get the DPR and its latest evaluation in one query
+    found = crud_dpr.get_with_latest(db, dpr_id)
+    if not found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="DPR not found",
+        )
+    dpr, evaluation, _ = found
+    
     if not evaluation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Evaluation not found for this DPR",
         )
     
-    # Get the associated DPR
+    # Check if user has permission to view this evaluation
+    if not current_user.is_admin and not current_user.is_reviewer and dpr.uploaded_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    
+    # The section texts are only read once access is granted
+    crud_evaluation.load_sections(db, [evaluation])
+    return evaluation
+
+
+@router.get("/{dpr_id}/history", response_model=List[EvaluationSummary])
+def get_evaluation_history(
+    dpr_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    List the evaluations of a DPR, newest first, without their details
+    """
     dpr = db.query(DPR).filter(DPR.id == dpr_id).first()
     if not dpr:
         raise HTTPException(
@@ -101,11 +113,11 @@ async def get_evaluation_results(
             detail="DPR not found",
         )
     
-    # Check if user has permission to view this evaluation
+    # Check if user has permission to view this DPR's evaluations
     if not current_user.is_admin and not current_user.is_reviewer and dpr.uploaded_by != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
     
-    return evaluation
\ No newline at end of file
+    return crud_evaluation.get_summaries(db, dpr_id=dpr.id)
\ No newline at end of file
@@ -0,0 +1,97 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_active_user
+from app.core.jobs import job_queue
+from app.db.session import get_db
+from app.models.dpr import DPR
+from app.models.job import job as crud_job
+from app.schemas.job import JobCreate, JobResponse
+from app.schemas.user import User
+
+router = APIRouter()
+
+
+def _get_accessible_dpr(db: Session, dpr_id: Any, current_user: User) -> DPR:
+    dpr = db.query(DPR).filter(DPR.id == dpr_id).first()
+    if not dpr:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="DPR not found",
+        )
+    
+    # Check if user has permission to access this DPR
+    if not current_user.is_admin and not current_user.is_reviewer and dpr.uploaded_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    
+    return dpr
+
+
+@router.post("/", response_model=JobResponse)
+def create_job(
+    *,
+    db: Session = Depends(get_db),
+    job_in: JobCreate,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Queue an evaluation or risk assessment job for a DPR
+    """
+    if job_in.job_type not in ("evaluate", "risk"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job type. Only 'evaluate' and 'risk' jobs can be queued.",
+        )
+    
+    if job_in.priority != 0 and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can set the priority of a job",
+        )
+    
+    dpr = _get_accessible_dpr(db, job_in.dpr_id, current_user)
+    
+    return job_queue.enqueue(
+        db, job_in.job_type, dpr.id, created_by=current_user.id, priority=job_in.priority
+    )
+
+
+@router.get("/dpr/{dpr_id}", response_model=List[JobResponse])
+def read_dpr_jobs(
+    dpr_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get all jobs for a DPR, newest first
+    """
+    dpr = _get_accessible_dpr(db, dpr_id, current_user)
+    
+    return crud_job.get_for_dpr(db, dpr_id=dpr.id)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def read_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get the status of a background job
+    """
+    job = crud_job.get(db, id=job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    
+    # Jobs are visible to anyone who can see their DPR
+    _get_accessible_dpr(db, job.dpr_id, current_user)
+    
+    return job
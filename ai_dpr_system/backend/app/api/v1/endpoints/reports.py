@@ -1,4 +1,5 @@
-from typing import Any
+import asyncio
+from typing import Any, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
@@ -6,7 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_active_user
 from app.db.session import get_db
-from app.models.dpr import DPR
+from app.models.dpr import DPR, dpr as crud_dpr
 from app.models.evaluation import Evaluation
 from app.models.risk_assessment import RiskAssessment
 from app.schemas.user import User
@@ -15,22 +16,19 @@ from app.utils.reports import generate_pdf_report, generate_csv_report
 router = APIRouter()
 
 
-@router.get("/{dpr_id}/pdf")
-async def generate_pdf(
-    dpr_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-) -> Any:
+def _get_report_data(
+    db: Session, dpr_id: str, current_user: User
+) -> Tuple[DPR, Evaluation, Optional[RiskAssessment]]:
     """
-    Generate a PDF report for a DPR
+    Get a DPR with its latest evaluation and risk assessment (one query)
     """
-    # Get the DPR from database
-    dpr = db.query(DPR).filter(DPR.id == dpr_id).first()
-    if not dpr:
+    found = crud_dpr.get_with_latest(db, dpr_id, risk_details=True)
+    if not found:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="DPR not found",
         )
+    dpr, evaluation, risk_assessment = found
     
     # Check if user has permission to access this DPR
     if not current_user.is_admin and not current_user.is_reviewer and dpr.uploaded_by != current_user.id:
@@ -39,16 +37,25 @@ async def generate_pdf(
             detail="Not enough permissions",
         )
     
-    # Get evaluation data
-    evaluation = db.query(Evaluation).filter(Evaluation.dpr_id == dpr_id).first()
     if not evaluation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="This DPR has not been evaluated yet",
         )
     
-    # Get risk assessment data
-    risk_assessment = db.query(RiskAssessment).filter(RiskAssessment.dpr_id == dpr_id).first()
+    return dpr, evaluation, risk_assessment
+
+
+@router.get("/{dpr_id}/pdf")
+async def generate_pdf(
+    dpr_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Generate a PDF report for a DPR
+    """
+    dpr, evaluation, risk_assessment = await asyncio.to_thread(_get_report_data, db, dpr_id, current_user)
     
     try:
         # Generate PDF report
@@ -76,31 +83,7 @@ async def generate_csv(
     """
     Generate a CSV report for a DPR
     """
-    # Get the DPR from database
-    dpr = db.query(DPR).filter(DPR.id == dpr_id).first()
-    if not dpr:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="DPR not found",
-        )
-    
-    # Check if user has permission to access this DPR
-    if not current_user.is_admin and not current_user.is_reviewer and dpr.uploaded_by != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
-    
-    # Get evaluation data
-    evaluation = db.query(Evaluation).filter(Evaluation.dpr_id == dpr_id).first()
-    if not evaluation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="This DPR has not been evaluated yet",
-        )
-    
-    # Get risk assessment data
-    risk_assessment = db.query(RiskAssessment).filter(RiskAssessment.dpr_id == dpr_id).first()
+    dpr, evaluation, risk_assessment = await asyncio.to_thread(_get_report_data, db, dpr_id, current_user)
     
     try:
         # Generate CSV report
@@ -1,36 +1,40 @@
-from typing import Any, Dict, List
+import asyncio
+from typing import Any, Dict, List, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.core.auth import get_current_active_user
+from app.core.auth import get_current_active_superuser, get_current_active_user
+from app.core.tasks import run_risk_assessment
 from app.db.session import get_db
-from app.ml.risk import predict_risk
-from app.models.dpr import DPR
+from app.ml.inference import risk_engine
+from app.models.dpr import DPR, dpr as crud_dpr
 from app.models.evaluation import Evaluation
-from app.models.risk_assessment import RiskAssessment
-from app.schemas.risk import RiskAssessmentCreate, RiskAssessmentResponse
+from app.schemas.risk import RiskAssessmentResponse
 from app.schemas.user import User
 
 router = APIRouter()
 
 
-@router.post("/{dpr_id}", response_model=RiskAssessmentResponse)
-async def predict_dpr_risk(
-    dpr_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+@router.get("/engine/stats")
+async def get_risk_engine_stats(
+    current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
     """
-    Predict risk factors for a DPR
+    Get risk model status, inference latency and batch size statistics
     """
-    # Get the DPR from database
-    dpr = db.query(DPR).filter(DPR.id == dpr_id).first()
-    if not dpr:
+    return risk_engine.stats()
+
+
+def _get_assessable_dpr(db: Session, dpr_id: str, current_user: User) -> Tuple[DPR, Evaluation]:
+    # Get the DPR and its latest evaluation in one query
+    found = crud_dpr.get_with_latest(db, dpr_id)
+    if not found:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="DPR not found",
         )
+    dpr, evaluation, _ = found
     
     # Check if user has permission to perform risk assessment
     if not current_user.is_admin and not current_user.is_reviewer and dpr.uploaded_by != current_user.id:
@@ -39,38 +43,39 @@ async def predict_dpr_risk(
             detail="Not enough permissions",
         )
     
-    # Get evaluation data (needed for risk prediction)
-    evaluation = db.query(Evaluation).filter(Evaluation.dpr_id == dpr_id).first()
+    # The evaluation is needed for risk prediction
     if not evaluation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="DPR must be evaluated before risk prediction",
         )
     
+    return dpr, evaluation
+
+
+@router.post("/{dpr_id}", response_model=RiskAssessmentResponse)
+async def predict_dpr_risk(
+    dpr_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Predict risk factors for a DPR
+    
+    The prediction awaits the risk engine, so this stays async and its
+    database work runs in a worker thread.
+    """
+    dpr, evaluation = await asyncio.to_thread(_get_assessable_dpr, db, dpr_id, current_user)
+    
     try:
-        # Predict risk using ML model
-        risk_results = await predict_risk(evaluation.extracted_sections)
-        
-        # Create risk assessment record
-        risk_in = RiskAssessmentCreate(
-            dpr_id=dpr_id,
-            evaluated_by=current_user.id,
-            overall_risk_score=risk_results["overall_risk"],
-            risk_factors=risk_results["risk_factors"],
-            risk_details=risk_results["details"],
-            recommendations=risk_results["recommendations"],
+        # Predict risk and store the assessment
+        risk_assessment = await run_risk_assessment(
+            db, dpr, evaluation, evaluated_by=current_user.id
         )
         
-        risk_assessment = RiskAssessment.create(db, obj_in=risk_in)
-        
-        # Update DPR status
-        dpr.status = "risk_assessed"
-        db.add(dpr)
-        db.commit()
-        
         return risk_assessment
     except Exception as e:
-        db.rollback()
+        await asyncio.to_thread(db.rollback)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error predicting risk: {str(e)}",
@@ -78,28 +83,27 @@ async def predict_dpr_risk(
 
 
 @router.get("/{dpr_id}", response_model=RiskAssessmentResponse)
-async def get_risk_assessment(
+def get_risk_assessment(
     dpr_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Get risk assessment for a DPR
+    Get the latest risk assessment for a DPR
     """
-    # Get the risk assessment from database
-    risk_assessment = db.query(RiskAssessment).filter(RiskAssessment.dpr_id == dpr_id).first()
-    if not risk_assessment:
+    # Get the DPR and its latest risk assessment in one query
+    found = crud_dpr.get_with_latest(db, dpr_id, risk_details=True)
+    if not found:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Risk assessment not found for this DPR",
+            detail="DPR not found",
         )
+    dpr, _, risk_assessment = found
     
-    # Get the associated DPR
-    dpr = db.query(DPR).filter(DPR.id == dpr_id).first()
-    if not dpr:
+    if not risk_assessment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="DPR not found",
+            detail="Risk assessment not found for this DPR",
         )
     
     # Check if user has permission to view this risk assessment
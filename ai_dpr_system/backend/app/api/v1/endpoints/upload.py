@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, List
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
@@ -5,8 +6,9 @@ from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_active_user
 from app.core.storage import save_file_to_storage
+from app.core.tasks import queue_dpr_for_processing
 from app.db.session import get_db
-from app.models.dpr import DPR
+from app.models.dpr import DPR, dpr as crud_dpr
 from app.schemas.dpr import DPRCreate, DPRResponse
 from app.schemas.user import User
 from app.utils.file import validate_file_type
@@ -14,6 +16,30 @@ from app.utils.file import validate_file_type
 router = APIRouter()
 
 
+def _create_dpr(
+    db: Session, title: str, description: str, file_location: str, current_user: User
+) -> DPR:
+    # Create DPR entry in database
+    dpr_in = DPRCreate(
+        title=title,
+        description=description,
+        file_path=file_location,
+        uploaded_by=current_user.id,
+        status="pending",  # Initial status is pending
+    )
+    
+    # Save to database
+    dpr = crud_dpr.create(db, obj_in=dpr_in)
+    
+    # Queue the DPR for evaluation and risk assessment in the background;
+    # progress can be followed through the jobs endpoints
+    queue_dpr_for_processing(db, dpr, created_by=current_user.id)
+    
+    # Load it here: the response is built on the event loop
+    db.refresh(dpr)
+    return dpr
+
+
 @router.post("/", response_model=DPRResponse)
 async def upload_dpr_file(
     *,
@@ -25,6 +51,9 @@ async def upload_dpr_file(
 ) -> Any:
     """
     Upload a DPR file (PDF/Text)
+    
+    The file is saved asynchronously, so this stays async and its
+    database work runs in a worker thread.
     """
     # Validate file type (PDF, TXT, DOC, DOCX)
     if not validate_file_type(file):
@@ -37,22 +66,7 @@ async def upload_dpr_file(
         # Save file to storage (S3, local, etc.)
         file_location = await save_file_to_storage(file)
         
-        # Create DPR entry in database
-        dpr_in = DPRCreate(
-            title=title,
-            description=description,
-            file_path=file_location,
-            uploaded_by=current_user.id,
-            status="pending",  # Initial status is pending
-        )
-        
-        # Save to database
-        dpr = DPR.create(db, obj_in=dpr_in)
-        
-        # Queue the DPR for processing (this could be done asynchronously)
-        # queue_dpr_for_processing(dpr.id)
-        
-        return dpr
+        return await asyncio.to_thread(_create_dpr, db, title, description, file_location, current_user)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -61,7 +75,7 @@ async def upload_dpr_file(
 
 
 @router.get("/status/{upload_id}", response_model=DPRResponse)
-async def check_upload_status(
+def check_upload_status(
     upload_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
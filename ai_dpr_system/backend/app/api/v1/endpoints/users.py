@@ -1,32 +1,45 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.auth import get_current_active_superuser, get_current_active_user
 from app.db.session import get_db
-from app.models.user import User as UserModel
+from app.models.user import User as UserModel, user as crud_user
 from app.schemas.user import User, UserCreate, UserUpdate
+from app.utils.pagination import NEXT_CURSOR_HEADER, paginate, split_page
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[User])
-async def read_users(
+def read_users(
+    response: Response,
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
     """
-    Retrieve users (admin only)
+    Retrieve users (admin only), newest first
+    
+    Pass the X-Next-Cursor header of a response as `cursor` to get the
+    next page.
     """
-    users = db.query(UserModel).offset(skip).limit(limit).all()
+    try:
+        query = paginate(select(UserModel), UserModel, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    users, next_cursor = split_page(db.execute(query).scalars().all(), limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return users
 
 
 @router.post("/", response_model=User)
-async def create_user(
+def create_user(
     *,
     db: Session = Depends(get_db),
     user_in: UserCreate,
@@ -41,7 +54,7 @@ async def create_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-    user = UserModel.create(db, obj_in=user_in)
+    user = crud_user.create(db, obj_in=user_in)
     return user
 
 
@@ -56,7 +69,7 @@ async def read_user_me(
 
 
 @router.put("/me", response_model=User)
-async def update_user_me(
+def update_user_me(
     *,
     db: Session = Depends(get_db),
     user_in: UserUpdate,
@@ -65,18 +78,18 @@ async def update_user_me(
     """
     Update current user
     """
-    user = UserModel.get(db, id=current_user.id)
+    user = crud_user.get(db, id=current_user.id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    user = UserModel.update(db, db_obj=user, obj_in=user_in)
+    user = crud_user.update(db, db_obj=user, obj_in=user_in)
     return user
 
 
 @router.get("/{user_id}", response_model=User)
-async def read_user_by_id(
+def read_user_by_id(
     user_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
@@ -84,7 +97,7 @@ async def read_user_by_id(
     """
     Get a specific user by id
     """
-    user = UserModel.get(db, id=user_id)
+    user = crud_user.get(db, id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -99,7 +112,7 @@ async def read_user_by_id(
 
 
 @router.put("/{user_id}", response_model=User)
-async def update_user(
+def update_user(
     *,
     db: Session = Depends(get_db),
     user_id: int,
@@ -109,11 +122,11 @@ async def update_user(
     """
     Update a user (admin only)
     """
-    user = UserModel.get(db, id=user_id)
+    user = crud_user.get(db, id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    user = UserModel.update(db, db_obj=user, obj_in=user_in)
+    user = crud_user.update(db, db_obj=user, obj_in=user_in)
     return user
\ No newline at end of file
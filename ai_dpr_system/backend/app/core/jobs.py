@@ -0,0 +1,379 @@
+import asyncio
+import logging
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Session, Job], Awaitable[Optional[Dict[str, Any]]]]
+FailureHandler = Callable[[Session, Job, str], None]
+
+
+class JobQueue:
+    """
+    In-process background job queue backed by the jobs table
+
+    Jobs are persisted, so they survive restarts and can be inspected
+    through the API. Workers claim the highest-priority runnable job,
+    run the handler registered for its type and retry failures with
+    exponential backoff until `max_attempts` is reached.
+
+    A claimed job is leased to its worker: the worker renews the lease
+    by updating `heartbeat_at` every `heartbeat_interval` seconds while
+    the job runs. The workers of every process periodically look for
+    running jobs whose lease is older than `lease_timeout` (their process
+    crashed or was killed) and queue them again, or fail them once they
+    have used up their attempts.
+    """
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        workers: int = 2,
+        poll_interval: float = 1.0,
+        retry_backoff: float = 30.0,
+        lease_timeout: float = 60.0,
+        heartbeat_interval: float = 10.0,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.lease_timeout = lease_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self._next_lease_check = 0.0
+        self._handlers: Dict[str, JobHandler] = {}
+        self._failure_handlers: Dict[str, FailureHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def register(
+        self, job_type: str, handler: JobHandler, on_failure: Optional[FailureHandler] = None
+    ) -> None:
+        """
+        Register the handler for a job type
+
+        `on_failure` is called once a job has used up all of its attempts.
+        """
+        self._handlers[job_type] = handler
+        if on_failure:
+            self._failure_handlers[job_type] = on_failure
+
+    def enqueue(
+        self,
+        db: Session,
+        job_type: str,
+        dpr_id: Any,
+        *,
+        created_by: Optional[Any] = None,
+        priority: int = 0,
+        max_attempts: Optional[int] = None,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> Job:
+        """
+        Add a job to the queue and wake up an idle worker
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        job = Job(
+            job_type=job_type,
+            dpr_id=str(dpr_id),
+            created_by=str(created_by) if created_by is not None else None,
+            priority=priority,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            payload=payload,
+            status="queued",
+            run_after=datetime.utcnow(),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._notify()
+        return job
+
+    def _notify(self) -> None:
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self) -> None:
+        """
+        Start the worker tasks on the running event loop
+        """
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._next_lease_check = 0.0
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+        Stop the worker tasks
+
+        Jobs that were running are released and queued again without
+        counting the interrupted attempt.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        self._wakeup = None
+
+    def requeue_expired_jobs(self) -> int:
+        """
+        Recover running jobs whose lease has expired
+
+        Jobs with attempts left are queued again; the others are failed
+        and their failure handler is called. Returns the number of jobs
+        recovered.
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.lease_timeout)
+        # Jobs claimed before leases existed only have started_at
+        lease_expired = func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff
+        db = self.session_factory()
+        try:
+            expired = db.query(Job).filter(Job.status == "running", lease_expired).all()
+            recovered = 0
+            for job in expired:
+                retry = job.attempts < job.max_attempts
+                values = {
+                    "status": "queued" if retry else "failed",
+                    "error": f"Lease expired after attempt {job.attempts}",
+                    "heartbeat_at": None,
+                }
+                if retry:
+                    values["run_after"] = now
+                else:
+                    values["finished_at"] = now
+                # Only recover the job if no worker renewed its lease in the meantime
+                updated = (
+                    db.query(Job)
+                    .filter(Job.id == job.id, Job.status == "running", lease_expired)
+                    .update(values, synchronize_session=False)
+                )
+                db.commit()
+                if not updated:
+                    continue
+                recovered += 1
+                logger.warning("Job %s (%s) lost its lease; %s", job.id, job.job_type,
+                               "queued again" if retry else "failed")
+                if not retry:
+                    db.refresh(job)
+                    self._call_failure_handler(db, job, values["error"])
+                    db.commit()
+            return recovered
+        finally:
+            db.close()
+
+    def _claim(self) -> Optional[str]:
+        """
+        Atomically claim the next runnable job and return its id
+        """
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            candidates = (
+                db.query(Job.id)
+                .filter(Job.status == "queued", Job.run_after <= now)
+                .order_by(Job.priority.desc(), Job.created_at)
+                .limit(self.workers)
+                .all()
+            )
+            for (job_id,) in candidates:
+                # Only one worker (in any process) can move the job out of "queued"
+                claimed = (
+                    db.query(Job)
+                    .filter(Job.id == job_id, Job.status == "queued")
+                    .update(
+                        {
+                            "status": "running",
+                            "attempts": Job.attempts + 1,
+                            "started_at": now,
+                            "heartbeat_at": now,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if claimed:
+                    return job_id
+            return None
+        finally:
+            db.close()
+
+    async def _check_leases(self) -> None:
+        """
+        Recover expired jobs, at most once per half lease timeout across all workers
+        """
+        if time.monotonic() < self._next_lease_check:
+            return
+        self._next_lease_check = time.monotonic() + self.lease_timeout / 2
+        try:
+            if await asyncio.to_thread(self.requeue_expired_jobs):
+                self._notify()
+        except Exception:
+            traceback.print_exc()
+
+    async def _worker(self) -> None:
+        while True:
+            await self._check_leases()
+            try:
+                job_id = await asyncio.to_thread(self._claim)
+            except Exception:
+                traceback.print_exc()
+                job_id = None
+
+            if job_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # A job whose outcome could not be recorded is recovered when its
+            # lease expires; the worker itself must keep running
+            try:
+                await self.run_job(job_id)
+            except Exception:
+                traceback.print_exc()
+
+    def _renew_lease(self, job_id: str) -> bool:
+        """
+        Update a running job's heartbeat; False if the job is no longer ours
+        """
+        db = self.session_factory()
+        try:
+            renewed = (
+                db.query(Job)
+                .filter(Job.id == job_id, Job.status == "running")
+                .update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+            )
+            db.commit()
+            return bool(renewed)
+        finally:
+            db.close()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if not await asyncio.to_thread(self._renew_lease, job_id):
+                    logger.warning("Job %s is no longer leased to this worker", job_id)
+                    return
+            except Exception:
+                traceback.print_exc()
+
+    def _release(self, job_id: str) -> None:
+        """
+        Queue an interrupted job again without counting its attempt
+        """
+        db = self.session_factory()
+        try:
+            db.query(Job).filter(Job.id == job_id, Job.status == "running").update(
+                {
+                    "status": "queued",
+                    "attempts": Job.attempts - 1,
+                    "run_after": datetime.utcnow(),
+                    "heartbeat_at": None,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    async def run_job(self, job_id: str) -> None:
+        """
+        Run a claimed job and record its outcome
+
+        The queue's own queries run in a thread, so they do not block the
+        event loop.
+        """
+        db = self.session_factory()
+        try:
+            job = await asyncio.to_thread(db.query(Job).filter(Job.id == job_id).first)
+            if not job:
+                return
+
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                handler = self._handlers[job.job_type]
+                result = await handler(db, job)
+            except asyncio.CancelledError:
+                db.rollback()
+                self._release(job_id)
+                raise
+            except Exception as e:
+                await asyncio.to_thread(db.rollback)
+                await asyncio.to_thread(self._record_failure, db, job, f"{type(e).__name__}: {e}")
+                return
+            finally:
+                heartbeat.cancel()
+
+            try:
+                await asyncio.to_thread(self._record_success, db, job, result)
+            except Exception as e:
+                # e.g. a result that can not be stored as JSON
+                await asyncio.to_thread(db.rollback)
+                await asyncio.to_thread(
+                    self._record_failure, db, job, f"Could not store the result: {type(e).__name__}: {e}"
+                )
+        finally:
+            db.close()
+
+    def _record_success(self, db: Session, job: Job, result: Optional[Dict[str, Any]]) -> None:
+        job.status = "completed"
+        job.result = result
+        job.error = None
+        job.finished_at = datetime.utcnow()
+        job.heartbeat_at = None
+        db.add(job)
+        db.commit()
+
+    def _record_failure(self, db: Session, job: Job, error: str) -> None:
+        job.error = error
+        job.heartbeat_at = None
+        if job.attempts < job.max_attempts:
+            # Retry later with exponential backoff
+            delay = self.retry_backoff * (2 ** (job.attempts - 1))
+            job.status = "queued"
+            job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+        else:
+            job.status = "failed"
+            job.finished_at = datetime.utcnow()
+            self._call_failure_handler(db, job, error)
+        db.add(job)
+        db.commit()
+
+    def _call_failure_handler(self, db: Session, job: Job, error: str) -> None:
+        on_failure = self._failure_handlers.get(job.job_type)
+        if on_failure:
+            try:
+                on_failure(db, job, error)
+            except Exception:
+                db.rollback()
+                traceback.print_exc()
+
+
+# Create queue instance
+job_queue = JobQueue(
+    SessionLocal,
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+    retry_backoff=settings.JOB_RETRY_BACKOFF,
+    lease_timeout=settings.JOB_LEASE_TIMEOUT,
+    heartbeat_interval=settings.JOB_HEARTBEAT_INTERVAL,
+)
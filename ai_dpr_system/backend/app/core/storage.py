@@ -1,46 +1,252 @@
+import asyncio
 import os
-from typing import Any, BinaryIO, Optional
+import shutil
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from fastapi import UploadFile
 
 from app.core.config import settings
 
+# Size of the chunks files are copied and streamed in
+CHUNK_SIZE = 1024 * 1024
 
-async def save_file_to_storage(file: UploadFile) -> str:
+
+class StorageBackend(ABC):
     """
-    Save a file to the configured storage (S3 or local)
+    Base class for the places DPR files are stored
+
+    Blocking I/O is run in worker threads, and files are copied and
+    streamed in chunks so memory use does not grow with the file size.
     """
-    file_content = await file.read()
-    file_id = f"{uuid.uuid4()}-{file.filename}"
-    
-    # Check if using S3 or local storage
-    if settings.S3_BUCKET_NAME and settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-        # Use S3
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION,
+    @abstractmethod
+    def _save(self, file_obj: BinaryIO, file_id: str, content_type: Optional[str]) -> str:
+        """
+        Store the contents of a file object under `file_id` and return its path
+        """
+
+    @abstractmethod
+    def open(self, file_path: str) -> Optional[BinaryIO]:
+        """
+        Open a stored file for reading, or return None if it does not exist
+        """
+
+    @abstractmethod
+    def size(self, file_path: str) -> Optional[int]:
+        """
+        Get the size of a stored file in bytes, or None if it does not exist
+        """
+
+    @abstractmethod
+    def _read_range(self, file_path: str, start: int, end: int) -> BinaryIO:
+        """
+        Open the non-empty byte range `start`-`end` (inclusive) of a stored file for reading
+        """
+
+    def _download(self, file_path: str, local_path: str) -> None:
+        with self.open(file_path) as src, open(local_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+    async def save(self, file: UploadFile, file_id: str) -> str:
+        """
+        Store an uploaded file under `file_id` and return its path
+        """
+        # UploadFile spools large uploads to disk, so its underlying file
+        # is copied in chunks without reading the upload into memory
+        await file.seek(0)
+        return await asyncio.to_thread(self._save, file.file, file_id, file.content_type)
+
+    async def download(self, file_path: str, local_path: str) -> None:
+        """
+        Copy a stored file to a local path
+        """
+        await asyncio.to_thread(self._download, file_path, local_path)
+
+    async def stream(
+        self, file_path: str, start: int = 0, end: Optional[int] = None, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream the bytes `start` to `end` (inclusive, default: end of file) of a stored file
+        """
+        if end is None:
+            end = await asyncio.to_thread(self.size, file_path) - 1
+        # Nothing to read, e.g. a zero-byte file; an S3 range request for
+        # "bytes=0--1" would be rejected
+        if end < start:
+            return
+        reader = await asyncio.to_thread(self._read_range, file_path, start, end)
+        try:
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(reader.read, min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(reader.close)
+
+
+class LocalStorage(StorageBackend):
+    """
+    Stores files in a directory on the local filesystem
+    """
+    def __init__(self, root: str):
+        self.root = root
+
+    def _save(self, file_obj: BinaryIO, file_id: str, content_type: Optional[str]) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        file_path = os.path.join(self.root, file_id)
+        with open(file_path, "wb") as f:
+            shutil.copyfileobj(file_obj, f, CHUNK_SIZE)
+        return file_path
+
+    def open(self, file_path: str) -> Optional[BinaryIO]:
+        if os.path.exists(file_path):
+            return open(file_path, "rb")
+        return None
+
+    def size(self, file_path: str) -> Optional[int]:
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return None
+
+    def _read_range(self, file_path: str, start: int, end: int) -> BinaryIO:
+        f = open(file_path, "rb")
+        f.seek(start)
+        return f
+
+    def _download(self, file_path: str, local_path: str) -> None:
+        shutil.copyfile(file_path, local_path)
+
+
+class S3Storage(StorageBackend):
+    """
+    Stores files in an S3 bucket (or an S3-compatible service such as MinIO)
+
+    A single client, with its connection pool, is created on first use
+    and shared by all requests; boto3 clients are thread-safe. Uploads
+    and downloads above S3_MULTIPART_THRESHOLD_MB use multipart transfers
+    of S3_MULTIPART_CHUNK_MB parts with up to S3_MAX_CONCURRENCY parts in
+    flight, so memory use is bounded by chunk size times concurrency.
+    """
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+            max_concurrency=settings.S3_MAX_CONCURRENCY,
         )
-        
-        s3_client.put_object(
-            Bucket=settings.S3_BUCKET_NAME,
-            Key=file_id,
-            Body=file_content,
-            ContentType=file.content_type,
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # boto3.client() uses the shared default session, which is
+                    # not thread-safe; create the client from its own session
+                    session = boto3.session.Session(
+                        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                        region_name=settings.AWS_REGION,
+                    )
+                    self._client = session.client(
+                        's3',
+                        endpoint_url=settings.S3_ENDPOINT_URL,
+                        config=Config(max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS),
+                    )
+        return self._client
+
+    def _split(self, file_path: str) -> Dict[str, str]:
+        bucket_name, key = file_path[5:].split("/", 1)
+        return {"Bucket": bucket_name, "Key": key}
+
+    def _save(self, file_obj: BinaryIO, file_id: str, content_type: Optional[str]) -> str:
+        extra_args = {"ContentType": content_type} if content_type else None
+        self.client.upload_fileobj(
+            file_obj, self.bucket_name, file_id, ExtraArgs=extra_args, Config=self.transfer_config
         )
-        
-        file_path = f"s3://{settings.S3_BUCKET_NAME}/{file_id}"
+        return f"s3://{self.bucket_name}/{file_id}"
+
+    def open(self, file_path: str) -> Optional[BinaryIO]:
+        try:
+            response = self.client.get_object(**self._split(file_path))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+        return response['Body']
+
+    def size(self, file_path: str) -> Optional[int]:
+        try:
+            response = self.client.head_object(**self._split(file_path))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+        return response["ContentLength"]
+
+    def _read_range(self, file_path: str, start: int, end: int) -> BinaryIO:
+        response = self.client.get_object(Range=f"bytes={start}-{end}", **self._split(file_path))
+        return response['Body']
+
+    def _download(self, file_path: str, local_path: str) -> None:
+        location = self._split(file_path)
+        self.client.download_file(
+            location["Bucket"], location["Key"], local_path, Config=self.transfer_config
+        )
+
+
+_backends: Dict[str, StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def _s3_configured() -> bool:
+    return bool(settings.S3_BUCKET_NAME and settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY)
+
+
+def get_storage(file_path: Optional[str] = None) -> StorageBackend:
+    """
+    Get the backend holding `file_path`, or the one new files are saved to
+
+    Backends are created once and reused.
+    """
+    if file_path is not None:
+        name = f"s3:{file_path[5:].split('/', 1)[0]}" if file_path.startswith("s3://") else "local"
+    elif _s3_configured():
+        name = f"s3:{settings.S3_BUCKET_NAME}"
     else:
-        # Use local storage
-        storage_dir = os.path.join(os.getcwd(), "storage")
-        os.makedirs(storage_dir, exist_ok=True)
-        
-        file_path = os.path.join(storage_dir, file_id)
-        with open(file_path, "wb") as f:
-            f.write(file_content)
-    
+        name = "local"
+
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                if name == "local":
+                    backend = LocalStorage(settings.STORAGE_DIR)
+                else:
+                    backend = S3Storage(name[3:])
+                _backends[name] = backend
+    return backend
+
+
+async def save_file_to_storage(file: UploadFile) -> str:
+    """
+    Save a file to the configured storage (S3 or local)
+    """
+    file_id = f"{uuid.uuid4()}-{file.filename}"
+    file_path = await get_storage().save(file, file_id)
+
     await file.seek(0)  # Reset file pointer in case it's needed elsewhere
     return file_path
 
@@ -49,22 +255,27 @@ async def get_file_from_storage(file_path: str) -> Optional[BinaryIO]:
     """
     Get a file from the configured storage (S3 or local)
     """
-    if file_path.startswith("s3://"):
-        # Get from S3
-        bucket_name, key = file_path[5:].split("/", 1)
-        
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION,
-        )
-        
-        response = s3_client.get_object(Bucket=bucket_name, Key=key)
-        return response['Body']
-    else:
-        # Get from local storage
-        if os.path.exists(file_path):
-            return open(file_path, "rb")
-        else:
-            return None
+    return await asyncio.to_thread(get_storage(file_path).open, file_path)
+
+
+async def get_file_size(file_path: str) -> Optional[int]:
+    """
+    Get the size in bytes of a stored file, or None if it does not exist
+    """
+    return await asyncio.to_thread(get_storage(file_path).size, file_path)
+
+
+async def download_file_from_storage(file_path: str, local_path: str) -> None:
+    """
+    Copy a stored file to a local path
+    """
+    await get_storage(file_path).download(file_path, local_path)
+
+
+def stream_file_from_storage(
+    file_path: str, start: int = 0, end: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Stream a stored file, or the byte range `start`-`end` (inclusive) of it
+    """
+    return get_storage(file_path).stream(file_path, start, end)
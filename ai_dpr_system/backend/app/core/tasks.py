@@ -0,0 +1,194 @@
+"""
+DPR processing tasks shared by the API endpoints and the background job queue
+
+The tasks take a sync Session; its queries run in a worker thread
+(asyncio.to_thread), so the event loop keeps serving other requests.
+"""
+import asyncio
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.jobs import job_queue
+from app.ml.compliance import check_compliance_incremental
+from app.ml.pipeline import analyze_document_incremental
+from app.ml.risk import predict_risk_incremental
+from app.models.dpr import DPR
+from app.models.evaluation import Evaluation, evaluation as crud_evaluation
+from app.models.job import Job
+from app.models.risk_assessment import RiskAssessment
+from app.schemas.evaluation import EvaluationCreate
+from app.schemas.risk import RiskAssessmentCreate
+
+
+async def run_evaluation(db: Session, dpr: DPR, evaluated_by: Any) -> Evaluation:
+    """
+    Evaluate a DPR document for compliance and store the result
+    
+    Only the pages and sections that changed since an earlier upload are
+    processed again; the returned evaluation's `recomputed` attribute
+    reports which ones.
+    """
+    # Process the document with OCR if needed and extract its sections
+    # (cached by file content and per page, so re-uploads only OCR changed pages)
+    sections, recomputed = await analyze_document_incremental(dpr.file_path)
+    
+    # Check compliance against guidelines, reusing the results of unchanged sections
+    compliance_results, recomputed_sections = await check_compliance_incremental(sections)
+    recomputed["sections"] = recomputed_sections
+    
+    evaluation = await asyncio.to_thread(
+        _store_evaluation, db, dpr, evaluated_by, compliance_results, sections
+    )
+    
+    # Not stored; returned to the caller along with the evaluation
+    evaluation.recomputed = recomputed
+    
+    return evaluation
+
+
+def _store_evaluation(
+    db: Session, dpr: DPR, evaluated_by: Any, compliance_results: Dict[str, Any], sections: Dict[str, str]
+) -> Evaluation:
+    # Create evaluation record; section texts go to the content-addressed blob table
+    evaluation_in = EvaluationCreate(
+        dpr_id=dpr.id,
+        evaluated_by=evaluated_by,
+        compliance_score=compliance_results["overall_score"],
+        compliance_details=compliance_results,
+        status="completed",
+    )
+    evaluation = crud_evaluation.create_with_sections(db, obj_in=evaluation_in, sections=sections)
+    
+    # Update DPR status
+    dpr.status = "evaluated"
+    db.add(dpr)
+    db.commit()
+    db.refresh(evaluation)
+    return evaluation
+
+
+async def run_risk_assessment(
+    db: Session, dpr: DPR, evaluation: Evaluation, evaluated_by: Any
+) -> RiskAssessment:
+    """
+    Predict risk factors for an evaluated DPR and store the result
+    """
+    # Predict risk using ML model, reusing the heuristic scores of unchanged sections
+    await asyncio.to_thread(crud_evaluation.load_sections, db, [evaluation])
+    risk_results, recomputed_sections = await predict_risk_incremental(evaluation.extracted_sections)
+    
+    risk_assessment = await asyncio.to_thread(_store_risk_assessment, db, dpr, evaluated_by, risk_results)
+    
+    # Not stored; returned to the caller along with the risk assessment
+    risk_assessment.recomputed = {"sections": recomputed_sections}
+    
+    return risk_assessment
+
+
+def _store_risk_assessment(
+    db: Session, dpr: DPR, evaluated_by: Any, risk_results: Dict[str, Any]
+) -> RiskAssessment:
+    # Create risk assessment record
+    risk_in = RiskAssessmentCreate(
+        dpr_id=dpr.id,
+        evaluated_by=evaluated_by,
+        overall_risk_score=risk_results["overall_risk"],
+        risk_factors=risk_results["risk_factors"],
+        risk_details=risk_results["details"],
+        recommendations=risk_results["recommendations"],
+    )
+    risk_assessment = RiskAssessment(**risk_in.dict())
+    db.add(risk_assessment)
+    
+    # Update DPR status
+    dpr.status = "risk_assessed"
+    db.add(dpr)
+    db.commit()
+    db.refresh(risk_assessment)
+    return risk_assessment
+
+
+def _get_dpr(db: Session, dpr_id: Any) -> DPR:
+    dpr = db.query(DPR).filter(DPR.id == dpr_id).first()
+    if not dpr:
+        raise ValueError(f"DPR not found: {dpr_id}")
+    return dpr
+
+
+def _start_processing(db: Session, dpr_id: Any) -> DPR:
+    dpr = _get_dpr(db, dpr_id)
+    dpr.status = "processing"
+    db.add(dpr)
+    db.commit()
+    return dpr
+
+
+def _get_latest_evaluation(db: Session, dpr_id: Any) -> Evaluation:
+    evaluation = (
+        db.query(Evaluation)
+        .filter(Evaluation.dpr_id == dpr_id)
+        .order_by(Evaluation.created_at.desc())
+        .first()
+    )
+    if not evaluation:
+        raise ValueError("DPR must be evaluated before risk prediction")
+    return evaluation
+
+
+async def evaluate_dpr_job(db: Session, job: Job) -> Dict[str, Any]:
+    """
+    Job handler: evaluate a DPR, then queue its risk assessment
+    """
+    dpr = await asyncio.to_thread(_start_processing, db, job.dpr_id)
+    
+    evaluation = await run_evaluation(db, dpr, evaluated_by=dpr.uploaded_by)
+    
+    # Risk prediction needs the stored evaluation, so it runs as a follow-up job
+    risk_job = await asyncio.to_thread(
+        job_queue.enqueue, db, "risk", dpr.id, created_by=job.created_by, priority=job.priority
+    )
+    
+    return {
+        "evaluation_id": str(evaluation.id),
+        "risk_job_id": risk_job.id,
+        "recomputed": evaluation.recomputed,
+    }
+
+
+async def risk_assessment_job(db: Session, job: Job) -> Dict[str, Any]:
+    """
+    Job handler: predict risk for an evaluated DPR
+    """
+    dpr = await asyncio.to_thread(_get_dpr, db, job.dpr_id)
+    evaluation = await asyncio.to_thread(_get_latest_evaluation, db, dpr.id)
+    
+    risk_assessment = await run_risk_assessment(
+        db, dpr, evaluation, evaluated_by=dpr.uploaded_by
+    )
+    
+    return {
+        "risk_assessment_id": str(risk_assessment.id),
+        "recomputed": risk_assessment.recomputed,
+    }
+
+
+def mark_dpr_failed(db: Session, job: Job, error: str) -> None:
+    """
+    Failure handler: flag a DPR whose evaluation could not be completed
+    """
+    dpr = db.query(DPR).filter(DPR.id == job.dpr_id).first()
+    if dpr:
+        dpr.status = "failed"
+        db.add(dpr)
+
+
+def queue_dpr_for_processing(db: Session, dpr: DPR, created_by: Optional[Any] = None) -> Job:
+    """
+    Queue a newly uploaded DPR for evaluation and risk assessment
+    """
+    return job_queue.enqueue(db, "evaluate", dpr.id, created_by=created_by)
+
+
+job_queue.register("evaluate", evaluate_dpr_job, on_failure=mark_dpr_failed)
+job_queue.register("risk", risk_assessment_job)
@@ -1,6 +1,7 @@
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -9,10 +10,25 @@ Base = declarative_base()
 class CRUDBase:
     """
     Base class for CRUD operations
+
+    The `*_async` methods are the equivalents for an AsyncSession.
     """
     def __init__(self, model):
         self.model = model
     
+    @staticmethod
+    def _data(obj_in) -> Dict[str, Any]:
+        if isinstance(obj_in, dict):
+            return obj_in
+        return obj_in.dict(exclude_unset=True)
+    
+    def _apply_update(self, db_obj, obj_in) -> None:
+        obj_data = db_obj.__dict__
+        update_data = self._data(obj_in)
+        for field in list(obj_data):
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+    
     def get(self, db, id: Any):
         return db.query(self.model).filter(self.model.id == id).first()
     
@@ -20,26 +36,14 @@ class CRUDBase:
         return db.query(self.model).offset(skip).limit(limit).all()
     
     def create(self, db, *, obj_in):
-        if isinstance(obj_in, dict):
-            obj_in_data = obj_in
-        else:
-            obj_in_data = obj_in.dict(exclude_unset=True)
-            
-        db_obj = self.model(**obj_in_data)
+        db_obj = self.model(**self._data(obj_in))
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
     
     def update(self, db, *, db_obj, obj_in):
-        obj_data = db_obj.__dict__
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        self._apply_update(db_obj, obj_in)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
@@ -49,4 +53,31 @@ class CRUDBase:
         obj = db.query(self.model).get(id)
         db.delete(obj)
         db.commit()
+        return obj
+    
+    async def get_async(self, db, id: Any):
+        return await db.get(self.model, id)
+    
+    async def get_multi_async(self, db, *, skip=0, limit=100):
+        result = await db.execute(select(self.model).offset(skip).limit(limit))
+        return result.scalars().all()
+    
+    async def create_async(self, db, *, obj_in):
+        db_obj = self.model(**self._data(obj_in))
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+    
+    async def update_async(self, db, *, db_obj, obj_in):
+        self._apply_update(db_obj, obj_in)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+    
+    async def remove_async(self, db, *, id: Any):
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        await db.commit()
         return obj
\ No newline at end of file
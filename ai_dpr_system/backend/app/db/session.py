@@ -1,15 +1,68 @@
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
-# Create engine
-engine = create_engine(settings.DATABASE_URL)
+# Async drivers used for each database backend
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
 
-# Create session factory
+
+def get_async_database_url(database_url: str) -> URL:
+    """
+    Get the async driver URL for a database URL
+
+    e.g. postgresql://... becomes postgresql+asyncpg://...
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url
+
+
+def _engine_options(url: URL, is_async: bool) -> Dict[str, Any]:
+    """
+    Pool and connection options shared by the sync and async engines
+    """
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    backend = url.get_backend_name()
+
+    # SQLite (e.g. a local stand-in) uses SQLAlchemy's default pool for it
+    if backend != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+
+    return options
+
+
+# Create engines
+_url = make_url(settings.DATABASE_URL)
+engine = create_engine(_url, **_engine_options(_url, is_async=False))
+
+_async_url = make_url(settings.ASYNC_DATABASE_URL) if settings.ASYNC_DATABASE_URL else get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_url, **_engine_options(_async_url, is_async=True))
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 def get_db() -> Generator:
     """
@@ -20,3 +73,14 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an async DB session
+
+    Queries run on the event loop without blocking it, so use this in
+    `async def` endpoints.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -6,6 +6,12 @@ from starlette.responses import JSONResponse
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.jobs import job_queue
+from app.db.session import async_engine
+from app.ml.inference import risk_engine
+from app.ml.ocr import shutdown_ocr_pool
+from app.utils.pagination import NEXT_CURSOR_HEADER
+import app.core.tasks  # noqa: F401 - registers the job handlers
 
 app = FastAPI(
     title="DPR-AI API",
@@ -22,11 +28,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Mount API routes
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("startup")
+async def start_workers():
+    if settings.JOB_WORKERS > 0:
+        await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    await job_queue.stop()
+    await risk_engine.stop()
+    shutdown_ocr_pool()
+    await async_engine.dispose()
+
 # Custom docs with government branding
 @app.get("/docs", include_in_schema=False)
 async def custom_swagger_ui_html():
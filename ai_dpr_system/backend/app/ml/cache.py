@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Bump when the cached OCR/extraction output format changes
+CACHE_VERSION = 2
+
+
+def file_sha256(file_path: str) -> str:
+    """
+    Compute the SHA-256 of a file, reading it in chunks
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DocumentCache:
+    """
+    Content-addressed on-disk cache for OCR and section extraction results
+
+    Entries are keyed by the SHA-256 of the file bytes plus the OCR
+    settings, so re-uploads of the same file share results. When the
+    cache grows beyond `max_bytes`, the least recently used entries
+    are evicted.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def make_key(self, content_hash: str) -> str:
+        """
+        Build the cache key for a file hash under the current OCR settings
+        """
+        parts = [content_hash, settings.OCR_ENGINE, settings.OCR_LANGUAGES, str(CACHE_VERSION)]
+        return hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, kind: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{kind}.json")
+
+    def get(self, key: str, kind: str) -> Optional[Any]:
+        """
+        Get a cached value, or None on a miss
+        """
+        path = self._path(key, kind)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (FileNotFoundError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, kind: str, value: Any) -> None:
+        """
+        Store a value, evicting old entries if the cache is over its size limit
+        """
+        path = self._path(key, kind)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        size = os.path.getsize(tmp_path)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan()[1]
+            else:
+                self._total_bytes += size - replaced
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self._evict()
+
+    def _scan(self):
+        """
+        List cache entries as (mtime, size, path) and return them with the total size
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits in max_bytes
+        """
+        with self._lock:
+            entries, total = self._scan()
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+            self._total_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and the current cache size
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class SectionResultCache:
+    """
+    In-memory LRU cache of rule results for individual DPR sections
+
+    Entries are keyed by a rule set fingerprint, the section name and the
+    SHA-256 of the section text, so when a re-uploaded DPR changes only a
+    few sections, the rules are only evaluated again on those sections.
+    Hashing a section is much cheaper than scanning it for every keyword
+    of its rules.
+    """
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+
+    def map_sections(
+        self,
+        namespace: str,
+        names: Iterable[str],
+        sections: Dict[str, str],
+        evaluate: Callable[[str, str], Any],
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Get `evaluate(name, text)` for each named section, reusing cached results
+
+        Returns the results by section name and the names of the sections
+        that were evaluated rather than taken from the cache.
+        """
+        results = {}
+        recomputed = []
+        for name in names:
+            text = sections.get(name) or ""
+            key = (namespace, name, hashlib.sha256(text.encode("utf-8")).hexdigest())
+            with self._lock:
+                result = self._entries.get(key)
+                if result is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+            if result is None:
+                result = evaluate(name, text)
+                recomputed.append(name)
+                with self._lock:
+                    self.misses += 1
+                    self._entries[key] = result
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            results[name] = result
+        return results, recomputed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and the current number of entries
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# Create cache instances
+document_cache = DocumentCache(
+    settings.DOCUMENT_CACHE_DIR, settings.DOCUMENT_CACHE_MAX_MB * 1024 * 1024
+)
+section_cache = SectionResultCache(settings.SECTION_CACHE_MAX_ENTRIES)
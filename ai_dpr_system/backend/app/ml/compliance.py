@@ -1,126 +1,259 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
-# Placeholder for actual NLP/Rule-based compliance checking
-# In a real implementation, this would use more sophisticated approaches
+from app.ml.cache import SectionResultCache, section_cache
+from app.ml.matcher import TRIE_MIN_KEYWORDS, KeywordMatcher
 
+# Compliance rules derived from the MDoNER DPR guidelines
+RULES_PATH = os.path.join(os.path.dirname(__file__), "rules", "compliance_rules.json")
 
-async def check_compliance(sections: Dict[str, str]) -> Dict[str, Any]:
+QUALITY_RULE_TYPES = {"min_length", "forbidden_any", "required_any"}
+CONSISTENCY_RULE_TYPES = {"forbidden_any", "required_any"}
+
+
+class ComplianceRuleEngine:
     """
-    Check compliance of a DPR against MDoNER guidelines
-    
-    This is a placeholder implementation using basic checks.
-    In a real implementation, you would use more sophisticated
-    approaches with NLP and rule-based systems.
+    Declarative compliance checks for DPR sections
+
+    Rules are loaded from data (see rules/compliance_rules.json). The
+    keywords of all rules that apply to a section are compiled into one
+    KeywordMatcher, so each section is lowercased once and searched for
+    all its keywords together, and the rules are then evaluated as set
+    lookups on the keywords found.
+
+    A section with `trie_min_keywords` keywords or more is scanned once
+    with the matcher's trie regex. Below that the matcher runs one C
+    substring search per keyword instead, which is faster in CPython for
+    small sets: the shipped rules have at most 12 keywords per section
+    and use it, while rule sets of a few hundred rules use the trie (see
+    benchmarks/bench_compliance.py). Both give the same results.
+
+    Rule types:
+    - min_length: fires when the section is shorter than `min_length`
+    - forbidden_any: fires when any of `keywords` occurs; `{keyword}` in
+      the message is the first listed keyword found
+    - required_any: fires when none of `keywords` occurs
+
+    Quality rules apply to every present required section and deduct
+    their `penalty` from its score. Consistency rules apply to their
+    `section` when it is present and deduct `inconsistency_penalty` from
+    the overall score.
+
+    Every rule looks at a single section, so a DPR is evaluated section by
+    section and the per-section results are then combined; this lets
+    re-evaluations reuse the results of unchanged sections.
     """
-    compliance_results = {
-        "overall_score": 0.0,
-        "sections_present": {},
-        "content_quality": {},
-        "inconsistencies": {},
-    }
-    
-    # Check for presence of required sections
-    required_sections = [
-        "executive_summary",
-        "project_background",
-        "scope",
-        "objectives",
-        "methodology",
-        "timeline",
-        "budget",
-        "risks",
-    ]
-    
-    section_scores = {}
-    total_section_score = 0
-    
-    for section in required_sections:
-        if section in sections and sections[section]:
-            # Section exists
+    def __init__(self, rules: Dict[str, Any], trie_min_keywords: int = TRIE_MIN_KEYWORDS):
+        self.version = rules.get("version")
+        self.fingerprint = hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()
+        self.required_sections: List[str] = list(rules["required_sections"])
+        self.section_score = rules.get("section_score", 100)
+        self.inconsistency_penalty = rules.get("inconsistency_penalty", 5)
+        self.quality_rules: List[Dict[str, Any]] = list(rules.get("quality_rules", []))
+        self.consistency_rules: List[Dict[str, Any]] = list(rules.get("consistency_rules", []))
+
+        for rule in self.quality_rules:
+            if rule["type"] not in QUALITY_RULE_TYPES:
+                raise ValueError(f"Unsupported quality rule type: {rule['type']} ({rule.get('id')})")
+        for rule in self.consistency_rules:
+            if rule["type"] not in CONSISTENCY_RULE_TYPES:
+                raise ValueError(f"Unsupported consistency rule type: {rule['type']} ({rule.get('id')})")
+
+        # One matcher per section with the keywords of every rule that applies to it
+        quality_keywords = [keyword for rule in self.quality_rules for keyword in rule.get("keywords", [])]
+        section_keywords = {section: list(quality_keywords) for section in self.required_sections}
+        for rule in self.consistency_rules:
+            section_keywords.setdefault(rule["section"], []).extend(rule.get("keywords", []))
+        self.matchers = {
+            section: KeywordMatcher(keywords, trie_min_keywords=trie_min_keywords)
+            for section, keywords in section_keywords.items()
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> "ComplianceRuleEngine":
+        """
+        Load the rules from a JSON file
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @property
+    def rule_count(self) -> int:
+        return len(self.quality_rules) + len(self.consistency_rules)
+
+    @staticmethod
+    def _apply(rule: Dict[str, Any], content: str, found: FrozenSet[str]) -> Optional[str]:
+        """
+        Evaluate one rule and return its message if it fires
+        """
+        rule_type = rule["type"]
+        if rule_type == "min_length":
+            if len(content) < rule["min_length"]:
+                return rule["message"]
+        elif rule_type == "forbidden_any":
+            for keyword in rule["keywords"]:
+                if keyword.lower() in found:
+                    return rule["message"].format(keyword=keyword)
+        elif rule_type == "required_any":
+            if not any(keyword.lower() in found for keyword in rule["keywords"]):
+                return rule["message"]
+        return None
+
+    def evaluate_section(self, section: str, content: str) -> Dict[str, Any]:
+        """
+        Evaluate the rules that look at one section
+
+        Returns the section's quality score (unclamped) and issues if it
+        is a required section, and the (rule index, message) pairs of the
+        consistency rules that fire on it.
+        """
+        # Scan the section once for the keywords of all its rules
+        found = self.matchers[section].find(content) if content else frozenset()
+
+        result: Dict[str, Any] = {"inconsistencies": []}
+        if section in self.required_sections:
+            if not content:
+                result["quality_score"] = 0
+                result["details"] = {
+                    "present": False,
+                    "score": 0,
+                    "issues": ["Section missing"]
+                }
+            else:
+                issues = []
+                quality_score = self.section_score
+                for rule in self.quality_rules:
+                    message = self._apply(rule, content, found)
+                    if message is not None:
+                        issues.append(message)
+                        quality_score -= rule["penalty"]
+
+                result["quality_score"] = quality_score
+                result["details"] = {
+                    "present": True,
+                    "score": max(0, quality_score),
+                    "issues": issues
+                }
+
+        if content:
+            for index, rule in enumerate(self.consistency_rules):
+                if rule["section"] != section:
+                    continue
+                message = self._apply(rule, content, found)
+                if message is not None:
+                    result["inconsistencies"].append((index, message))
+
+        return result
+
+    def evaluate(self, sections: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Check the compliance of one DPR's extracted sections
+        """
+        return self._combine({
+            section: self.evaluate_section(section, sections.get(section) or "")
+            for section in self.matchers
+        })
+
+    def evaluate_incremental(
+        self, sections: Dict[str, str], cache: SectionResultCache
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Check the compliance of one DPR, reusing the results of sections seen before
+
+        Returns the compliance results and the names of the sections that
+        were evaluated rather than taken from the cache.
+        """
+        section_results, recomputed = cache.map_sections(
+            f"compliance:{self.fingerprint}", self.matchers, sections, self.evaluate_section
+        )
+        return self._combine(section_results), recomputed
+
+    def _combine(self, section_results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combine per-section results into the compliance results of a DPR
+        """
+        section_scores = {}
+        total_section_score = 0
+        for section in self.required_sections:
+            result = section_results[section]
+            details = result["details"]
             section_scores[section] = {
-                "present": True,
-                "score": 100,
-                "issues": []
+                "present": details["present"],
+                "score": details["score"],
+                "issues": list(details["issues"])
             }
-            total_section_score += 100
+            total_section_score += result["quality_score"]
+
+        # Timeline, budget and other inconsistencies, in rule order
+        inconsistencies = [
+            message
+            for _, message in sorted(
+                item for result in section_results.values() for item in result["inconsistencies"]
+            )
+        ]
+
+        # Calculate overall score
+        if self.required_sections:
+            overall_score = total_section_score / (len(self.required_sections) * self.section_score) * 100
         else:
-            # Section missing
-            section_scores[section] = {
-                "present": False,
-                "score": 0,
-                "issues": ["Section missing"]
-            }
-            total_section_score += 0
-    
-    # Check content quality for each section
-    for section, content in sections.items():
-        if section == "full_text" or not content:
-            continue
-            
-        issues = []
-        quality_score = 100
-        
-        # Check content length
-        if len(content) < 100:
-            issues.append("Section content is too brief")
-            quality_score -= 30
-        
-        # Check for placeholder text
-        placeholder_patterns = ["lorem ipsum", "to be filled", "tbd", "tba"]
-        for pattern in placeholder_patterns:
-            if pattern in content.lower():
-                issues.append(f"Contains placeholder text: '{pattern}'")
-                quality_score -= 20
-                break
-        
-        # Store content quality results
-        if section in section_scores:
-            section_scores[section]["issues"].extend(issues)
-            section_scores[section]["score"] = max(0, quality_score)
-            total_section_score = total_section_score - 100 + quality_score
-    
-    # Check for timeline and budget inconsistencies
-    inconsistencies = []
-    
-    # Example: Check timeline format
-    if "timeline" in sections and sections["timeline"]:
-        timeline = sections["timeline"].lower()
-        if "months" not in timeline and "weeks" not in timeline and "days" not in timeline:
-            inconsistencies.append("Timeline lacks specific time units (days/weeks/months)")
-        if "start" not in timeline and "begin" not in timeline:
-            inconsistencies.append("Timeline lacks clear start date/milestone")
-        if "end" not in timeline and "complete" not in timeline and "finish" not in timeline:
-            inconsistencies.append("Timeline lacks clear end date/milestone")
-    
-    # Example: Check budget format
-    if "budget" in sections and sections["budget"]:
-        budget = sections["budget"].lower()
-        if "rs." not in budget and "inr" not in budget and "rupees" not in budget:
-            inconsistencies.append("Budget lacks clear currency indicators")
-        if "total" not in budget:
-            inconsistencies.append("Budget lacks clear total cost")
-    
-    # Calculate overall score
-    if required_sections:
-        overall_score = total_section_score / (len(required_sections) * 100) * 100
-    else:
-        overall_score = 0
-    
-    # Adjust score based on inconsistencies
-    if inconsistencies:
-        overall_score = max(0, overall_score - (len(inconsistencies) * 5))
-    
-    # Compile final results
-    compliance_results = {
-        "overall_score": overall_score,
-    }
-    
-    # Add section details
-    for section, details in section_scores.items():
-        compliance_results[section] = details
-    
-    # Add inconsistencies
-    if inconsistencies:
-        compliance_results["inconsistencies"] = inconsistencies
+            overall_score = 0
+
+        # Adjust score based on inconsistencies
+        if inconsistencies:
+            overall_score = max(0, overall_score - (len(inconsistencies) * self.inconsistency_penalty))
+
+        # Compile final results
+        compliance_results = {
+            "overall_score": overall_score,
+        }
+
+        # Add section details
+        for section, details in section_scores.items():
+            compliance_results[section] = details
+
+        # Add inconsistencies
+        if inconsistencies:
+            compliance_results["inconsistencies"] = inconsistencies
+
+        return compliance_results
+
+    def evaluate_batch(self, sections_list: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Check the compliance of many DPRs with the same compiled rules
+        """
+        return [self.evaluate(sections) for sections in sections_list]
+
+
+# Create engine instance
+compliance_engine = ComplianceRuleEngine.from_file(RULES_PATH)
+
+
+async def check_compliance(sections: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Check compliance of a DPR against MDoNER guidelines
     
+    Sections are checked against the declarative rules in
+    rules/compliance_rules.json.
+    """
+    compliance_results, _ = await check_compliance_incremental(sections)
     return compliance_results
+
+
+async def check_compliance_incremental(sections: Dict[str, str]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Check compliance of a DPR, reusing the results of unchanged sections
+
+    Returns the compliance results and the names of the sections that
+    were checked again.
+    """
+    return compliance_engine.evaluate_incremental(sections, section_cache)
+
+
+async def check_compliance_batch(sections_list: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Check compliance of many DPRs, off the event loop
+    """
+    return await asyncio.to_thread(compliance_engine.evaluate_batch, sections_list)
@@ -7,6 +7,38 @@ from typing import Any, Dict, List, Optional, Tuple
 # from transformers import AutoTokenizer, AutoModel
 
 
+# Header phrases for the common sections in DPRs. Longer alternatives
+# come first so that e.g. "risk assessment" wins over "risk".
+SECTION_HEADERS = {
+    "executive_summary": r"executive\s+summary",
+    "project_background": r"project\s+background|introduction|background",
+    "scope": r"scope\s+of\s+work|project\s+scope|scope",
+    "objectives": r"objectives|goals|aims",
+    "methodology": r"implementation\s+approach|methodology|approach",
+    "timeline": r"project\s+timeline|timeline|schedule",
+    "budget": r"financial\s+details|project\s+cost|budget|cost",
+    "risks": r"risks?\s+assessment|risk\s+factors|risks?",
+    "environmental_impact": r"environmental\s+impact|environmental|environment",
+    "resources": r"resource\s+requirements|resources|manpower",
+    "stakeholders": r"stakeholder\s+analysis|stakeholders",
+    "conclusion": r"conclusion|summary",
+}
+
+# All headers compiled into a single alternation so the document is scanned
+# once. A header is a line (optionally numbered, e.g. "3.1") holding just the
+# header phrase, optionally followed by a colon and inline content. Other
+# all-caps lines are matched as unnamed headers so they end the section
+# before them.
+_HEADER_RE = re.compile(
+    r"^[ \t]*(?:\d+(?:\.\d+)*[.)]?[ \t]+)?"
+    r"(?:"
+    + "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_HEADERS.items())
+    + r"|(?P<_other>(?-i:[A-Z][A-Z \t]{2,}))"
+    r")[ \t]*(?::|$)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
 async def extract_sections(text_content: str) -> Dict[str, str]:
     """
     Extract sections from the DPR document using NLP
@@ -14,34 +46,31 @@ async def extract_sections(text_content: str) -> Dict[str, str]:
     This is a placeholder implementation using regex patterns.
     In a real implementation, you would use a more sophisticated
     approach with transformer models like BERT or RoBERTa.
-    """
-    sections = {}
     
-    # Simple regex patterns to identify common sections in DPRs
-    # These would be replaced with more sophisticated NLP approaches
-    section_patterns = {
-        "executive_summary": r"(?i)executive\s+summary[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "project_background": r"(?i)(project\s+background|introduction|background)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "scope": r"(?i)(scope(\s+of\s+work)?|project\s+scope)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "objectives": r"(?i)(objectives|goals|aims)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "methodology": r"(?i)(methodology|approach|implementation\s+approach)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "timeline": r"(?i)(timeline|schedule|project\s+timeline)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "budget": r"(?i)(budget|cost|financial\s+details|project\s+cost)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "risks": r"(?i)(risks?(\s+assessment)?|risk\s+factors)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "environmental_impact": r"(?i)(environmental(\s+impact)?|environment)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "resources": r"(?i)(resources|resource\s+requirements|manpower)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "stakeholders": r"(?i)(stakeholders|stakeholder\s+analysis)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
-        "conclusion": r"(?i)(conclusion|summary)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n]|$)",
-    }
+    Header positions are found in a single pass and each section runs
+    from the end of its header to the start of the next header, so the
+    cost is linear in the length of the text. When a section header
+    appears more than once, the first occurrence is used.
+    """
+    sections = {name: "" for name in SECTION_HEADERS}
+    found = set()
     
-    # Extract each section using regex
-    for section_name, pattern in section_patterns.items():
-        match = re.search(pattern, text_content, re.DOTALL)
-        if match:
-            section_text = match.group(1).strip()
-            sections[section_name] = section_text
+    previous_name = None
+    previous_end = 0
+    for match in _HEADER_RE.finditer(text_content):
+        if previous_name is not None:
+            sections[previous_name] = text_content[previous_end:match.start()].strip()
+        
+        name = match.lastgroup
+        if name in SECTION_HEADERS and name not in found:
+            found.add(name)
+            previous_name = name
+            previous_end = match.end()
         else:
-            sections[section_name] = ""
+            previous_name = None
+    
+    if previous_name is not None:
+        sections[previous_name] = text_content[previous_end:].strip()
     
     # Add the full text as well
     sections["full_text"] = text_content
@@ -0,0 +1,263 @@
+"""
+Risk model inference with request micro-batching
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RiskInferenceEngine:
+    """
+    Serves the risk model published in a risk_model artifact store
+
+    Concurrent predictions are queued and coalesced into micro-batches:
+    a batch is sent to the model as soon as it has `max_batch_size`
+    requests or `max_wait_ms` after its first request, whichever comes
+    first. The model is loaded once and reloaded when a new version is
+    activated in the store. Without risk_model installed or without a
+    published model, `predict` returns None and callers fall back to the
+    heuristic; the reason is logged whenever it changes.
+    """
+    def __init__(
+        self,
+        model_dir: Optional[str],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        reload_interval: float = 30.0,
+        latency_window: int = 1000,
+    ):
+        self.model_dir = model_dir
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.reload_interval = reload_interval
+        self._store = None
+        self._processor = None
+        self._model = None
+        self._unavailable_reason: Optional[str] = None
+        self._last_reload_check: Optional[float] = None
+        self._reload_lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._batch_sizes: Counter = Counter()
+        self._requests = 0
+        self._fallbacks = 0
+        self._errors = 0
+
+    def _set_unavailable(self, reason: Optional[str]) -> None:
+        if reason is not None and reason != self._unavailable_reason:
+            logger.error("Risk model unavailable, falling back to the heuristic: %s", reason)
+        self._unavailable_reason = reason
+
+    def _reload_due(self) -> bool:
+        return (
+            self._last_reload_check is None
+            or time.monotonic() - self._last_reload_check >= self.reload_interval
+        )
+
+    def _refresh_model(self) -> None:
+        """
+        Load the active model version, or reload it if a new one was activated
+        """
+        with self._reload_lock:
+            if self._reload_due():
+                self._last_reload_check = time.monotonic()
+                self._load_active_model()
+
+    def _load_active_model(self) -> None:
+        if self._store is None:
+            try:
+                from risk_model.artifact_store import ArtifactStore
+                from risk_model.config import get_config
+                from risk_model.data_preprocessing import DPRDocumentProcessor
+            except ImportError as e:
+                self._set_unavailable(f"risk_model is not importable: {e}")
+                return
+            self._store = ArtifactStore(self.model_dir)
+            self._processor = DPRDocumentProcessor(get_config())
+
+        try:
+            model = self._store.reload_if_changed(self._model)
+        except Exception as e:
+            # Keep serving the current model if the new version cannot be loaded
+            logger.exception("Failed to load the active risk model version")
+            self._set_unavailable(f"Failed to load risk model: {type(e).__name__}: {e}")
+            return
+
+        if model is None:
+            self._set_unavailable("No risk model version is published")
+        elif model.estimator is None:
+            model = None
+            self._set_unavailable("The active risk model version has no estimator")
+        else:
+            self._set_unavailable(None)
+        self._model = model
+
+    def _predict_batch(self, batch: List[Dict[str, str]]) -> Tuple[List[float], str]:
+        """
+        Predict overall risk scores (0-100) for a batch of extracted sections
+        """
+        model = self._model
+        documents = [
+            self._processor.process_text(
+                sections.get("full_text") or " ".join(sections.values())
+            )
+            for sections in batch
+        ]
+        features = model.extractor.extract_features_batch(documents)
+
+        estimator = model.estimator
+        if hasattr(estimator, "predict_proba"):
+            # Classifiers: probability of the highest risk class
+            scores = estimator.predict_proba(features)[:, -1] * 100
+        else:
+            scores = estimator.predict(features)
+
+        return [min(max(float(score), 0.0), 100.0) for score in scores], model.version
+
+    async def predict(self, extracted_sections: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Predict the overall risk of a DPR from its extracted sections
+
+        Returns a dictionary with the `overall_risk` score and the
+        `model_version`, or None when no model is available.
+        """
+        self._requests += 1
+        if not self.model_dir:
+            self._set_unavailable("RISK_MODEL_DIR is not set")
+            self._fallbacks += 1
+            return None
+
+        if self._reload_due():
+            await asyncio.to_thread(self._refresh_model)
+        if self._model is None:
+            self._fallbacks += 1
+            return None
+
+        loop = asyncio.get_running_loop()
+        if self._batcher is None or self._batcher.done():
+            # Requests queued for a batcher that died would otherwise wait forever
+            if self._queue is not None:
+                self._fail_queued(self._queue, RuntimeError("Risk inference batcher stopped"))
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._run_batches(self._queue))
+
+        future = loop.create_future()
+        await self._queue.put((extracted_sections, future, time.perf_counter()))
+        try:
+            score, version = await future
+        except Exception:
+            self._errors += 1
+            self._fallbacks += 1
+            logger.exception("Risk model prediction failed, falling back to the heuristic")
+            return None
+        return {"overall_risk": score, "model_version": version}
+
+    async def _run_batches(self, queue: asyncio.Queue) -> None:
+        """
+        Collect queued requests into batches and predict them until cancelled
+
+        When the task ends, for whatever reason, the requests of the batch
+        in progress and those still queued are failed, so that no caller
+        waits on a future that will never be resolved.
+        """
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[Dict[str, str], asyncio.Future, float]] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                self._batch_sizes[len(batch)] += 1
+                try:
+                    scores, version = await asyncio.to_thread(
+                        self._predict_batch, [sections for sections, _, _ in batch]
+                    )
+                except Exception as e:
+                    for _, future, _ in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                finished = time.perf_counter()
+                for (_, future, queued_at), score in zip(batch, scores):
+                    self._latencies.append(finished - queued_at)
+                    if not future.done():
+                        future.set_result((score, version))
+        except Exception:
+            logger.exception("Risk inference batcher failed")
+        finally:
+            error = RuntimeError("Risk inference batcher stopped")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            self._fail_queued(queue, error)
+
+    @staticmethod
+    def _fail_queued(queue: asyncio.Queue, error: Exception) -> None:
+        while not queue.empty():
+            _, future, _ = queue.get_nowait()
+            if not future.done():
+                future.set_exception(error)
+
+    async def stop(self) -> None:
+        """
+        Stop the batching task
+        """
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+            self._batcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get model status, latency percentiles and the batch size histogram
+        """
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))
+            return latencies[index] * 1000
+
+        return {
+            "model_version": self._model.version if self._model else None,
+            "unavailable_reason": self._unavailable_reason,
+            "requests": self._requests,
+            "fallbacks": self._fallbacks,
+            "errors": self._errors,
+            "batches": sum(self._batch_sizes.values()),
+            "batch_size_histogram": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+            "latency_ms": {
+                "p50": percentile(50),
+                "p99": percentile(99),
+                "samples": len(latencies),
+            },
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+# Create engine instance
+risk_engine = RiskInferenceEngine(
+    settings.RISK_MODEL_DIR,
+    max_batch_size=settings.RISK_BATCH_SIZE,
+    max_wait_ms=settings.RISK_BATCH_WAIT_MS,
+    reload_interval=settings.RISK_MODEL_RELOAD_INTERVAL,
+)
@@ -0,0 +1,100 @@
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+# Keyword sets at least this large are matched with the trie regex; smaller
+# ones with one substring search each. The crossover depends on the keywords
+# and the text: about 200-300 keywords in benchmarks/bench_matcher.py, under
+# 100 for the synthetic rules of benchmarks/bench_compliance.py
+TRIE_MIN_KEYWORDS = 150
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Build a regex matching any of the keywords, factored into a trie
+
+    Alternatives share their common prefixes (e.g. "mile(?:age|stone)"),
+    so the regex engine follows one branch per character instead of
+    trying every keyword at every position. At each position the longest
+    keyword wins.
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def emit(node: Dict[str, Any]) -> str:
+        children = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not children:
+            return ""
+        is_end = "" in node
+        if len(children) == 1 and not is_end:
+            return children[0]
+        group = "(?:" + "|".join(children) + ")"
+        return group + "?" if is_end else group
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Finds which of a fixed set of keywords occur in a text
+
+    Large keyword sets are compiled into a single trie-shaped regex, so
+    the cost of a scan barely depends on the number of keywords. A search
+    is started at every position after the previous match, so overlapping
+    keywords are all found; a keyword that is a prefix of a longer keyword
+    matching at the same position is recorded along with it. Matching is
+    case-insensitive substring matching, the same as checking
+    `keyword in text.lower()` for every keyword.
+
+    The regex engine pays an interpreter cost at every position of the
+    text, so below `trie_min_keywords` keywords it is faster in CPython to
+    run the C substring search once per keyword on the lowercased text.
+    The results are the same either way.
+    """
+    def __init__(self, keywords: Iterable[str], trie_min_keywords: int = TRIE_MIN_KEYWORDS):
+        self.keywords: FrozenSet[str] = frozenset(keyword.lower() for keyword in keywords if keyword)
+        self._keywords = tuple(sorted(self.keywords))
+        self._implied: Dict[str, List[str]] = {}
+        self._pattern: Optional["re.Pattern[str]"] = None
+
+        if self.keywords and len(self.keywords) >= trie_min_keywords:
+            # keyword -> itself plus every shorter keyword it starts with
+            self._implied = {
+                keyword: [other for other in self.keywords if keyword.startswith(other)]
+                for keyword in self.keywords
+            }
+            self._pattern = re.compile(_trie_pattern(self.keywords))
+
+    @property
+    def strategy(self) -> str:
+        """
+        How `find` searches: "trie" or "per keyword"
+        """
+        return "trie" if self._pattern is not None else "per keyword"
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """
+        Get the set of keywords that occur in a text
+        """
+        if not self.keywords or not text:
+            return frozenset()
+
+        text = text.lower()
+        if self._pattern is None:
+            return frozenset(filter(text.__contains__, self._keywords))
+
+        search = self._pattern.search
+        implied = self._implied
+        found = set()
+        match = search(text)
+        while match is not None:
+            keyword = match.group()
+            if keyword not in found:
+                found.update(implied[keyword])
+                if len(found) == len(self.keywords):
+                    break
+            match = search(text, match.start() + 1)
+        return frozenset(found)
@@ -1,60 +1,388 @@
+import asyncio
+import hashlib
 import io
+import multiprocessing
 import os
-from typing import Any, Dict, List, Optional, Union
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import PyPDF2
 import pytesseract
-from pdf2image import convert_from_path, convert_from_bytes
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
 
+from app.core.config import settings
+from app.ml.cache import document_cache, file_sha256
+
+# Process pool shared by every OCR call in this server process.
+# It is created lazily so that importing this module stays cheap.
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    """
+    Get (or create) the bounded process pool used for page OCR
+    """
+    global _ocr_pool
+    if _ocr_pool is None:
+        # Use "spawn" so workers don't inherit the threads of the web server
+        _ocr_pool = ProcessPoolExecutor(
+            max_workers=max(1, settings.OCR_WORKERS),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _ocr_pool
+
+
+def shutdown_ocr_pool() -> None:
+    """
+    Shut down the OCR process pool (called on application shutdown)
+    """
+    global _ocr_pool
+    if _ocr_pool is not None:
+        _ocr_pool.shutdown(wait=False, cancel_futures=True)
+        _ocr_pool = None
+
+
+def _ocr_page(img: Image.Image, lang: str, timeout: int) -> Optional[str]:
+    """
+    Run OCR on a single page image
+
+    Executed inside a pool worker process. Returns None when the page
+    timed out.
+    """
+    try:
+        return pytesseract.image_to_string(img, lang=lang, timeout=timeout)
+    except pytesseract.TesseractError:
+        raise
+    except RuntimeError:
+        # pytesseract kills Tesseract and raises RuntimeError when the page
+        # exceeds the timeout; keep the page blank instead of failing the DPR
+        return None
+
 
 async def process_document(file_path: str) -> str:
     """
     Process a document with OCR if needed
-    
-    This function handles PDF files by converting them to images
-    and then running OCR on each page.
-    
+
+    This function handles PDF files by using the embedded text layer
+    where it is usable and running OCR on the remaining pages.
+
     For text files, it simply reads the content.
     """
+    document = await load_document(file_path)
+    return document["text"]
+
+
+async def load_document(file_path: str) -> Dict[str, Any]:
+    """
+    Load a document and return its text along with per-page details
+
+    The result has the form {"key": str, "text": str, "pages": [...],
+    "cached": bool, "ocr_pages": [...], "reused_ocr_pages": [...]},
+    where each page is {"page": int, "text": str, "method": "text_layer"
+    | "ocr", "fingerprint": str}. Non-PDF documents have no page entries.
+    `key` addresses the document in the document cache; files with
+    identical bytes are only processed once.
+
+    Page fingerprints are the SHA-256 of the page text for text layer
+    pages and of the rendered image for OCR pages. OCR results are also
+    cached per page image, so when a changed file is uploaded only its
+    new or changed pages are OCRed. `ocr_pages` lists the pages OCRed by
+    this call and `reused_ocr_pages` those whose OCR text was reused.
+    """
+    local_path, is_temp = await _get_local_copy(file_path)
+    try:
+        content_hash = await asyncio.to_thread(file_sha256, local_path)
+        key = document_cache.make_key(content_hash)
+
+        cached = await asyncio.to_thread(document_cache.get, key, "pages")
+        if cached is not None:
+            pages = cached["pages"]
+            text = cached["text"] if "text" in cached else _join_pages([page["text"] for page in pages])
+            return {
+                "key": key,
+                "text": text,
+                "pages": pages,
+                "cached": True,
+                "ocr_pages": [],
+                "reused_ocr_pages": [page["page"] for page in pages if page["method"] == "ocr"],
+            }
+
+        if file_path.lower().endswith(".pdf"):
+            pages, ocr_pages = await _process_pdf(local_path)
+            text = _join_pages([page["text"] for page in pages])
+            entry = {"pages": pages}
+        else:
+            # Assume it's a text file
+            text = await asyncio.to_thread(_read_text_file, local_path)
+            pages, ocr_pages = [], []
+            entry = {"text": text, "pages": pages}
+
+        await asyncio.to_thread(document_cache.put, key, "pages", entry)
+        return {
+            "key": key,
+            "text": text,
+            "pages": pages,
+            "cached": False,
+            "ocr_pages": ocr_pages,
+            "reused_ocr_pages": [
+                page["page"] for page in pages
+                if page["method"] == "ocr" and page["page"] not in ocr_pages
+            ],
+        }
+    finally:
+        if is_temp:
+            os.remove(local_path)
+
+
+async def _get_local_copy(file_path: str) -> Tuple[str, bool]:
+    """
+    Get a local path for a stored file, returning (path, is_temporary)
+
+    S3 objects are spooled to a temporary file that the caller must remove.
+    """
     # Check if the file is in S3 or local
     if file_path.startswith("s3://"):
         # For S3, we need to download the file first
-        from app.core.storage import get_file_from_storage
-        file_obj = await get_file_from_storage(file_path)
-        if not file_obj:
+        from app.core.storage import download_file_from_storage, get_file_size
+        if await get_file_size(file_path) is None:
             raise FileNotFoundError(f"File not found: {file_path}")
-        
-        if file_path.lower().endswith(".pdf"):
-            # Convert PDF to images
-            images = convert_from_bytes(file_obj.read())
-            return await _process_images(images)
+
+        fd, local_path = tempfile.mkstemp(suffix=os.path.splitext(file_path)[1])
+        os.close(fd)
+        try:
+            await download_file_from_storage(file_path, local_path)
+        except BaseException:
+            os.remove(local_path)
+            raise
+        return local_path, True
+
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    return file_path, False
+
+
+def _read_text_file(file_path: str) -> str:
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _rasterize(pdf_path: str, first_page: int, last_page: int) -> List[Image.Image]:
+    """
+    Render a window of PDF pages to images
+    """
+    return convert_from_path(pdf_path, first_page=first_page, last_page=last_page)
+
+
+def _read_text_layer(pdf_path: str) -> List[str]:
+    """
+    Extract the embedded text of every page of a PDF
+
+    Executed inside a pool worker process. Pages that cannot be parsed
+    come back empty so that they are sent to OCR.
+    """
+    reader = PyPDF2.PdfReader(pdf_path)
+    page_texts = []
+    for page in reader.pages:
+        try:
+            page_texts.append(page.extract_text() or "")
+        except Exception:
+            page_texts.append("")
+    return page_texts
+
+
+def _has_usable_text(text: str) -> bool:
+    """
+    Decide whether a page's embedded text is good enough to skip OCR
+
+    Scanned pages have no text layer, and broken font encodings show up
+    as replacement or control characters.
+    """
+    visible = [ch for ch in text if not ch.isspace()]
+    if len(visible) < settings.OCR_TEXT_LAYER_MIN_CHARS:
+        return False
+
+    garbage = sum(1 for ch in visible if ch == "\ufffd" or not ch.isprintable())
+    return garbage / len(visible) < 0.1
+
+
+def _text_fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _image_fingerprint(img: Image.Image) -> str:
+    """
+    Hash the pixels of a rendered page, along with its mode and size
+    """
+    digest = hashlib.sha256(f"{img.mode}:{img.width}x{img.height}:".encode("utf-8"))
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+def _image_fingerprints(images: List[Image.Image]) -> List[str]:
+    return [_image_fingerprint(img) for img in images]
+
+
+async def _process_pdf(pdf_path: str) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """
+    Get the text of every page of a PDF, OCRing only pages that need it
+
+    Returns the pages and the numbers of the pages that were OCRed, which
+    excludes pages whose OCR text was found in the page cache.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        text_layer = await loop.run_in_executor(_get_ocr_pool(), _read_text_layer, pdf_path)
+    except BrokenProcessPool:
+        shutdown_ocr_pool()
+        raise
+    except Exception:
+        # PyPDF2 could not parse the file (e.g. encrypted); OCR every page
+        info = await asyncio.to_thread(pdfinfo_from_path, pdf_path)
+        text_layer = [""] * int(info["Pages"])
+
+    pages = []
+    ocr_page_numbers = []
+    for page_number, page_text in enumerate(text_layer, start=1):
+        if _has_usable_text(page_text):
+            pages.append({
+                "page": page_number,
+                "text": page_text,
+                "method": "text_layer",
+                "fingerprint": _text_fingerprint(page_text),
+            })
         else:
-            # Assume it's a text file
-            return file_obj.read().decode("utf-8")
-    else:
-        # Local file
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        if file_path.lower().endswith(".pdf"):
-            # Convert PDF to images
-            images = convert_from_path(file_path)
-            return await _process_images(images)
+            pages.append({"page": page_number, "text": "", "method": "ocr", "fingerprint": None})
+            ocr_page_numbers.append(page_number)
+
+    ocr_pages = []
+    if ocr_page_numbers:
+        ocr_results = await _ocr_pdf_pages(pdf_path, ocr_page_numbers)
+        for page_number, (page_text, fingerprint, reused) in ocr_results.items():
+            pages[page_number - 1]["text"] = page_text
+            pages[page_number - 1]["fingerprint"] = fingerprint
+            if not reused:
+                ocr_pages.append(page_number)
+
+    return pages, ocr_pages
+
+
+def _page_windows(page_numbers: List[int], window: int) -> List[Tuple[int, int]]:
+    """
+    Group sorted page numbers into contiguous (first, last) runs of at most `window` pages
+    """
+    windows = []
+    for page_number in page_numbers:
+        if windows:
+            first_page, last_page = windows[-1]
+            if page_number == last_page + 1 and page_number - first_page < window:
+                windows[-1] = (first_page, page_number)
+                continue
+        windows.append((page_number, page_number))
+    return windows
+
+
+def _get_cached_page_texts(fingerprints: List[str]) -> List[Optional[str]]:
+    texts = []
+    for fingerprint in fingerprints:
+        entry = document_cache.get(document_cache.make_key(fingerprint), "page")
+        texts.append(entry["text"] if entry is not None else None)
+    return texts
+
+
+def _put_cached_page_texts(entries: List[Tuple[str, str]]) -> None:
+    for fingerprint, text in entries:
+        document_cache.put(document_cache.make_key(fingerprint), "page", {"text": text})
+
+
+async def _ocr_pdf_pages(pdf_path: str, page_numbers: List[int]) -> Dict[int, Tuple[str, str, bool]]:
+    """
+    Rasterize and OCR the given PDF pages in windows of OCR_RASTER_WINDOW pages
+
+    Only the current window and the one being prefetched are held in
+    memory, so peak memory does not grow with the page count.
+
+    Rendered pages are fingerprinted and looked up in the page cache
+    first, so only pages that were never OCRed under the current OCR
+    settings are sent to Tesseract. Returns (text, fingerprint, reused)
+    for each page.
+    """
+    windows = _page_windows(page_numbers, max(1, settings.OCR_RASTER_WINDOW))
+
+    page_results: Dict[int, Tuple[str, str, bool]] = {}
+    next_images = None
+    for i, (first_page, last_page) in enumerate(windows):
+        if next_images is None:
+            images = await asyncio.to_thread(_rasterize, pdf_path, first_page, last_page)
         else:
-            # Assume it's a text file
-            with open(file_path, "r", encoding="utf-8") as f:
-                return f.read()
+            images = await next_images
+
+        # Render the next window while this one is being OCRed
+        next_images = None
+        if i + 1 < len(windows):
+            next_images = asyncio.ensure_future(
+                asyncio.to_thread(_rasterize, pdf_path, *windows[i + 1])
+            )
+
+        try:
+            fingerprints = await asyncio.to_thread(_image_fingerprints, images)
+            texts = await asyncio.to_thread(_get_cached_page_texts, fingerprints)
+            missing = [j for j, text in enumerate(texts) if text is None]
+            if missing:
+                ocr_texts = await _ocr_images([images[j] for j in missing])
+                for j, text in zip(missing, ocr_texts):
+                    texts[j] = text
+                # Timed out pages are left blank but not cached, so they are retried next time
+                await asyncio.to_thread(_put_cached_page_texts, [
+                    (fingerprints[j], texts[j]) for j in missing if texts[j] is not None
+                ])
+        except BaseException:
+            if next_images is not None:
+                next_images.cancel()
+            raise
+        finally:
+            for img in images:
+                img.close()
+            del images
+
+        for j, page_number in enumerate(range(first_page, last_page + 1)):
+            page_results[page_number] = (texts[j] or "", fingerprints[j], j not in missing)
+
+    return page_results
+
 
+async def _ocr_images(images: List[Image.Image]) -> List[Optional[str]]:
+    """
+    OCR a list of page images, returning the text of each page in order
+    (None for pages that timed out)
+
+    Pages are OCRed in parallel on the process pool so the event loop
+    stays free.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_ocr_pool()
 
-async def _process_images(images: List[Image.Image]) -> str:
+    try:
+        return await asyncio.gather(*[
+            loop.run_in_executor(
+                pool, _ocr_page, img, settings.OCR_LANGUAGES, settings.OCR_PAGE_TIMEOUT
+            )
+            for img in images
+        ])
+    except BrokenProcessPool:
+        # A worker died (e.g. killed by the OOM killer); start fresh next time
+        shutdown_ocr_pool()
+        raise
+
+
+def _join_pages(page_texts: List[str]) -> str:
     """
-    Process a list of images with OCR
+    Assemble per-page text into the '--- Page N ---' document layout
     """
     text_content = []
-    
-    for i, img in enumerate(images):
-        # Run OCR on each image
-        page_text = pytesseract.image_to_string(img, lang="eng+hin+asm")
+    for i, page_text in enumerate(page_texts):
         text_content.append(f"--- Page {i+1} ---\n{page_text}\n")
-    
+
     return "\n".join(text_content)
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Any, Dict, Tuple
+
+from app.ml.cache import document_cache
+from app.ml.extraction import extract_sections
+from app.ml.ocr import load_document
+
+
+async def analyze_document(file_path: str) -> Dict[str, str]:
+    """
+    Get the extracted sections of a stored DPR file
+
+    OCR and section extraction results are cached by file content, so
+    evaluating identical bytes again skips both steps.
+    """
+    sections, _ = await analyze_document_incremental(file_path)
+    return sections
+
+
+async def analyze_document_incremental(file_path: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Get the extracted sections of a stored DPR file and what was recomputed
+
+    Besides whole-file caching, OCR results are cached per page image, so
+    a changed file only has its new or changed pages OCRed. Returns the
+    sections and a report of the pages that were OCRed or reused.
+    """
+    document = await load_document(file_path)
+
+    sections = await asyncio.to_thread(document_cache.get, document["key"], "sections")
+    if sections is None:
+        sections = await extract_sections(document["text"])
+        await asyncio.to_thread(document_cache.put, document["key"], "sections", sections)
+
+    report = {
+        "document_cached": document["cached"],
+        "pages": len(document["pages"]),
+        "ocr_pages": document["ocr_pages"],
+        "reused_ocr_pages": document["reused_ocr_pages"],
+    }
+    return sections, report
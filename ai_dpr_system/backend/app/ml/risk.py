@@ -1,201 +1,220 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
-import numpy as np
-# Placeholder for actual ML model imports
-# import pandas as pd
-# from sklearn.ensemble import RandomForestRegressor
-# import xgboost as xgb
+from app.ml.cache import SectionResultCache, section_cache
+from app.ml.inference import risk_engine
+from app.ml.matcher import KeywordMatcher
+
+# Heuristic risk factors, trigger phrases, weights and recommendations
+RULES_PATH = os.path.join(os.path.dirname(__file__), "rules", "risk_rules.json")
+
+# Most (section, trigger phrases found) combinations whose factor results are kept
+MAX_MEMOIZED_RESULTS = 4096
 
 
 async def predict_risk(extracted_sections: Dict[str, str]) -> Dict[str, Any]:
     """
     Predict risk factors for a DPR based on extracted sections
     
-    This is a placeholder implementation using basic heuristics.
-    In a real implementation, you would use trained ML models.
+    The overall risk comes from the trained risk model when one is
+    published (see app.ml.inference); the per-factor scores, details and
+    recommendations come from the heuristic rules, which also provide the
+    overall risk when no model is available.
     """
-    # Initialize risk factors
-    risk_factors = {
-        "cost_overrun": 0.0,
-        "schedule_delay": 0.0,
-        "resource_shortage": 0.0,
-        "environmental_risk": 0.0,
-        "scope_creep": 0.0,
-    }
-    
-    risk_details = {}
-    
-    # Extract budget information
-    budget_text = extracted_sections.get("budget", "")
-    if budget_text:
-        # Check for budget risk factors
-        if "contingency" not in budget_text.lower():
-            risk_factors["cost_overrun"] += 30
-            risk_details["cost_overrun"] = {"missing_contingency": "No contingency budget mentioned"}
-        
-        if "breakdown" not in budget_text.lower() and "detailed" not in budget_text.lower():
-            risk_factors["cost_overrun"] += 25
-            if "cost_overrun" not in risk_details:
-                risk_details["cost_overrun"] = {}
-            risk_details["cost_overrun"]["lack_of_detail"] = "Budget lacks detailed breakdown"
-    else:
-        risk_factors["cost_overrun"] = 75
-        risk_details["cost_overrun"] = {"missing_budget": "Budget section is missing"}
-    
-    # Extract timeline information
-    timeline_text = extracted_sections.get("timeline", "")
-    if timeline_text:
-        # Check for timeline risk factors
-        if "milestone" not in timeline_text.lower():
-            risk_factors["schedule_delay"] += 30
-            risk_details["schedule_delay"] = {"missing_milestones": "No clear milestones mentioned"}
-        
-        if "dependency" not in timeline_text.lower() and "dependent" not in timeline_text.lower():
-            risk_factors["schedule_delay"] += 25
-            if "schedule_delay" not in risk_details:
-                risk_details["schedule_delay"] = {}
-            risk_details["schedule_delay"]["missing_dependencies"] = "No task dependencies mentioned"
-    else:
-        risk_factors["schedule_delay"] = 75
-        risk_details["schedule_delay"] = {"missing_timeline": "Timeline section is missing"}
-    
-    # Extract resources information
-    resources_text = extracted_sections.get("resources", "")
-    if resources_text:
-        # Check for resource risk factors
-        if "allocation" not in resources_text.lower() and "assign" not in resources_text.lower():
-            risk_factors["resource_shortage"] += 35
-            risk_details["resource_shortage"] = {"poor_allocation": "Resource allocation not clearly defined"}
-        
-        if "skill" not in resources_text.lower() and "expertise" not in resources_text.lower():
-            risk_factors["resource_shortage"] += 25
-            if "resource_shortage" not in risk_details:
-                risk_details["resource_shortage"] = {}
-            risk_details["resource_shortage"]["missing_skills"] = "Required skills/expertise not specified"
-    else:
-        risk_factors["resource_shortage"] = 70
-        risk_details["resource_shortage"] = {"missing_resources": "Resources section is missing"}
-    
-    # Extract environmental impact information
-    env_text = extracted_sections.get("environmental_impact", "")
-    if env_text:
-        # Check for environmental risk factors
-        if "mitigation" not in env_text.lower():
-            risk_factors["environmental_risk"] += 40
-            risk_details["environmental_risk"] = {"missing_mitigation": "Environmental mitigation measures not mentioned"}
-        
-        if "assessment" not in env_text.lower():
-            risk_factors["environmental_risk"] += 30
-            if "environmental_risk" not in risk_details:
-                risk_details["environmental_risk"] = {}
-            risk_details["environmental_risk"]["missing_assessment"] = "Formal environmental assessment not mentioned"
-    else:
-        risk_factors["environmental_risk"] = 50  # Less severe than other missing sections
-        risk_details["environmental_risk"] = {"missing_section": "Environmental impact section is missing"}
-    
-    # Extract scope information
-    scope_text = extracted_sections.get("scope", "")
-    if scope_text:
-        # Check for scope risk factors
-        if "limitation" not in scope_text.lower() and "boundary" not in scope_text.lower():
-            risk_factors["scope_creep"] += 35
-            risk_details["scope_creep"] = {"missing_boundaries": "Project scope boundaries not clearly defined"}
-        
-        if "deliverable" not in scope_text.lower():
-            risk_factors["scope_creep"] += 25
-            if "scope_creep" not in risk_details:
-                risk_details["scope_creep"] = {}
-            risk_details["scope_creep"]["missing_deliverables"] = "Specific deliverables not mentioned"
-    else:
-        risk_factors["scope_creep"] = 80
-        risk_details["scope_creep"] = {"missing_scope": "Scope section is missing"}
-    
-    # Calculate overall risk score (weighted average)
-    weights = {
-        "cost_overrun": 0.25,
-        "schedule_delay": 0.25,
-        "resource_shortage": 0.2,
-        "environmental_risk": 0.15,
-        "scope_creep": 0.15,
-    }
-    
-    overall_risk = sum(risk_factors[factor] * weights[factor] for factor in risk_factors)
-    
-    # Generate recommendations based on risk factors
-    recommendations = {}
-    
-    if risk_factors["cost_overrun"] > 50:
-        recommendations["budget"] = [
-            "Include a detailed budget breakdown with line items",
-            "Add a contingency budget of at least 10-15% of the total cost",
-            "Include cost estimation methodology and assumptions"
-        ]
-    
-    if risk_factors["schedule_delay"] > 50:
-        recommendations["timeline"] = [
-            "Define clear project milestones with specific dates",
-            "Include task dependencies and critical path analysis",
-            "Add buffer time for unforeseen delays"
-        ]
-    
-    if risk_factors["resource_shortage"] > 50:
-        recommendations["resources"] = [
-            "Clearly define resource allocation for each project phase",
-            "Specify required skills and expertise for each task",
-            "Include contingency plans for resource unavailability"
-        ]
-    
-    if risk_factors["environmental_risk"] > 40:
-        recommendations["environment"] = [
-            "Conduct a formal environmental impact assessment",
-            "Include specific environmental mitigation measures",
-            "Align with environmental regulatory requirements"
-        ]
+    results, _ = await predict_risk_incremental(extracted_sections)
+    return results
+
+
+async def predict_risk_incremental(extracted_sections: Dict[str, str]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Predict risk factors for a DPR, reusing the heuristic results of unchanged sections
+
+    Returns the same results as predict_risk and the names of the
+    sections whose heuristic factors were scored again.
+    """
+    results, recomputed = risk_rule_engine.score_incremental(extracted_sections, section_cache)
     
-    if risk_factors["scope_creep"] > 50:
-        recommendations["scope"] = [
-            "Clearly define project boundaries and limitations",
-            "List specific deliverables with acceptance criteria",
-            "Include change management procedures"
-        ]
+    prediction = await risk_engine.predict(extracted_sections)
+    if prediction is not None:
+        results["details"]["model"] = {
+            "version": prediction["model_version"],
+            "heuristic_overall_risk": results["overall_risk"],
+        }
+        results["overall_risk"] = prediction["overall_risk"]
     
-    return {
-        "overall_risk": overall_risk,
-        "risk_factors": risk_factors,
-        "details": risk_details,
-        "recommendations": recommendations
-    }
-
-
-# In a real implementation, you would have ML-based methods:
-# 
-# def train_risk_model(historical_data):
-#     """
-#     Train ML model for risk prediction using historical DPR data
-#     """
-#     # Prepare features and target variables
-#     X = historical_data[["budget_detail", "timeline_detail", ...]]
-#     y = historical_data["actual_risk"]
-#     
-#     # Create and train model
-#     model = RandomForestRegressor(n_estimators=100, random_state=42)
-#     model.fit(X, y)
-#     
-#     return model
-# 
-# def extract_features(sections):
-#     """
-#     Extract features from DPR sections for ML model
-#     """
-#     features = {}
-#     # Extract numerical and text features
-#     # ...
-#     return features
-# 
-# async def predict_risk_ml(sections, model):
-#     """
-#     Predict risk using trained ML model
-#     """
-#     features = extract_features(sections)
-#     risk_score = model.predict([features])[0]
-#     return risk_score
+    return results, recomputed
+
+
+class RiskRuleEngine:
+    """
+    Table-driven heuristic risk scoring
+
+    Each factor (see rules/risk_rules.json) scores one section: when the
+    section is missing the factor gets its `missing` score, otherwise
+    every check whose `required_any` phrases are all absent adds its
+    score. The overall risk is the weighted sum of the factor scores, and
+    a factor above its recommendation threshold adds its recommendations.
+    The trigger phrases of each section are compiled into one
+    KeywordMatcher, so each section is lowercased once and only searched
+    for the phrases of the factors that score it. The factor results of
+    a section only depend on which of its phrases were found, so they
+    are computed once per combination and then looked up; the results
+    are shared and must not be modified. Sections are scored
+    independently and then combined, so re-evaluations can reuse the
+    factor scores of unchanged sections.
+    """
+    def __init__(self, rules: Dict[str, Any]):
+        self.version = rules.get("version")
+        self.fingerprint = hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()
+        self.factors: List[Dict[str, Any]] = list(rules["factors"])
+        self.sections = list(dict.fromkeys(factor["section"] for factor in self.factors))
+
+        # One matcher per section with the trigger phrases of every factor scoring it
+        phrases: Dict[str, List[str]] = {}
+        for factor in self.factors:
+            for check in factor.get("checks", []):
+                phrases.setdefault(factor["section"], []).extend(check["required_any"])
+        self.matchers = {section: KeywordMatcher(section_phrases) for section, section_phrases in phrases.items()}
+
+        # section -> (name, checks) of the factors scoring it, where each check
+        # is (lowercased phrases, score, key, message)
+        self._section_factors: Dict[str, List[Tuple[str, tuple]]] = {section: [] for section in self.sections}
+        # section -> factor results when the section is missing
+        self._missing: Dict[str, Dict[str, Tuple[float, Dict[str, str]]]] = {section: {} for section in self.sections}
+        for factor in self.factors:
+            checks = tuple(
+                (
+                    frozenset(phrase.lower() for phrase in check["required_any"]),
+                    check["score"], check["key"], check["message"],
+                )
+                for check in factor.get("checks", [])
+            )
+            self._section_factors[factor["section"]].append((factor["name"], checks))
+            missing = factor["missing"]
+            self._missing[factor["section"]][factor["name"]] = (missing["score"], {missing["key"]: missing["message"]})
+
+        # (section, phrases found) -> factor results
+        self._results: Dict[Tuple[str, FrozenSet[str]], Dict[str, Tuple[float, Dict[str, str]]]] = {}
+
+        # (name, section, weight, recommendation) of every factor, in rule order, where
+        # the recommendation is (threshold, key, items) or None
+        self._combined = []
+        for factor in self.factors:
+            recommendation = factor.get("recommendations")
+            if recommendation:
+                recommendation = (recommendation["threshold"], recommendation["key"], tuple(recommendation["items"]))
+            self._combined.append((factor["name"], factor["section"], factor["weight"], recommendation or None))
+
+    @classmethod
+    def from_file(cls, path: str) -> "RiskRuleEngine":
+        """
+        Load the rules from a JSON file
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def score_section(self, section: str, text: str) -> Dict[str, Tuple[float, Dict[str, str]]]:
+        """
+        Score the factors of one section
+
+        Returns (score, details) for each factor of the section.
+        """
+        if not text:
+            return self._missing.get(section, {})
+
+        matcher = self.matchers.get(section)
+        found = matcher.find(text) if matcher else frozenset()
+
+        results = self._results.get((section, found))
+        if results is None:
+            results = {}
+            for name, checks in self._section_factors.get(section, ()):
+                score = 0.0
+                details = {}
+                for phrases, check_score, key, message in checks:
+                    if found.isdisjoint(phrases):
+                        score += check_score
+                        details[key] = message
+                results[name] = (score, details)
+            if len(self._results) < MAX_MEMOIZED_RESULTS:
+                self._results[(section, found)] = results
+        return results
+
+    def score(self, extracted_sections: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Predict risk factors for a DPR based on extracted sections
+        """
+        score_section = self.score_section
+        return self._combine({
+            section: score_section(section, extracted_sections.get(section) or "")
+            for section in self.sections
+        })
+
+    def score_incremental(
+        self, extracted_sections: Dict[str, str], cache: SectionResultCache
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Predict risk factors for a DPR, reusing the scores of sections seen before
+
+        Returns the risk results and the names of the sections that were
+        scored rather than taken from the cache.
+        """
+        section_results, recomputed = cache.map_sections(
+            f"risk:{self.fingerprint}", self.sections, extracted_sections, self.score_section
+        )
+        return self._combine(section_results), recomputed
+
+    def _combine(self, section_results: Dict[str, Dict[str, Tuple[float, Dict[str, str]]]]) -> Dict[str, Any]:
+        """
+        Combine per-section factor scores into the risk results of a DPR
+        """
+        risk_factors = {}
+        risk_details = {}
+        recommendations = {}
+        overall_risk = 0
+        for name, section, weight, recommendation in self._combined:
+            score, details = section_results[section][name]
+            risk_factors[name] = score
+            if details:
+                risk_details[name] = dict(details)
+
+            # Overall risk score (weighted average)
+            overall_risk += score * weight
+
+            # Recommendations based on the factor's score
+            if recommendation is not None and score > recommendation[0]:
+                recommendations[recommendation[1]] = list(recommendation[2])
+
+        return {
+            "overall_risk": overall_risk,
+            "risk_factors": risk_factors,
+            "details": risk_details,
+            "recommendations": recommendations
+        }
+
+    def score_batch(self, sections_list: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Predict risk factors for many DPRs with the same compiled rules
+        """
+        return [self.score(sections) for sections in sections_list]
+
+
+# Create engine instance
+risk_rule_engine = RiskRuleEngine.from_file(RULES_PATH)
+
+
+def predict_risk_heuristic(extracted_sections: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Predict risk factors for a DPR based on extracted sections using the heuristic rules
+    """
+    return risk_rule_engine.score(extracted_sections)
+
+
+async def predict_risk_heuristic_batch(sections_list: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Predict heuristic risk factors for many DPRs, off the event loop
+    """
+    return await asyncio.to_thread(risk_rule_engine.score_batch, sections_list)
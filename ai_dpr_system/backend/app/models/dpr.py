@@ -1,12 +1,15 @@
 from datetime import datetime
 import uuid
-from typing import Any
+from typing import Any, Dict, Iterable, Optional, Tuple
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Select, String, Text, and_, event, func, select
 from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Load, Session, aliased, object_session, relationship
 
 from app.db.base_class import Base, CRUDBase
+from app.models.evaluation import Evaluation, evaluation as crud_evaluation
+from app.models.risk_assessment import RiskAssessment
+from app.utils.cache import dashboard_cache
 
 
 class DPR(Base):
@@ -20,7 +23,7 @@ class DPR(Base):
     description = Column(Text, nullable=True)
     file_path = Column(String, nullable=False)
     uploaded_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
-    status = Column(String, default="pending")  # pending, evaluated, risk_assessed
+    status = Column(String, default="pending")  # pending, processing, evaluated, risk_assessed, failed
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -30,11 +33,137 @@ class DPR(Base):
     risk_assessments = relationship("RiskAssessment", back_populates="dpr")
 
 
+# Session.info key of the ids of DPRs added, removed or changed in status
+# by the session's current transaction
+DASHBOARD_DIRTY_KEY = "dashboard_dirty_dprs"
+
+
+def _mark_dashboard_dirty(target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(DASHBOARD_DIRTY_KEY, set()).add(target.id)
+
+
+@event.listens_for(DPR.status, "set")
+def _status_changed(target, value, oldvalue, initiator):
+    """
+    Remember that the dashboard statistics change when the transaction commits
+    """
+    _mark_dashboard_dirty(target)
+
+
+@event.listens_for(DPR, "after_insert")
+@event.listens_for(DPR, "after_delete")
+def _dpr_added_or_removed(mapper, connection, target):
+    _mark_dashboard_dirty(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dashboard(session):
+    """
+    Invalidate cached dashboard statistics once DPR changes are committed
+    
+    Invalidating any earlier would let a concurrent request cache the
+    statistics from before the commit until the TTL runs out.
+    """
+    if session.info.pop(DASHBOARD_DIRTY_KEY, None):
+        dashboard_cache.invalidate()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_dashboard_changes(session, transaction):
+    # Changes of a rolled back transaction never reach the dashboard
+    if transaction.parent is None:
+        session.info.pop(DASHBOARD_DIRTY_KEY, None)
+
+
+def _latest_per_dpr(model, dpr_ids: Iterable[Any]):
+    """
+    Alias of `model` restricted to the latest row (by created_at) of each DPR
+    """
+    ranked = (
+        select(
+            model,
+            func.row_number().over(
+                partition_by=model.dpr_id,
+                order_by=(model.created_at.desc(), model.id.desc()),
+            ).label("row_number"),
+        )
+        .where(model.dpr_id.in_(dpr_ids))
+        .subquery()
+    )
+    return aliased(model, ranked), ranked.c.row_number == 1
+
+
 class CRUDDPR(CRUDBase):
     """
     CRUD operations for DPR model
     """
-    pass
+    def _with_latest_query(self, dpr_ids: Iterable[Any], risk_details: bool = False) -> Select:
+        """
+        Select DPRs with their latest evaluation and risk assessment (or None)
+        """
+        dpr_ids = list(dpr_ids)
+        evaluation, latest_evaluation = _latest_per_dpr(Evaluation, dpr_ids)
+        risk_assessment, latest_risk_assessment = _latest_per_dpr(RiskAssessment, dpr_ids)
+        query = (
+            select(DPR, evaluation, risk_assessment)
+            .outerjoin(evaluation, and_(evaluation.dpr_id == DPR.id, latest_evaluation))
+            .outerjoin(risk_assessment, and_(risk_assessment.dpr_id == DPR.id, latest_risk_assessment))
+            .where(DPR.id.in_(dpr_ids))
+        )
+        if risk_details:
+            # Load the deferred risk details and recommendations in the same query
+            query = query.options(Load(risk_assessment).undefer_group("details"))
+        return query
+    
+    def get_with_latest(
+        self, db, dpr_id: Any, risk_details: bool = False, sections: bool = False
+    ) -> Optional[Tuple[DPR, Optional[Evaluation], Optional[RiskAssessment]]]:
+        """
+        Get a DPR with its latest evaluation and risk assessment in one query
+        
+        Returns (dpr, evaluation, risk_assessment), or None if the DPR does
+        not exist. With `risk_details`, the risk assessment's details and
+        recommendations are loaded too. With `sections`, the evaluation's
+        section texts are loaded by a second query.
+        """
+        row = db.execute(self._with_latest_query([dpr_id], risk_details)).first()
+        if row and sections:
+            crud_evaluation.load_sections(db, [row[1]])
+        return tuple(row) if row else None
+    
+    def get_many_with_latest(
+        self, db, dpr_ids: Iterable[Any], risk_details: bool = False, sections: bool = False
+    ) -> Dict[Any, Tuple[DPR, Optional[Evaluation], Optional[RiskAssessment]]]:
+        """
+        Get DPRs with their latest evaluations and risk assessments in one query
+        
+        Returns (dpr, evaluation, risk_assessment) by DPR id; missing DPRs
+        are left out.
+        """
+        rows = db.execute(self._with_latest_query(dpr_ids, risk_details)).all()
+        if sections:
+            crud_evaluation.load_sections(db, [row[1] for row in rows])
+        return {row[0].id: tuple(row) for row in rows}
+    
+    async def get_with_latest_async(
+        self, db, dpr_id: Any, risk_details: bool = False, sections: bool = False
+    ) -> Optional[Tuple[DPR, Optional[Evaluation], Optional[RiskAssessment]]]:
+        result = await db.execute(self._with_latest_query([dpr_id], risk_details))
+        row = result.first()
+        if row and sections:
+            await crud_evaluation.load_sections_async(db, [row[1]])
+        return tuple(row) if row else None
+    
+    async def get_many_with_latest_async(
+        self, db, dpr_ids: Iterable[Any], risk_details: bool = False, sections: bool = False
+    ) -> Dict[Any, Tuple[DPR, Optional[Evaluation], Optional[RiskAssessment]]]:
+        result = await db.execute(self._with_latest_query(dpr_ids, risk_details))
+        rows = result.all()
+        if sections:
+            await crud_evaluation.load_sections_async(db, [row[1] for row in rows])
+        return {row[0].id: tuple(row) for row in rows}
 
 
 # Create CRUD instance
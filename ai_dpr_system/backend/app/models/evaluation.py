@@ -1,17 +1,26 @@
 from datetime import datetime
 import uuid
-from typing import Any
+from typing import Any, Dict, Iterable, List, Optional
 
-from sqlalchemy import Column, DateTime, ForeignKey, Float, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Float, Select, String, Text, select
 from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, load_only, relationship
 
 from app.db.base_class import Base, CRUDBase
+from app.models.section_blob import section_blob
 
 
 class Evaluation(Base):
     """
     Evaluation database model
+    
+    Section texts are stored in section_blobs and referenced by hash in
+    `section_refs`. Rows written before that keep their sections inline
+    in the deferred `inline_sections` column. Neither is loaded with the
+    row: `extracted_sections` is only available after
+    `evaluation.load_sections` (or `get_with_latest(sections=True)`),
+    so that no access issues a hidden query, which would also fail on an
+    AsyncSession.
     """
     __tablename__ = "evaluations"
     
@@ -20,7 +29,8 @@ class Evaluation(Base):
     evaluated_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     compliance_score = Column(Float, nullable=False)
     compliance_details = Column(JSONB, nullable=False)
-    extracted_sections = Column(JSONB, nullable=False)
+    section_refs = Column(JSONB, nullable=True)  # Section name -> section_blobs.hash
+    inline_sections = deferred(Column("extracted_sections", JSONB, nullable=True))
     status = Column(String, default="completed")  # completed, failed
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -28,13 +38,104 @@ class Evaluation(Base):
     # Relationships
     dpr = relationship("DPR", back_populates="evaluations")
     user = relationship("User")
+    
+    @property
+    def sections_loaded(self) -> bool:
+        """
+        Whether `extracted_sections` can be read without loading the sections
+        """
+        return "_sections" in self.__dict__
+    
+    @property
+    def extracted_sections(self) -> Optional[Dict[str, str]]:
+        """
+        Section texts by name
+        
+        Raises RuntimeError if the sections were not loaded.
+        """
+        if not self.sections_loaded:
+            raise RuntimeError(
+                f"Sections of evaluation {self.id} are not loaded; use evaluation.load_sections first"
+            )
+        return self.__dict__["_sections"]
 
 
 class CRUDEvaluation(CRUDBase):
     """
     CRUD operations for Evaluation model
     """
-    pass
+    def create_with_sections(self, db, *, obj_in, sections: Dict[str, str]) -> Evaluation:
+        """
+        Add an evaluation whose section texts are stored in section_blobs
+        
+        Nothing is committed, so the caller commits the evaluation and its
+        blobs together.
+        """
+        db_obj = Evaluation(**self._data(obj_in), section_refs=section_blob.put_many(db, sections))
+        db_obj.__dict__["_sections"] = sections
+        db.add(db_obj)
+        return db_obj
+    
+    def _sections_queries(self, evaluations: List[Evaluation]) -> List[Select]:
+        """
+        Queries for the section blobs and the legacy inline sections of `evaluations`
+        """
+        hashes = {key for obj in evaluations if obj.section_refs for key in obj.section_refs.values()}
+        legacy_ids = [obj.id for obj in evaluations if obj.section_refs is None]
+        queries = []
+        if hashes:
+            queries.append(section_blob.contents_query(hashes))
+        if legacy_ids:
+            queries.append(select(Evaluation.id, Evaluation.inline_sections).where(Evaluation.id.in_(legacy_ids)))
+        return queries
+    
+    @staticmethod
+    def _attach_sections(evaluations: List[Evaluation], rows: Dict[Any, Any]) -> None:
+        # `rows` maps blob hashes to texts and legacy evaluation ids to their inline sections
+        for obj in evaluations:
+            if obj.section_refs is None:
+                obj.__dict__["_sections"] = rows.get(obj.id)
+            else:
+                obj.__dict__["_sections"] = {name: rows[key] for name, key in obj.section_refs.items()}
+    
+    def load_sections(self, db, evaluations: Iterable[Optional[Evaluation]]) -> None:
+        """
+        Load the section texts of evaluations, so that `extracted_sections` can be read
+        
+        Evaluations that are None or already loaded are skipped; the others
+        cost one query for all their blobs (plus one for legacy rows).
+        """
+        pending = [obj for obj in evaluations if obj is not None and not obj.sections_loaded]
+        rows = {}
+        for query in self._sections_queries(pending):
+            rows.update(db.execute(query).all())
+        self._attach_sections(pending, rows)
+    
+    async def load_sections_async(self, db, evaluations: Iterable[Optional[Evaluation]]) -> None:
+        pending = [obj for obj in evaluations if obj is not None and not obj.sections_loaded]
+        rows = {}
+        for query in self._sections_queries(pending):
+            rows.update((await db.execute(query)).all())
+        self._attach_sections(pending, rows)
+    
+    def get_summaries(self, db, *, dpr_id: Any) -> List[Evaluation]:
+        """
+        Get the evaluations of a DPR, newest first, loading only the summary columns
+        """
+        return (
+            db.query(Evaluation)
+            .options(load_only(
+                Evaluation.id,
+                Evaluation.dpr_id,
+                Evaluation.evaluated_by,
+                Evaluation.compliance_score,
+                Evaluation.status,
+                Evaluation.created_at,
+            ))
+            .filter(Evaluation.dpr_id == dpr_id)
+            .order_by(Evaluation.created_at.desc(), Evaluation.id.desc())
+            .all()
+        )
 
 
 # Create CRUD instance
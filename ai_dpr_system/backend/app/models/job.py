@@ -0,0 +1,52 @@
+from datetime import datetime
+import uuid
+from typing import Any
+
+from sqlalchemy import JSON, Column, DateTime, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.base_class import Base, CRUDBase
+
+
+class Job(Base):
+    """
+    Background job database model
+
+    Uses portable column types so the queue also runs against SQLite.
+    """
+    __tablename__ = "jobs"
+    
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_type = Column(String, nullable=False)  # evaluate, risk
+    dpr_id = Column(String(36), index=True, nullable=False)
+    created_by = Column(String, nullable=True)
+    priority = Column(Integer, default=0)  # Higher runs first
+    status = Column(String, default="queued")  # queued, running, completed, failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_after = Column(DateTime, default=datetime.utcnow)
+    payload = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    result = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # Lease of the worker running the job
+    finished_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CRUDJob(CRUDBase):
+    """
+    CRUD operations for Job model
+    """
+    def get_for_dpr(self, db, *, dpr_id: Any):
+        return (
+            db.query(Job)
+            .filter(Job.dpr_id == str(dpr_id))
+            .order_by(Job.created_at.desc())
+            .all()
+        )
+
+
+# Create CRUD instance
+job = CRUDJob(Job)
@@ -4,7 +4,7 @@ from typing import Any
 
 from sqlalchemy import Column, DateTime, ForeignKey, Float, String, Text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.db.base_class import Base, CRUDBase
 
@@ -20,8 +20,9 @@ class RiskAssessment(Base):
     evaluated_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     overall_risk_score = Column(Float, nullable=False)
     risk_factors = Column(JSONB, nullable=False)  # Dictionary of risk factors and their scores
-    risk_details = Column(JSONB, nullable=False)  # Detailed risk assessment results
-    recommendations = Column(JSONB, nullable=True)  # Recommendations to mitigate risks
+    # The larger JSONB columns are loaded together, on first access
+    risk_details = deferred(Column(JSONB, nullable=False), group="details")  # Detailed risk assessment results
+    recommendations = deferred(Column(JSONB, nullable=True), group="details")  # Recommendations to mitigate risks
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -0,0 +1,76 @@
+from datetime import datetime
+import hashlib
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import Column, DateTime, Integer, Select, String, Text, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db.base_class import Base, CRUDBase
+
+
+def section_hash(text: str) -> str:
+    """
+    Content address of a section text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SectionBlob(Base):
+    """
+    Content-addressed store for extracted section texts
+
+    Evaluations reference their section texts by hash instead of storing
+    them inline, so loading an evaluation does not pull the document
+    text, and identical sections (e.g. of re-evaluated DPRs) are stored
+    once. Uses portable column types so it also runs against SQLite.
+    """
+    __tablename__ = "section_blobs"
+    
+    hash = Column(String(64), primary_key=True)
+    content = Column(Text, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CRUDSectionBlob(CRUDBase):
+    """
+    CRUD operations for SectionBlob model
+    """
+    def put_many(self, db, sections: Dict[str, str]) -> Dict[str, str]:
+        """
+        Store section texts and return their hashes by section name
+        
+        Texts that are already stored are skipped. Nothing is committed,
+        so the blobs are written together with the referencing row.
+        """
+        refs = {name: section_hash(text or "") for name, text in sections.items()}
+        rows = {refs[name]: text or "" for name, text in sections.items()}
+        if not rows:
+            return refs
+        
+        values = [
+            {"hash": key, "content": text, "size": len(text), "created_at": datetime.utcnow()}
+            for key, text in rows.items()
+        ]
+        insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+        db.execute(insert(SectionBlob).values(values).on_conflict_do_nothing(index_elements=["hash"]))
+        return refs
+    
+    def contents_query(self, hashes: Iterable[str]) -> Select:
+        """
+        Select (hash, content) of the blobs with the given hashes
+        """
+        return select(SectionBlob.hash, SectionBlob.content).where(SectionBlob.hash.in_(set(hashes)))
+    
+    def get_texts(self, db, refs: Dict[str, str]) -> Dict[str, str]:
+        """
+        Get section texts by section name from their hashes
+        """
+        if not refs:
+            return {}
+        contents = dict(db.execute(self.contents_query(refs.values())).all())
+        return {name: contents[key] for name, key in refs.items()}
+
+
+# Create CRUD instance
+section_blob = CRUDSectionBlob(SectionBlob)
@@ -4,6 +4,7 @@ from typing import Any
 
 from sqlalchemy import Boolean, Column, DateTime, String
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base, CRUDBase
 from app.core.security import get_password_hash, verify_password
@@ -24,6 +25,9 @@ class User(Base):
     is_active = Column(Boolean(), default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    dprs = relationship("DPR", back_populates="user")
 
 
 class CRUDUser(CRUDBase):
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -9,7 +9,6 @@ class EvaluationBase(BaseModel):
     dpr_id: UUID
     compliance_score: float
     compliance_details: Dict
-    extracted_sections: Dict
     status: str = "completed"
 
 
@@ -20,15 +19,33 @@ class EvaluationCreate(EvaluationBase):
 class EvaluationUpdate(BaseModel):
     compliance_score: Optional[float] = None
     compliance_details: Optional[Dict] = None
-    extracted_sections: Optional[Dict] = None
     status: Optional[str] = None
 
 
+class EvaluationSummary(BaseModel):
+    """
+    Evaluation without its details or section texts, for list views
+    """
+    id: UUID
+    dpr_id: UUID
+    evaluated_by: UUID
+    compliance_score: float
+    status: str
+    created_at: datetime
+    
+    class Config:
+        orm_mode = True
+
+
 class EvaluationResponse(EvaluationBase):
     id: UUID
     evaluated_by: UUID
+    extracted_sections: Dict
     created_at: datetime
     updated_at: datetime
+    # Pages and sections processed again by this evaluation (only set when
+    # returned from an evaluation run)
+    recomputed: Optional[Dict[str, Any]] = None
     
     class Config:
         orm_mode = True
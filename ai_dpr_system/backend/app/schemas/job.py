@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Dict, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+# Range of job priorities; only admins can queue jobs with a non-default priority
+MIN_PRIORITY = -10
+MAX_PRIORITY = 10
+
+
+class JobCreate(BaseModel):
+    job_type: str  # evaluate, risk
+    dpr_id: UUID
+    priority: int = Field(0, ge=MIN_PRIORITY, le=MAX_PRIORITY)  # Higher runs first
+
+
+class JobResponse(BaseModel):
+    id: str
+    job_type: str
+    dpr_id: str
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        orm_mode = True
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -29,6 +29,9 @@ class RiskAssessmentResponse(RiskAssessmentBase):
     evaluated_by: UUID
     created_at: datetime
     updated_at: datetime
+    # Sections scored again by this assessment (only set when returned
+    # from an assessment run)
+    recomputed: Optional[Dict[str, Any]] = None
     
     class Config:
         orm_mode = True
@@ -1,5 +1,6 @@
 import os
 from typing import List
+from urllib.parse import quote
 
 from fastapi import UploadFile
 
@@ -16,3 +17,15 @@ def validate_file_type(file: UploadFile) -> bool:
     ext = ext.lower().replace(".", "")
     
     return ext in ALLOWED_EXTENSIONS
+
+
+def content_disposition(file_name: str, disposition: str = "attachment") -> str:
+    """
+    Build a Content-Disposition header value for a file name
+
+    The name is sent percent-encoded as UTF-8 in an RFC 5987 `filename*`
+    parameter, with an ASCII-only `filename` fallback for older clients.
+    """
+    fallback = "".join(char if " " <= char <= "~" and char not in '"\\' else "_" for char in file_name)
+    encoded = quote(file_name, safe="")
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{encoded}"
@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination on (created_at, id)
+
+Pages are ordered newest first. A cursor encodes the (created_at, id) of
+the last row of a page, and the next page is read with a row comparison
+against it, so every page costs the same index range scan no matter how
+deep it is (unlike OFFSET, which reads and discards all earlier rows).
+
+Cursor timestamps are naive UTC, like the model's DateTime columns: a
+driver may return timezone-aware values (e.g. asyncpg for the TIMESTAMP
+WITH TIME ZONE columns of init.sql), and binding one of those back as a
+naive TIMESTAMP fails.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, tuple_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(created_at: datetime, id: Any) -> str:
+    """
+    Build the opaque cursor pointing after a row
+    """
+    raw = json.dumps([_naive_utc(created_at).isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Get the (created_at, id) a cursor points after
+
+    Raises ValueError for malformed cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return _naive_utc(datetime.fromisoformat(created_at)), UUID(id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def paginate(query: Select, model: Any, cursor: Optional[str], limit: int) -> Select:
+    """
+    Order a query newest first and restrict it to the page after `cursor`
+
+    One row more than `limit` is selected so that `split_page` can tell
+    whether there is a next page.
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Split the rows of a paginated query into the page and the next cursor (or None)
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
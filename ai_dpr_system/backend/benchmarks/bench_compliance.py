@@ -0,0 +1,227 @@
+"""
+Compliance rule throughput as the rule set grows
+
+Generates DPR sections and rule sets of growing size (the shipped rules
+plus synthetic forbidden_any and required_any rules) and times
+ComplianceRuleEngine, which searches each section once for the keywords
+of all its rules, against evaluating the same rules one at a time with a
+`keyword in content.lower()` check per keyword, the way the original
+hand-written checks did. The engine is also timed with every section
+forced onto the trie regex, and the strategies its matchers picked are
+listed, which shows where TRIE_MIN_KEYWORDS pays off. Also checks that
+the shipped rules give the same results as the original check_compliance.
+
+Usage (from ai_dpr_system/backend):
+    python -m benchmarks.bench_compliance [--rules 10,50,100,200,500] [--dprs 200]
+"""
+import argparse
+import copy
+import json
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+from app.ml.compliance import RULES_PATH, ComplianceRuleEngine
+
+SECTION_NAMES = [
+    "executive_summary", "project_background", "scope", "objectives",
+    "methodology", "timeline", "budget", "risks",
+]
+WORDS = (
+    "the project will construct a bridge across the river with an estimated total "
+    "cost of rs. 120 crore over 36 months starting in april and complete by march "
+    "subject to approval of the state government and timely release of funds by "
+    "the implementing agency inr rupees weeks days begin finish end"
+).split()
+PLACEHOLDERS = ["lorem ipsum", "to be filled", "tbd", "tba", "TBD", "To Be Filled"]
+
+
+def baseline_check_compliance(sections: Dict[str, str]) -> Dict[str, Any]:
+    """
+    check_compliance before the rule engine (synchronous, otherwise unchanged)
+    """
+    required_sections = SECTION_NAMES
+
+    section_scores = {}
+    total_section_score = 0
+
+    for section in required_sections:
+        if section in sections and sections[section]:
+            section_scores[section] = {"present": True, "score": 100, "issues": []}
+            total_section_score += 100
+        else:
+            section_scores[section] = {"present": False, "score": 0, "issues": ["Section missing"]}
+
+    for section, content in sections.items():
+        if section == "full_text" or not content:
+            continue
+
+        issues = []
+        quality_score = 100
+
+        if len(content) < 100:
+            issues.append("Section content is too brief")
+            quality_score -= 30
+
+        placeholder_patterns = ["lorem ipsum", "to be filled", "tbd", "tba"]
+        for pattern in placeholder_patterns:
+            if pattern in content.lower():
+                issues.append(f"Contains placeholder text: '{pattern}'")
+                quality_score -= 20
+                break
+
+        if section in section_scores:
+            section_scores[section]["issues"].extend(issues)
+            section_scores[section]["score"] = max(0, quality_score)
+            total_section_score = total_section_score - 100 + quality_score
+
+    inconsistencies = []
+
+    if "timeline" in sections and sections["timeline"]:
+        timeline = sections["timeline"].lower()
+        if "months" not in timeline and "weeks" not in timeline and "days" not in timeline:
+            inconsistencies.append("Timeline lacks specific time units (days/weeks/months)")
+        if "start" not in timeline and "begin" not in timeline:
+            inconsistencies.append("Timeline lacks clear start date/milestone")
+        if "end" not in timeline and "complete" not in timeline and "finish" not in timeline:
+            inconsistencies.append("Timeline lacks clear end date/milestone")
+
+    if "budget" in sections and sections["budget"]:
+        budget = sections["budget"].lower()
+        if "rs." not in budget and "inr" not in budget and "rupees" not in budget:
+            inconsistencies.append("Budget lacks clear currency indicators")
+        if "total" not in budget:
+            inconsistencies.append("Budget lacks clear total cost")
+
+    overall_score = total_section_score / (len(required_sections) * 100) * 100
+    if inconsistencies:
+        overall_score = max(0, overall_score - (len(inconsistencies) * 5))
+
+    compliance_results = {"overall_score": overall_score}
+    for section, details in section_scores.items():
+        compliance_results[section] = details
+    if inconsistencies:
+        compliance_results["inconsistencies"] = inconsistencies
+    return compliance_results
+
+
+def generate_sections(seed: int, words: int = 120) -> Dict[str, str]:
+    """
+    Generate the extracted sections of a DPR, some missing, short or with placeholders
+    """
+    rng = random.Random(seed)
+    sections = {}
+    for name in SECTION_NAMES:
+        roll = rng.random()
+        if roll < 0.1:
+            continue
+        if roll < 0.15:
+            sections[name] = ""
+            continue
+        count = rng.randint(3, 15) if roll < 0.3 else rng.randint(words // 2, words * 2)
+        body = [rng.choice(WORDS) for _ in range(count)]
+        if rng.random() < 0.2:
+            body.insert(rng.randrange(len(body) + 1), rng.choice(PLACEHOLDERS))
+        text = " ".join(body)
+        sections[name] = text.upper() if rng.random() < 0.1 else text.capitalize()
+    sections["full_text"] = "\n\n".join(sections.values())
+    return sections
+
+
+def grow_rules(rules: Dict[str, Any], count: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Add synthetic keyword rules to a rule set until it has `count` rules
+    """
+    rng = random.Random(seed)
+    rules = copy.deepcopy(rules)
+    vocabulary = sorted(set(WORDS)) + [f"term{index:04d}" for index in range(2000)]
+    index = 0
+    while len(rules["quality_rules"]) + len(rules["consistency_rules"]) < count:
+        keywords = rng.sample(vocabulary, rng.randint(1, 5))
+        if index % 2:
+            rules["quality_rules"].append({
+                "id": f"synthetic_{index}", "type": "forbidden_any", "keywords": keywords,
+                "penalty": 1, "message": "Contains '{keyword}'",
+            })
+        else:
+            rules["consistency_rules"].append({
+                "id": f"synthetic_{index}", "section": rng.choice(SECTION_NAMES), "type": "required_any",
+                "keywords": keywords, "message": f"Lacks any of {keywords}",
+            })
+        index += 1
+    return rules
+
+
+class _LoweredScan:
+    """
+    Answers `keyword in found` by scanning the freshly lowercased section
+    """
+    def __init__(self, text: str):
+        self.text = text
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self.text.lower()
+
+
+class _PerKeywordMatcher:
+    def find(self, text: str) -> _LoweredScan:
+        return _LoweredScan(text)
+
+
+def per_rule_engine(rules: Dict[str, Any]) -> ComplianceRuleEngine:
+    """
+    The same rules, with every keyword checked by its own scan of the lowercased section
+    """
+    engine = ComplianceRuleEngine(rules)
+    engine.matchers = {section: _PerKeywordMatcher() for section in engine.matchers}
+    return engine
+
+
+def _time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time compliance rule evaluation as the rule set grows")
+    parser.add_argument("--rules", default="10,50,100,200,500", help="Comma-separated rule counts")
+    parser.add_argument("--dprs", type=int, default=200, help="Number of DPRs evaluated per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported")
+    args = parser.parse_args()
+
+    with open(RULES_PATH, "r", encoding="utf-8") as f:
+        shipped_rules = json.load(f)
+    dprs: List[Dict[str, str]] = [generate_sections(seed) for seed in range(args.dprs)]
+
+    engine = ComplianceRuleEngine(shipped_rules)
+    same = all(engine.evaluate(sections) == baseline_check_compliance(sections) for sections in dprs)
+    print(f"shipped rules match the original check_compliance on {len(dprs)} DPRs: {same}")
+
+    print(
+        f"{'rules':>6} {'rules/s per rule':>17} {'rules/s engine':>15} {'rules/s trie':>13} "
+        f"{'speedup':>8}  engine matchers"
+    )
+    for count in (int(count) for count in args.rules.split(",")):
+        rules = grow_rules(shipped_rules, count)
+        engine = ComplianceRuleEngine(rules)
+        trie = ComplianceRuleEngine(rules, trie_min_keywords=0)
+        baseline = per_rule_engine(rules)
+        evaluations = engine.rule_count * len(dprs)
+        old = _time(lambda: baseline.evaluate_batch(dprs), args.repeat)
+        new = _time(lambda: engine.evaluate_batch(dprs), args.repeat)
+        trie_time = _time(lambda: trie.evaluate_batch(dprs), args.repeat)
+        strategies = sorted(Counter(matcher.strategy for matcher in engine.matchers.values()).items())
+        print(
+            f"{engine.rule_count:>6} {evaluations / old:>17,.0f} {evaluations / new:>15,.0f} "
+            f"{evaluations / trie_time:>13,.0f} {old / new:>7.1f}x  "
+            + ", ".join(f"{number} {strategy}" for strategy, number in strategies)
+        )
+
+
+if __name__ == "__main__":
+    main()
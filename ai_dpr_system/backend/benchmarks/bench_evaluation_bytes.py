@@ -0,0 +1,206 @@
+"""
+Bytes read from the database per evaluation request
+
+Seeds --dprs DPRs with --evaluations evaluations each into a scratch
+database, then runs the data access of three requests and adds up the
+size of every value the database returns:
+
+- history: GET /evaluate/{dpr_id}/history, the evaluations of a DPR
+- header: the DPR with its latest evaluation and risk assessment, as
+  used by the permission checks, GET /risk/{dpr_id} and the reports
+- detail: GET /evaluate/{dpr_id}, the latest evaluation with its sections
+
+"before" is the old layout, where every evaluation row carried its
+sections (including the full document text) inline and every query
+loaded them. "after" is the current code, with the sections in
+section_blobs loaded only by the detail request.
+
+The database comes from DATABASE_URL, like in the app, e.g. a local
+Postgres or (the default here) a SQLite file. It is dropped and
+re-created, so never point it at real data.
+
+Usage (from ai_dpr_system/backend):
+    python -m benchmarks.bench_evaluation_bytes [--dprs 20] [--evaluations 5] [--text-kb 200]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+_tmp = tempfile.mkdtemp(prefix="dpr-evaluation-bytes-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'bytes.db')}")
+
+from sqlalchemy import event, insert, select  # noqa: E402
+from sqlalchemy.orm import Load, Session, undefer  # noqa: E402
+
+from app.db.session import engine  # noqa: E402
+from app.models.dpr import DPR, dpr as crud_dpr  # noqa: E402
+from app.models.evaluation import Evaluation, evaluation as crud_evaluation  # noqa: E402
+from app.models.section_blob import section_blob  # noqa: E402
+from benchmarks.bench_risk import generate_risk_sections  # noqa: E402
+from benchmarks.database import create_schema, seed  # noqa: E402
+
+
+def value_size(value: Any) -> int:
+    """
+    Approximate wire size of a value returned by the database driver
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (int, float, datetime)):
+        return 8
+    if isinstance(value, (dict, list)):
+        # Drivers that decode JSON(B) for us
+        return len(json.dumps(value).encode("utf-8"))
+    return len(str(value))
+
+
+class ResultBytes:
+    """
+    Counts the queries run on an engine and the bytes of their results
+
+    Each SELECT is re-run on a separate cursor after it executes, since
+    the cursor the ORM reads from can not be observed without consuming it.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.queries = 0
+        self.bytes = 0
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if cursor.description is None:
+            return
+        self.queries += 1
+        probe = conn.connection.cursor()
+        try:
+            probe.execute(statement, parameters)
+            self.bytes += sum(value_size(value) for row in probe.fetchall() for value in row)
+        finally:
+            probe.close()
+
+    def measure(self, func: Callable[[], Any]) -> None:
+        self.queries = self.bytes = 0
+        event.listen(self.engine, "after_cursor_execute", self._after_execute)
+        try:
+            func()
+        finally:
+            event.remove(self.engine, "after_cursor_execute", self._after_execute)
+
+
+def seed_evaluations(dpr_ids: List[Any], evaluations: int, text_kb: int, inline: bool) -> int:
+    """
+    Add `evaluations` evaluations to each DPR, with sections inline or in section_blobs
+
+    Each DPR has one document; its evaluations re-extract the same sections,
+    like re-evaluations of an unchanged upload. Returns the total size of
+    the document texts.
+    """
+    now = datetime.utcnow()
+    rng = random.Random(0)
+    text_bytes = 0
+    with Session(engine) as db:
+        for index, dpr_id in enumerate(dpr_ids):
+            sections = generate_risk_sections(index, words=text_kb * 1024 // 8 // 6)
+            sections["full_text"] = "\n\n".join(sections.values())
+            text_bytes += len(sections["full_text"].encode("utf-8"))
+            refs = None if inline else section_blob.put_many(db, sections)
+            db.execute(insert(Evaluation), [
+                {
+                    "id": uuid.uuid4(),
+                    "dpr_id": dpr_id,
+                    "compliance_score": rng.uniform(0, 100),
+                    "compliance_details": {"overall_score": 0},
+                    "section_refs": refs,
+                    "inline_sections": sections if inline else None,
+                    "status": "completed",
+                    "created_at": now - timedelta(days=number),
+                    "updated_at": now,
+                }
+                for number in range(evaluations)
+            ])
+        db.commit()
+    return text_bytes
+
+
+def before_requests(db: Session, dpr_id: Any) -> Dict[str, Callable[[], Any]]:
+    # Before: the sections were an ordinary column, loaded with every evaluation
+    def latest():
+        query = crud_dpr._with_latest_query([dpr_id], risk_details=True)
+        evaluation = query.column_descriptions[1]["entity"]
+        return db.execute(query.options(Load(evaluation).undefer("*"))).first()
+
+    return {
+        "history": lambda: db.query(Evaluation).options(undefer(Evaluation.inline_sections))
+        .filter(Evaluation.dpr_id == dpr_id).all(),
+        "header": latest,
+        "detail": latest,
+    }
+
+
+def after_requests(db: Session, dpr_id: Any) -> Dict[str, Callable[[], Any]]:
+    def detail():
+        _, evaluation, _ = crud_dpr.get_with_latest(db, dpr_id)
+        crud_evaluation.load_sections(db, [evaluation])
+        return evaluation.extracted_sections
+
+    return {
+        "history": lambda: crud_evaluation.get_summaries(db, dpr_id=dpr_id),
+        "header": lambda: crud_dpr.get_with_latest(db, dpr_id, risk_details=True),
+        "detail": detail,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure bytes read per evaluation request")
+    parser.add_argument("--dprs", type=int, default=20, help="DPRs measured")
+    parser.add_argument("--evaluations", type=int, default=5, help="Evaluations per DPR")
+    parser.add_argument("--text-kb", type=int, default=200, help="Approximate size of each document's text")
+    args = parser.parse_args()
+
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    create_schema(engine, drop=True, indexes=True)
+    seed(engine, 1, 2 * args.dprs, assessed_fraction=0)
+    with Session(engine) as db:
+        dpr_ids = db.execute(select(DPR.id).order_by(DPR.id)).scalars().all()
+    layouts = {
+        "before": (dpr_ids[:args.dprs], before_requests),
+        "after": (dpr_ids[args.dprs:], after_requests),
+    }
+    for name, (ids, _) in layouts.items():
+        text_bytes = seed_evaluations(ids, args.evaluations, args.text_kb, inline=name == "before")
+
+    results: Dict[str, Dict[str, List[int]]] = {}
+    recorder = ResultBytes(engine)
+    for name, (ids, requests) in layouts.items():
+        for dpr_id in ids:
+            with Session(engine) as db:
+                for request, func in requests(db, dpr_id).items():
+                    recorder.measure(func)
+                    totals = results.setdefault(request, {}).setdefault(name, [0, 0])
+                    totals[0] += recorder.bytes
+                    totals[1] += recorder.queries
+
+    print(
+        f"{args.evaluations} evaluations per DPR, documents of {text_bytes / args.dprs / 1024:,.0f} KB "
+        "(stored twice: as sections and as full_text)"
+    )
+    print(f"{'request':>8} {'before':>12} {'after':>12} {'reduction':>10} {'queries':>9}")
+    for request, totals in results.items():
+        before_bytes, before_queries = (total / args.dprs for total in totals["before"])
+        after_bytes, after_queries = (total / args.dprs for total in totals["after"])
+        print(
+            f"{request:>8} {before_bytes / 1024:>10,.1f}KB {after_bytes / 1024:>10,.1f}KB "
+            f"{before_bytes / max(after_bytes, 1):>9.0f}x {before_queries:>4.0f}->{after_queries:<3.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
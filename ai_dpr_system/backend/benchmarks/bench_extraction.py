@@ -0,0 +1,111 @@
+"""
+Section extraction scaling from 10 KB to 50 MB
+
+Generates DPR-like documents of growing size and times
+app.ml.extraction.extract_sections (one precompiled header scan) against
+the original extractor (one lazy DOTALL regex search per section). The
+original is only run up to --baseline-max-mb, as it slows down sharply
+on long documents.
+
+Usage (from ai_dpr_system/backend):
+    python -m benchmarks.bench_extraction [--sizes-kb 10,100,1000,10000,50000]
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+from typing import Dict
+
+from app.ml.extraction import extract_sections
+
+HEADERS = [
+    "EXECUTIVE SUMMARY", "PROJECT BACKGROUND", "SCOPE OF WORK", "OBJECTIVES",
+    "METHODOLOGY", "PROJECT TIMELINE", "BUDGET", "RISK ASSESSMENT",
+    "ENVIRONMENTAL IMPACT", "RESOURCES", "STAKEHOLDERS", "CONCLUSION",
+]
+WORDS = (
+    "the project will construct a bridge across the river with an estimated cost of "
+    "rs 120 crore over 36 months subject to approval of the state government and "
+    "timely release of funds by the implementing agency"
+).split()
+
+# The extractor before the single-pass rewrite
+BASELINE_PATTERNS = {
+    "executive_summary": r"(?i)executive\s+summary[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "project_background": r"(?i)(project\s+background|introduction|background)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "scope": r"(?i)(scope(\s+of\s+work)?|project\s+scope)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "objectives": r"(?i)(objectives|goals|aims)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "methodology": r"(?i)(methodology|approach|implementation\s+approach)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "timeline": r"(?i)(timeline|schedule|project\s+timeline)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "budget": r"(?i)(budget|cost|financial\s+details|project\s+cost)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "risks": r"(?i)(risks?(\s+assessment)?|risk\s+factors)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "environmental_impact": r"(?i)(environmental(\s+impact)?|environment)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "resources": r"(?i)(resources|resource\s+requirements|manpower)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "stakeholders": r"(?i)(stakeholders|stakeholder\s+analysis)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n])",
+    "conclusion": r"(?i)(conclusion|summary)[:\n]+(.*?)(?=\n\s*[A-Z][A-Z\s]+[:\n]|$)",
+}
+
+
+def baseline_extract_sections(text_content: str) -> Dict[str, str]:
+    sections = {}
+    for section_name, pattern in BASELINE_PATTERNS.items():
+        match = re.search(pattern, text_content, re.DOTALL)
+        sections[section_name] = match.group(1).strip() if match else ""
+    sections["full_text"] = text_content
+    return sections
+
+
+def generate_dpr(size: int, seed: int = 0) -> str:
+    """
+    Generate a DPR of about `size` characters with the sections spread evenly
+    """
+    rng = random.Random(seed)
+    per_section = max(1, size // len(HEADERS))
+    parts = []
+    for i, header in enumerate(HEADERS, start=1):
+        body = []
+        length = 0
+        while length < per_section:
+            line = " ".join(rng.choice(WORDS) for _ in range(14)) + "."
+            body.append(line)
+            length += len(line) + 1
+        parts.append(f"{i}. {header}\n" + "\n".join(body))
+    return "\n\n".join(parts) + "\n"
+
+
+def _time(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time section extraction on growing documents")
+    parser.add_argument("--sizes-kb", default="10,100,1000,10000,50000", help="Comma-separated document sizes")
+    parser.add_argument("--baseline-max-mb", type=float, default=10, help="Largest document the original extractor runs on")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the best is reported")
+    args = parser.parse_args()
+
+    def single_pass(text: str) -> Dict[str, str]:
+        return asyncio.run(extract_sections(text))
+
+    print(f"{'size':>10} {'single pass':>12} {'MB/s':>8} {'original':>10} {'MB/s':>8}")
+    for size_kb in (int(size) for size in args.sizes_kb.split(",")):
+        text = generate_dpr(size_kb * 1024)
+        mb = len(text) / 2**20
+        new = _time(single_pass, text, args.repeat)
+        row = f"{size_kb:>8}KB {new:>11.4f}s {mb / new:>8.1f}"
+        if mb <= args.baseline_max_mb:
+            old = _time(baseline_extract_sections, text, args.repeat)
+            row += f" {old:>9.4f}s {mb / old:>8.1f}"
+        else:
+            row += f" {'-':>10} {'-':>8}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
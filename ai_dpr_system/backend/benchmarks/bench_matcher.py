@@ -0,0 +1,88 @@
+"""
+KeywordMatcher scan time as the keyword set grows
+
+Times the two strategies of KeywordMatcher.find, the trie-shaped regex
+and one substring search per keyword on the lowercased text, for keyword
+sets of growing size and a few text sizes, and checks that both find the
+same keywords. TRIE_MIN_KEYWORDS sits between the crossover here and
+the one of the compliance rules in bench_compliance.
+
+Usage (from ai_dpr_system/backend):
+    python -m benchmarks.bench_matcher [--keywords 5,10,20,50,100,200,500] [--text-kb 2,14,100]
+"""
+import argparse
+import random
+import string
+import time
+from typing import FrozenSet, List
+
+from app.ml.matcher import TRIE_MIN_KEYWORDS, KeywordMatcher
+from benchmarks.bench_risk import WORDS
+
+
+def per_keyword_find(keywords: List[str], text: str) -> FrozenSet[str]:
+    """
+    The keywords found by one substring search each on the lowercased text
+    """
+    text = text.lower()
+    return frozenset(keyword for keyword in keywords if keyword in text)
+
+
+def generate_keywords(count: int, seed: int = 0) -> List[str]:
+    """
+    Generate lowercase keywords of 3-12 letters, a few of them from WORDS so that some match
+    """
+    rng = random.Random(seed)
+    keywords = set(rng.sample(sorted(set(WORDS)), min(count // 10, len(set(WORDS)))))
+    while len(keywords) < count:
+        keywords.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12))))
+    return sorted(keywords)
+
+
+def generate_text(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word.capitalize() if rng.random() < 0.1 else word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def _time(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time keyword matching, trie regex and per-keyword search")
+    parser.add_argument("--keywords", default="5,10,20,50,100,200,500", help="Comma-separated keyword counts")
+    parser.add_argument("--text-kb", default="2,14,100", help="Comma-separated text sizes")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement; the best is reported")
+    args = parser.parse_args()
+
+    print(f"TRIE_MIN_KEYWORDS = {TRIE_MIN_KEYWORDS}")
+    print(f"{'text':>6} {'keywords':>9} {'trie':>10} {'per keyword':>12} {'trie speedup':>13} {'same':>5}")
+    for size_kb in (float(size) for size in args.text_kb.split(",")):
+        text = generate_text(int(size_kb * 1024))
+        for count in (int(count) for count in args.keywords.split(",")):
+            keywords = generate_keywords(count)
+            trie = KeywordMatcher(keywords, trie_min_keywords=0)
+            per_keyword = KeywordMatcher(keywords, trie_min_keywords=count + 1)
+            trie_time = _time(lambda: trie.find(text), args.repeat)
+            per_keyword_time = _time(lambda: per_keyword.find(text), args.repeat)
+            expected = per_keyword_find(keywords, text)
+            same = trie.find(text) == expected and per_keyword.find(text) == expected
+            print(
+                f"{size_kb:>4g}KB {count:>9} {trie_time * 1e6:>8.0f}us {per_keyword_time * 1e6:>10.0f}us "
+                f"{per_keyword_time / trie_time:>12.2f}x {str(same):>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Page-parallel OCR throughput against the original serial loop
+
+Generates a scanned PDF and OCRs it twice: with the original loop
+(rasterize every page, then `pytesseract.image_to_string` page by page
+on the calling thread) and with app.ml.ocr, which rasterizes in windows
+and OCRs pages on the OCR_WORKERS process pool. Needs Tesseract and
+poppler (pdftoppm).
+
+Usage (from ai_dpr_system/backend):
+    python -m benchmarks.bench_ocr_parallel [--pages 40] [--workers N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.pdfs import make_pdf
+
+
+def serial_ocr(pdf_path: str, lang: str) -> str:
+    """
+    The OCR loop app.ml.ocr replaced
+    """
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(pdf_path)
+    text_content = []
+    for i, img in enumerate(images):
+        page_text = pytesseract.image_to_string(img, lang=lang)
+        text_content.append(f"--- Page {i+1} ---\n{page_text}\n")
+    return "\n".join(text_content)
+
+
+async def parallel_ocr(pdf_path: str, pages: int) -> str:
+    from app.ml import ocr
+
+    try:
+        results = await ocr._ocr_pdf_pages(pdf_path, list(range(1, pages + 1)))
+        return ocr._join_pages([results[page][0] for page in range(1, pages + 1)])
+    finally:
+        ocr.shutdown_ocr_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare serial and page-parallel OCR")
+    parser.add_argument("--pages", type=int, default=40, help="Pages in the generated PDF")
+    parser.add_argument("--workers", type=int, default=None, help="OCR_WORKERS (default: CPU count)")
+    parser.add_argument("--lang", default="eng", help="Tesseract languages")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read on import; keep the page cache out of the measurement
+        os.environ["DOCUMENT_CACHE_DIR"] = os.path.join(tmp, "cache")
+        os.environ["OCR_LANGUAGES"] = args.lang
+        if args.workers:
+            os.environ["OCR_WORKERS"] = str(args.workers)
+        from app.core.config import settings
+
+        pdf_path = make_pdf(os.path.join(tmp, "scanned.pdf"), args.pages)
+        print(f"{args.pages} scanned pages, {settings.OCR_WORKERS} OCR workers", file=sys.stderr)
+
+        start = time.perf_counter()
+        serial_text = serial_ocr(pdf_path, args.lang)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel_text = asyncio.run(parallel_ocr(pdf_path, args.pages))
+        parallel = time.perf_counter() - start
+
+    print(f"{'OCR':<10} {'seconds':>9} {'pages/s':>9}")
+    print(f"{'serial':<10} {serial:>9.2f} {args.pages / serial:>9.2f}")
+    print(f"{'parallel':<10} {parallel:>9.2f} {args.pages / parallel:>9.2f}")
+    print(f"speedup: {serial / parallel:.2f}x, identical text: {serial_text == parallel_text}")
+
+
+if __name__ == "__main__":
+    main()
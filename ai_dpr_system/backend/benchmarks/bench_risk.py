@@ -0,0 +1,247 @@
+"""
+Heuristic risk scoring throughput
+
+Generates DPR sections and times RiskRuleEngine.score_batch, which
+lowercases each section once and searches it for the trigger phrases of
+its factors, against the original hand-coded predict_risk_heuristic (a
+fresh lowercased copy of the section for every phrase check). Also
+checks that both give the same results.
+
+Usage (from ai_dpr_system/backend):
+    python -m benchmarks.bench_risk [--dprs 2000] [--words 100,400,2000]
+"""
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from app.ml.risk import risk_rule_engine
+
+SECTION_NAMES = ["budget", "timeline", "resources", "environmental_impact", "scope", "objectives"]
+WORDS = (
+    "the project will construct a bridge across the river with an estimated cost of "
+    "rs 120 crore over 36 months subject to approval of the state government and "
+    "timely release of funds by the implementing agency"
+).split()
+PHRASES = [
+    "contingency", "breakdown", "detailed", "milestone", "dependency", "dependent",
+    "allocation", "assign", "skill", "expertise", "mitigation", "assessment",
+    "limitation", "boundary", "deliverable", "Milestones", "DETAILED", "reassigned",
+]
+
+
+def baseline_predict_risk_heuristic(extracted_sections: Dict[str, str]) -> Dict[str, Any]:
+    """
+    predict_risk_heuristic before the rule table, unchanged
+    """
+    # Initialize risk factors
+    risk_factors = {
+        "cost_overrun": 0.0,
+        "schedule_delay": 0.0,
+        "resource_shortage": 0.0,
+        "environmental_risk": 0.0,
+        "scope_creep": 0.0,
+    }
+    
+    risk_details = {}
+    
+    # Extract budget information
+    budget_text = extracted_sections.get("budget", "")
+    if budget_text:
+        # Check for budget risk factors
+        if "contingency" not in budget_text.lower():
+            risk_factors["cost_overrun"] += 30
+            risk_details["cost_overrun"] = {"missing_contingency": "No contingency budget mentioned"}
+        
+        if "breakdown" not in budget_text.lower() and "detailed" not in budget_text.lower():
+            risk_factors["cost_overrun"] += 25
+            if "cost_overrun" not in risk_details:
+                risk_details["cost_overrun"] = {}
+            risk_details["cost_overrun"]["lack_of_detail"] = "Budget lacks detailed breakdown"
+    else:
+        risk_factors["cost_overrun"] = 75
+        risk_details["cost_overrun"] = {"missing_budget": "Budget section is missing"}
+    
+    # Extract timeline information
+    timeline_text = extracted_sections.get("timeline", "")
+    if timeline_text:
+        # Check for timeline risk factors
+        if "milestone" not in timeline_text.lower():
+            risk_factors["schedule_delay"] += 30
+            risk_details["schedule_delay"] = {"missing_milestones": "No clear milestones mentioned"}
+        
+        if "dependency" not in timeline_text.lower() and "dependent" not in timeline_text.lower():
+            risk_factors["schedule_delay"] += 25
+            if "schedule_delay" not in risk_details:
+                risk_details["schedule_delay"] = {}
+            risk_details["schedule_delay"]["missing_dependencies"] = "No task dependencies mentioned"
+    else:
+        risk_factors["schedule_delay"] = 75
+        risk_details["schedule_delay"] = {"missing_timeline": "Timeline section is missing"}
+    
+    # Extract resources information
+    resources_text = extracted_sections.get("resources", "")
+    if resources_text:
+        # Check for resource risk factors
+        if "allocation" not in resources_text.lower() and "assign" not in resources_text.lower():
+            risk_factors["resource_shortage"] += 35
+            risk_details["resource_shortage"] = {"poor_allocation": "Resource allocation not clearly defined"}
+        
+        if "skill" not in resources_text.lower() and "expertise" not in resources_text.lower():
+            risk_factors["resource_shortage"] += 25
+            if "resource_shortage" not in risk_details:
+                risk_details["resource_shortage"] = {}
+            risk_details["resource_shortage"]["missing_skills"] = "Required skills/expertise not specified"
+    else:
+        risk_factors["resource_shortage"] = 70
+        risk_details["resource_shortage"] = {"missing_resources": "Resources section is missing"}
+    
+    # Extract environmental impact information
+    env_text = extracted_sections.get("environmental_impact", "")
+    if env_text:
+        # Check for environmental risk factors
+        if "mitigation" not in env_text.lower():
+            risk_factors["environmental_risk"] += 40
+            risk_details["environmental_risk"] = {"missing_mitigation": "Environmental mitigation measures not mentioned"}
+        
+        if "assessment" not in env_text.lower():
+            risk_factors["environmental_risk"] += 30
+            if "environmental_risk" not in risk_details:
+                risk_details["environmental_risk"] = {}
+            risk_details["environmental_risk"]["missing_assessment"] = "Formal environmental assessment not mentioned"
+    else:
+        risk_factors["environmental_risk"] = 50  # Less severe than other missing sections
+        risk_details["environmental_risk"] = {"missing_section": "Environmental impact section is missing"}
+    
+    # Extract scope information
+    scope_text = extracted_sections.get("scope", "")
+    if scope_text:
+        # Check for scope risk factors
+        if "limitation" not in scope_text.lower() and "boundary" not in scope_text.lower():
+            risk_factors["scope_creep"] += 35
+            risk_details["scope_creep"] = {"missing_boundaries": "Project scope boundaries not clearly defined"}
+        
+        if "deliverable" not in scope_text.lower():
+            risk_factors["scope_creep"] += 25
+            if "scope_creep" not in risk_details:
+                risk_details["scope_creep"] = {}
+            risk_details["scope_creep"]["missing_deliverables"] = "Specific deliverables not mentioned"
+    else:
+        risk_factors["scope_creep"] = 80
+        risk_details["scope_creep"] = {"missing_scope": "Scope section is missing"}
+    
+    # Calculate overall risk score (weighted average)
+    weights = {
+        "cost_overrun": 0.25,
+        "schedule_delay": 0.25,
+        "resource_shortage": 0.2,
+        "environmental_risk": 0.15,
+        "scope_creep": 0.15,
+    }
+    
+    overall_risk = sum(risk_factors[factor] * weights[factor] for factor in risk_factors)
+    
+    # Generate recommendations based on risk factors
+    recommendations = {}
+    
+    if risk_factors["cost_overrun"] > 50:
+        recommendations["budget"] = [
+            "Include a detailed budget breakdown with line items",
+            "Add a contingency budget of at least 10-15% of the total cost",
+            "Include cost estimation methodology and assumptions"
+        ]
+    
+    if risk_factors["schedule_delay"] > 50:
+        recommendations["timeline"] = [
+            "Define clear project milestones with specific dates",
+            "Include task dependencies and critical path analysis",
+            "Add buffer time for unforeseen delays"
+        ]
+    
+    if risk_factors["resource_shortage"] > 50:
+        recommendations["resources"] = [
+            "Clearly define resource allocation for each project phase",
+            "Specify required skills and expertise for each task",
+            "Include contingency plans for resource unavailability"
+        ]
+    
+    if risk_factors["environmental_risk"] > 40:
+        recommendations["environment"] = [
+            "Conduct a formal environmental impact assessment",
+            "Include specific environmental mitigation measures",
+            "Align with environmental regulatory requirements"
+        ]
+    
+    if risk_factors["scope_creep"] > 50:
+        recommendations["scope"] = [
+            "Clearly define project boundaries and limitations",
+            "List specific deliverables with acceptance criteria",
+            "Include change management procedures"
+        ]
+    
+    return {
+        "overall_risk": overall_risk,
+        "risk_factors": risk_factors,
+        "details": risk_details,
+        "recommendations": recommendations
+    }
+
+
+def generate_risk_sections(seed: int, words: int = 400) -> Dict[str, str]:
+    """
+    Generate the extracted sections of a DPR, some missing, some with trigger phrases
+    """
+    rng = random.Random(seed)
+    sections = {}
+    for name in SECTION_NAMES:
+        roll = rng.random()
+        if roll < 0.15:
+            continue
+        if roll < 0.2:
+            sections[name] = ""
+            continue
+        body = [rng.choice(WORDS) for _ in range(rng.randint(words // 2, words * 2))]
+        for _ in range(rng.randint(0, 4)):
+            body.insert(rng.randrange(len(body) + 1), rng.choice(PHRASES))
+        sections[name] = " ".join(body)
+    return sections
+
+
+def _time(funcs, repeat: int) -> List[float]:
+    """
+    Best time of each function, run in turn so that drift in the machine's speed hits all of them
+    """
+    best = [float("inf")] * len(funcs)
+    for _ in range(repeat):
+        for index, func in enumerate(funcs):
+            start = time.perf_counter()
+            func()
+            best[index] = min(best[index], time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time heuristic risk scoring, hand-coded and rule table")
+    parser.add_argument("--dprs", type=int, default=2000, help="Number of DPRs scored per run")
+    parser.add_argument("--words", default="100,400,2000", help="Comma-separated average words per section")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported")
+    args = parser.parse_args()
+
+    print(f"{'words':>6} {'original':>12} {'rule table':>12} {'speedup':>8} {'same':>5}")
+    for words in (int(words) for words in args.words.split(",")):
+        dprs: List[Dict[str, str]] = [generate_risk_sections(seed, words) for seed in range(args.dprs)]
+        old, new = _time([
+            lambda: [baseline_predict_risk_heuristic(sections) for sections in dprs],
+            lambda: risk_rule_engine.score_batch(dprs),
+        ], args.repeat)
+        same = all(
+            risk_rule_engine.score(sections) == baseline_predict_risk_heuristic(sections) for sections in dprs
+        )
+        print(
+            f"{words:>6} {len(dprs) / old:>8,.0f}/s {len(dprs) / new:>10,.0f}/s "
+            f"{old / new:>7.1f}x {str(same):>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Upload and download throughput and memory for large DPR files
+
+Writes a file of --size-mb, then saves it through the configured storage
+backend as an UploadFile, streams it back in chunks the way the download
+endpoint does, and copies it to a local path the way the pipeline does.
+Reports MB/s for each step and the peak RSS of the process, which should
+stay far below the file size.
+
+The backend is chosen like in the app: S3 when S3_BUCKET_NAME and the AWS
+credentials are set (S3_ENDPOINT_URL points it at e.g. a local MinIO),
+otherwise the local STORAGE_DIR.
+
+Usage (from ai_dpr_system/backend):
+    python -m benchmarks.bench_storage [--size-mb 500]
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.core.storage import CHUNK_SIZE, get_storage
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def write_file(path: str, size_mb: int) -> None:
+    block = os.urandom(CHUNK_SIZE)
+    with open(path, "wb") as f:
+        for _ in range(size_mb * 1024 * 1024 // CHUNK_SIZE):
+            f.write(block)
+
+
+async def run(size_mb: int, work_dir: str) -> None:
+    source = os.path.join(work_dir, "source.pdf")
+    write_file(source, size_mb)
+    storage = get_storage()
+    print(f"backend: {type(storage).__name__}, file: {size_mb} MB, baseline peak RSS {peak_rss_mb():.0f} MB")
+    print(f"{'step':>10} {'seconds':>8} {'MB/s':>8} {'peak RSS':>9}")
+
+    def report(step: str, seconds: float) -> None:
+        print(f"{step:>10} {seconds:>8.2f} {size_mb / seconds:>8.0f} {peak_rss_mb():>7.0f}MB")
+
+    with open(source, "rb") as f:
+        upload = UploadFile(
+            f, filename="source.pdf", headers=Headers({"content-type": "application/pdf"})
+        )
+        start = time.perf_counter()
+        file_path = await storage.save(upload, f"bench-{os.getpid()}.pdf")
+        report("upload", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    received = 0
+    async for chunk in storage.stream(file_path):
+        received += len(chunk)
+    report("stream", time.perf_counter() - start)
+    if received != size_mb * 1024 * 1024:
+        raise RuntimeError(f"Streamed {received} bytes, expected {size_mb * 1024 * 1024}")
+
+    start = time.perf_counter()
+    await storage.download(file_path, os.path.join(work_dir, "copy.pdf"))
+    report("download", time.perf_counter() - start)
+
+    if file_path.startswith("s3://"):
+        storage.client.delete_object(**storage._split(file_path))
+    else:
+        os.remove(file_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time large file upload and download through storage")
+    parser.add_argument("--size-mb", type=int, default=500, help="File size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        asyncio.run(run(args.size_mb, work_dir))
+
+
+if __name__ == "__main__":
+    main()
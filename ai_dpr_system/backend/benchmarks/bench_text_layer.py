@@ -0,0 +1,73 @@
+"""
+Text-layer fast path on mixed born-digital and scanned PDFs
+
+Generates a PDF where every Nth page is scanned and the rest have an
+embedded text layer, then extracts its text twice: by OCRing every page
+(the behaviour before the fast path) and with app.ml.ocr._process_pdf,
+which uses the text layer where it is usable and OCRs only the other
+pages. Needs Tesseract and poppler (pdftoppm).
+
+Usage (from ai_dpr_system/backend):
+    python -m benchmarks.bench_text_layer [--pages 40] [--scanned-every 5]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.pdfs import make_pdf
+
+
+async def ocr_every_page(pdf_path: str, pages: int) -> None:
+    from app.ml import ocr
+
+    await ocr._ocr_pdf_pages(pdf_path, list(range(1, pages + 1)))
+
+
+async def text_layer_first(pdf_path: str) -> Counter:
+    from app.ml import ocr
+
+    pages, _ = await ocr._process_pdf(pdf_path)
+    return Counter(page["method"] for page in pages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare OCRing every page with the text-layer fast path")
+    parser.add_argument("--pages", type=int, default=40, help="Pages in the generated PDF")
+    parser.add_argument("--scanned-every", type=int, default=5, help="Make every Nth page a scanned image")
+    parser.add_argument("--lang", default="eng", help="Tesseract languages")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["OCR_LANGUAGES"] = args.lang
+        pdf_path = make_pdf(
+            os.path.join(tmp, "mixed.pdf"), args.pages, scanned=lambda page: page % args.scanned_every == 0
+        )
+
+        timings = {}
+        methods = None
+        for name in ("ocr every page", "text layer"):
+            # A fresh page cache per run, so neither run reuses OCR results
+            from app.ml import cache, ocr
+            cache.document_cache.cache_dir = os.path.join(tmp, name.replace(" ", "-"))
+            try:
+                start = time.perf_counter()
+                if name == "text layer":
+                    methods = asyncio.run(text_layer_first(pdf_path))
+                else:
+                    asyncio.run(ocr_every_page(pdf_path, args.pages))
+                timings[name] = time.perf_counter() - start
+            finally:
+                ocr.shutdown_ocr_pool()
+
+    print(f"{args.pages} pages: {methods['text_layer']} text layer, {methods['ocr']} OCR")
+    print(f"{'path':<16} {'seconds':>9} {'pages/s':>9}")
+    for name, seconds in timings.items():
+        print(f"{name:<16} {seconds:>9.2f} {args.pages / seconds:>9.2f}")
+    print(f"speedup: {timings['ocr every page'] / timings['text layer']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Schema creation and bulk seeding for benchmarks and tests
+
+The models use PostgreSQL UUID and JSONB columns. Importing this module
+teaches SQLAlchemy to create them on SQLite too, so the benchmarks and
+tests can run against a local SQLite stand-in as well as Postgres.
+"""
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import insert, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+
+from app.db.base_class import Base
+from app.models.dpr import DPR
+from app.models.evaluation import Evaluation
+from app.models.risk_assessment import RiskAssessment
+from app.models.user import User
+import app.models.job  # noqa: F401 - registers the jobs table
+import app.models.section_blob  # noqa: F401 - registers the section_blobs table
+
+STATUSES = ["pending", "processing", "evaluated", "risk_assessed", "failed"]
+
+# The indexes are created by database/init.sql rather than by the models
+INIT_SQL = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "database", "init.sql"
+)
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    # SQLite stores the JSONB columns as JSON
+    return "JSON"
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+def create_schema(engine: Engine, drop: bool = False, indexes: bool = False) -> None:
+    """
+    Create all tables, optionally dropping existing ones first
+
+    With `indexes`, the CREATE INDEX statements of database/init.sql are
+    run too, so that queries are planned like in production.
+    """
+    if drop:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    if indexes:
+        with open(INIT_SQL, encoding="utf-8") as f:
+            statements = [line.strip() for line in f if line.startswith("CREATE INDEX")]
+        with engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+
+
+def seed(
+    engine: Engine,
+    users: int,
+    dprs: int,
+    assessed_fraction: float = 0.5,
+    batch_size: int = 10000,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Insert `users` users (the first one an admin) and `dprs` DPRs spread over them
+
+    DPRs get random statuses and creation times over the last two years;
+    about `assessed_fraction` of them get an evaluation and a risk
+    assessment. Rows are inserted in batches of `batch_size`.
+
+    Returns the inserted users as dictionaries.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    user_rows = [
+        {
+            "id": uuid.uuid4(),
+            "email": f"user{index}@example.com",
+            "full_name": f"User {index}",
+            "hashed_password": "x",
+            "is_admin": index == 0,
+            "is_reviewer": False,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(users)
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(User), user_rows)
+
+    for start in range(0, dprs, batch_size):
+        dpr_rows, evaluation_rows, risk_rows = [], [], []
+        for _ in range(min(batch_size, dprs - start)):
+            dpr_id = uuid.uuid4()
+            owner = rng.choice(user_rows)["id"]
+            created_at = now - timedelta(seconds=rng.randrange(2 * 365 * 24 * 3600))
+            assessed = rng.random() < assessed_fraction
+            dpr_rows.append({
+                "id": dpr_id,
+                "title": f"DPR {start + len(dpr_rows)}",
+                "file_path": f"/storage/{dpr_id}.pdf",
+                "uploaded_by": owner,
+                "status": "risk_assessed" if assessed else rng.choice(STATUSES),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            if assessed:
+                evaluation_rows.append({
+                    "id": uuid.uuid4(),
+                    "dpr_id": dpr_id,
+                    "evaluated_by": owner,
+                    "compliance_score": rng.uniform(0, 100),
+                    "compliance_details": {"overall_score": 0},
+                    "section_refs": {},
+                    "status": "completed",
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+                risk_rows.append({
+                    "id": uuid.uuid4(),
+                    "dpr_id": dpr_id,
+                    "evaluated_by": owner,
+                    "overall_risk_score": rng.uniform(0, 100),
+                    "risk_factors": {},
+                    "risk_details": {},
+                    "recommendations": {},
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+        with engine.begin() as connection:
+            connection.execute(insert(DPR), dpr_rows)
+            if evaluation_rows:
+                connection.execute(insert(Evaluation), evaluation_rows)
+                connection.execute(insert(RiskAssessment), risk_rows)
+    return user_rows
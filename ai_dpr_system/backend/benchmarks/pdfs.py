@@ -0,0 +1,64 @@
+"""
+Synthetic DPR PDFs for the OCR benchmarks and tests
+"""
+import random
+from typing import Callable, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+WORDS = (
+    "project budget timeline scope objectives methodology risk district "
+    "road bridge water supply health education crore lakh months phase "
+    "implementation agency state government approval estimate contractor"
+).split()
+
+
+def _lines(rng: random.Random, count: int, words: int = 12):
+    return [" ".join(rng.choice(WORDS) for _ in range(words)) for _ in range(count)]
+
+
+def _font(size: int):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def make_pdf(
+    path: str,
+    pages: int,
+    scanned: Optional[Callable[[int], bool]] = None,
+    seed: int = 0,
+) -> str:
+    """
+    Write a PDF of `pages` pages of random DPR-like text
+
+    Pages for which `scanned(page_number)` is true (all pages by default)
+    are drawn as images with no text layer, like a scanned document;
+    the others get an embedded text layer.
+    """
+    rng = random.Random(seed)
+    width, height = A4
+    pdf = canvas.Canvas(path, pagesize=A4)
+    font = _font(22)
+    for page_number in range(1, pages + 1):
+        lines = [f"Page {page_number}"] + _lines(rng, 30)
+        if scanned is None or scanned(page_number):
+            # A4 at 150 dpi
+            img = Image.new("L", (1240, 1754), 255)
+            draw = ImageDraw.Draw(img)
+            for i, line in enumerate(lines):
+                draw.text((90, 90 + i * 50), line, fill=0, font=font)
+            pdf.drawImage(ImageReader(img), 0, 0, width, height)
+        else:
+            text = pdf.beginText(40, height - 50)
+            text.setFont("Helvetica", 11)
+            for line in lines:
+                text.textLine(line)
+            pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+    return path
@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Make `app` and `benchmarks` importable when pytest runs from elsewhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read on import: run against a local SQLite database and keep
+# caches and uploads out of the working tree
+_tmp = tempfile.mkdtemp(prefix="dpr-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'test.db')}")
+os.environ.setdefault("DOCUMENT_CACHE_DIR", os.path.join(_tmp, "cache"))
+os.environ.setdefault("STORAGE_DIR", os.path.join(_tmp, "storage"))
+os.environ.setdefault("JOB_WORKERS", "0")
+
+from benchmarks.database import create_schema  # noqa: E402 - also lets SQLite create the PG column types
+
+
+@pytest.fixture
+def db():
+    """
+    Session on a freshly created schema in the test database
+    """
+    from app.db.session import SessionLocal, engine
+
+    create_schema(engine, drop=True)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db):
+    from app.models.user import User
+
+    user = User(email="uploader@example.com", full_name="Uploader", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def client(db, user):
+    """
+    API client authenticated as `user`
+    """
+    from fastapi.testclient import TestClient
+
+    from app.core.auth import get_current_active_user
+    from app.db.session import get_db
+    from app.main import app
+
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
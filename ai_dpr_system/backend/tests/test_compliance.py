@@ -0,0 +1,79 @@
+"""
+Compliance rule engine against the original hand-written checks
+"""
+import json
+
+import pytest
+
+from app.ml.cache import SectionResultCache
+from app.ml.compliance import RULES_PATH, ComplianceRuleEngine
+from app.ml.matcher import TRIE_MIN_KEYWORDS
+from benchmarks.bench_compliance import baseline_check_compliance, generate_sections, grow_rules
+
+LONG = "The bridge across the river will be built by the implementing agency. " * 3
+
+FIXTURES = [
+    {},
+    {"full_text": "no sections were found"},
+    {
+        "executive_summary": LONG,
+        "project_background": LONG + " Details TBD.",
+        "scope": "Too short; tba",
+        "objectives": LONG + " lorem ipsum and to be filled",
+        "methodology": "",
+        "timeline": LONG + " Work will BEGIN in April and finish within 36 Months.",
+        "budget": LONG + " Total cost Rs. 120 crore.",
+        "risks": LONG,
+        "environmental_impact": "short tbd",
+    },
+    {
+        # Keywords that only occur inside longer words still count, as with `in`
+        "timeline": LONG + " The contractor will attend weekly reviews; restart in 30 days.",
+        "budget": LONG + " Subtotal in INR, totally funded.",
+    },
+    {
+        "timeline": LONG + " No dates yet.",
+        "budget": LONG + " Amounts in dollars.",
+    },
+]
+
+
+@pytest.fixture(scope="module", params=[TRIE_MIN_KEYWORDS, 0])
+def engine(request):
+    # The shipped rules with the default matchers, and with every section on the trie regex
+    with open(RULES_PATH, "r", encoding="utf-8") as f:
+        return ComplianceRuleEngine(json.load(f), trie_min_keywords=request.param)
+
+
+def _strategies(engine):
+    return {matcher.strategy for matcher in engine.matchers.values()}
+
+
+def test_matcher_strategy_follows_the_rule_set_size():
+    with open(RULES_PATH, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+
+    # The shipped rules have too few keywords per section for the trie regex to pay off
+    assert _strategies(ComplianceRuleEngine(rules)) == {"per keyword"}
+    assert _strategies(ComplianceRuleEngine(rules, trie_min_keywords=0)) == {"trie"}
+    assert "trie" in _strategies(ComplianceRuleEngine(grow_rules(rules, 500)))
+
+
+@pytest.mark.parametrize("sections", FIXTURES + [generate_sections(seed) for seed in range(200)])
+def test_engine_matches_the_original_checks(engine, sections):
+    expected = baseline_check_compliance(sections)
+    actual = engine.evaluate(sections)
+    assert actual == expected
+    assert list(actual) == list(expected)
+
+
+def test_incremental_results_match(engine):
+    cache = SectionResultCache(1000)
+    for seed in range(50):
+        sections = generate_sections(seed)
+        expected = baseline_check_compliance(sections)
+        assert engine.evaluate_incremental(sections, cache)[0] == expected
+        # Second time round every section comes from the cache
+        results, recomputed = engine.evaluate_incremental(sections, cache)
+        assert results == expected
+        assert recomputed == []
@@ -0,0 +1,68 @@
+"""
+Dashboard statistics cache invalidation
+"""
+import pytest
+
+from app.models.dpr import DPR
+from app.utils.cache import dashboard_cache
+
+
+@pytest.fixture
+def cached(db):
+    dashboard_cache.ttl = 60
+    dashboard_cache.invalidate()
+    dashboard_cache.set("all", {"total_dprs": 0})
+    yield lambda: dashboard_cache.get("all") is not None
+    dashboard_cache.invalidate()
+
+
+def test_status_change_invalidates_on_commit(db, user, cached):
+    dpr = DPR(title="Road", file_path="/storage/road.pdf", uploaded_by=user.id)
+    db.add(dpr)
+    db.commit()
+    dashboard_cache.set("all", {"total_dprs": 1})
+
+    dpr.status = "evaluated"
+    db.flush()
+    assert cached(), "must not invalidate before the change is committed"
+    db.commit()
+    assert not cached()
+
+
+def test_insert_and_delete_invalidate_on_commit(db, user, cached):
+    dpr = DPR(title="Road", file_path="/storage/road.pdf", uploaded_by=user.id)
+    db.add(dpr)
+    db.flush()
+    assert cached()
+    db.commit()
+    assert not cached()
+
+    dashboard_cache.set("all", {"total_dprs": 1})
+    db.delete(dpr)
+    db.flush()
+    assert cached()
+    db.commit()
+    assert not cached()
+
+
+def test_rollback_keeps_cache(db, user, cached):
+    dpr = DPR(title="Road", file_path="/storage/road.pdf", uploaded_by=user.id)
+    db.add(dpr)
+    db.flush()
+    db.rollback()
+    assert cached()
+
+    # The rolled back change is forgotten, not invalidated with the next commit
+    db.commit()
+    assert cached()
+
+
+def test_savepoint_rollback_keeps_earlier_changes(db, user, cached):
+    db.add(DPR(title="Road", file_path="/storage/road.pdf", uploaded_by=user.id))
+    db.flush()
+    with db.begin_nested() as savepoint:
+        db.add(DPR(title="Bridge", file_path="/storage/bridge.pdf", uploaded_by=user.id))
+        db.flush()
+        savepoint.rollback()
+    db.commit()
+    assert not cached()
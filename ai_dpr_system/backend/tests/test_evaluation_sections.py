@@ -0,0 +1,94 @@
+"""
+Explicit loading of evaluation section texts
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.db.session import AsyncSessionLocal, SessionLocal, engine
+from app.models.dpr import DPR, dpr as crud_dpr
+from app.models.evaluation import Evaluation, evaluation as crud_evaluation
+from app.schemas.evaluation import EvaluationCreate
+
+SECTIONS = {"budget": "Cost 10 crore", "timeline": "Two years", "full_text": "Cost 10 crore. Two years."}
+
+
+@pytest.fixture
+def stored(db, user):
+    """
+    A DPR with one evaluation whose sections are in section_blobs and one with legacy inline sections
+    """
+    dpr = DPR(title="Road", file_path="/storage/road.pdf", uploaded_by=user.id)
+    db.add(dpr)
+    db.flush()
+    legacy = Evaluation(
+        dpr_id=dpr.id, evaluated_by=user.id, compliance_score=40.0,
+        compliance_details={}, inline_sections={"scope": "Old"}, created_at=datetime(2020, 1, 1),
+    )
+    db.add(legacy)
+    db.flush()
+    evaluation = crud_evaluation.create_with_sections(
+        db,
+        obj_in=EvaluationCreate(
+            dpr_id=dpr.id, evaluated_by=user.id, compliance_score=80.0, compliance_details={}
+        ),
+        sections=SECTIONS,
+    )
+    db.commit()
+    return dpr.id, legacy.id, evaluation.id
+
+
+@pytest.fixture
+def queries():
+    """
+    Statements executed on the sync engine during the test
+    """
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_sections_are_not_loaded_implicitly(stored):
+    dpr_id, _, _ = stored
+    with SessionLocal() as db:
+        _, evaluation, _ = crud_dpr.get_with_latest(db, dpr_id)
+        assert not evaluation.sections_loaded
+        with pytest.raises(RuntimeError):
+            evaluation.extracted_sections
+
+
+def test_get_with_latest_loads_sections(stored, queries):
+    dpr_id, _, _ = stored
+    with SessionLocal() as db:
+        _, evaluation, _ = crud_dpr.get_with_latest(db, dpr_id, sections=True)
+        assert len(queries) == 2
+        assert evaluation.extracted_sections == SECTIONS
+        # Reading the sections issues no further query
+        assert len(queries) == 2
+
+
+def test_load_sections_batches_blob_and_legacy_rows(stored):
+    _, legacy_id, evaluation_id = stored
+    with SessionLocal() as db:
+        evaluations = db.query(Evaluation).filter(Evaluation.id.in_([legacy_id, evaluation_id])).all()
+        crud_evaluation.load_sections(db, evaluations + [None])
+        by_id = {evaluation.id: evaluation.extracted_sections for evaluation in evaluations}
+    assert by_id == {legacy_id: {"scope": "Old"}, evaluation_id: SECTIONS}
+
+
+def test_get_with_latest_async_loads_sections(stored):
+    dpr_id, _, _ = stored
+
+    async def load():
+        async with AsyncSessionLocal() as db:
+            _, evaluation, _ = await crud_dpr.get_with_latest_async(db, dpr_id, sections=True)
+            return evaluation.extracted_sections
+
+    assert asyncio.run(load()) == SECTIONS
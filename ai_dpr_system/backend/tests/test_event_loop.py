@@ -0,0 +1,74 @@
+"""
+Endpoints keep synchronous database work off the event loop
+"""
+import asyncio
+import inspect
+
+import pytest
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from app.db.session import engine, get_db
+from app.main import app
+from app.models.dpr import DPR
+
+# Async endpoints on the sync session: they await other work and run
+# their queries through asyncio.to_thread
+OFFLOADED = {
+    "evaluate_dpr",
+    "predict_dpr_risk",
+    "generate_pdf",
+    "generate_csv",
+    "upload_dpr_file",
+}
+
+
+@pytest.fixture
+def queries_on_loop():
+    """
+    Statements executed while an event loop is running in the same thread
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_async_endpoints_do_not_use_the_sync_session():
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or not inspect.iscoroutinefunction(route.endpoint):
+            continue
+        if any(dependency.call is get_db for dependency in route.dependant.dependencies):
+            assert route.endpoint.__name__ in OFFLOADED, route.path
+
+
+def test_upload_queries_run_in_a_worker_thread(client, db, queries_on_loop):
+    response = client.post(
+        "/api/v1/upload/",
+        params={"title": "Bridge DPR"},
+        files={"file": ("bridge.txt", b"1. Executive Summary\nA bridge.", "text/plain")},
+    )
+
+    assert response.status_code == 200, response.text
+    assert db.query(DPR).count() == 1
+    assert queries_on_loop == []
+
+
+def test_job_queries_run_in_a_worker_thread(client, db, user, queries_on_loop):
+    dpr = DPR(title="Road DPR", file_path="road.txt", uploaded_by=user.id)
+    db.add(dpr)
+    db.commit()
+
+    response = client.post("/api/v1/jobs/", json={"job_type": "evaluate", "dpr_id": str(dpr.id)})
+    assert response.status_code == 200, response.text
+    assert queries_on_loop == []
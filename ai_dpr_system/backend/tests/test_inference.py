@@ -0,0 +1,79 @@
+"""
+Risk inference micro-batcher with a stand-in model
+"""
+import asyncio
+import threading
+import time
+
+from app.ml.inference import RiskInferenceEngine
+
+
+class _Model:
+    version = "test"
+    estimator = object()
+
+
+def _engine(predict_batch):
+    engine = RiskInferenceEngine("unused", max_batch_size=2, max_wait_ms=1, reload_interval=3600)
+    # Pretend the model was just loaded, so predict() goes straight to the batcher
+    engine._model = _Model()
+    engine._last_reload_check = time.monotonic()
+    engine._predict_batch = predict_batch
+    return engine
+
+
+def test_predictions_are_batched():
+    engine = _engine(lambda batch: ([float(len(batch))] * len(batch), "test"))
+
+    async def run():
+        results = await asyncio.gather(*(engine.predict({"full_text": "x"}) for _ in range(4)))
+        await engine.stop()
+        return results
+
+    results = asyncio.run(run())
+    assert all(result["model_version"] == "test" for result in results)
+    assert engine.stats()["errors"] == 0
+
+
+def test_stopped_batcher_fails_pending_requests():
+    release = threading.Event()
+
+    def blocking_predict(batch):
+        release.wait(5)
+        return [0.0] * len(batch), "test"
+
+    engine = _engine(blocking_predict)
+
+    async def run():
+        # Two requests fill the batch in progress, the rest stay queued
+        requests = [asyncio.create_task(engine.predict({"full_text": "x"})) for _ in range(5)]
+        await asyncio.sleep(0.1)
+        await engine.stop()
+        try:
+            return await asyncio.wait_for(asyncio.gather(*requests), 2)
+        finally:
+            release.set()
+
+    assert asyncio.run(run()) == [None] * 5
+    assert engine.stats()["errors"] == 5
+
+
+def test_dead_batcher_is_restarted_and_queue_drained():
+    engine = _engine(lambda batch: ([50.0] * len(batch), "test"))
+
+    async def run():
+        assert await engine.predict({"full_text": "x"}) is not None
+        old_queue = engine._queue
+        engine._batcher.cancel()
+        await asyncio.sleep(0)
+        # A request left behind in the old queue must not hang
+        future = asyncio.get_running_loop().create_future()
+        old_queue.put_nowait(({}, future, time.perf_counter()))
+
+        result = await engine.predict({"full_text": "x"})
+        await engine.stop()
+        return future, result
+
+    future, result = asyncio.run(run())
+    assert isinstance(future.exception(), RuntimeError)
+    assert result == {"overall_risk": 50.0, "model_version": "test"}
@@ -0,0 +1,33 @@
+"""
+Job endpoints
+"""
+from app.models.dpr import DPR
+
+
+def _dpr(db, user) -> DPR:
+    dpr = DPR(title="Road DPR", file_path="road.txt", uploaded_by=user.id)
+    db.add(dpr)
+    db.commit()
+    return dpr
+
+
+def test_only_admins_set_job_priority(client, db, user):
+    dpr = _dpr(db, user)
+
+    response = client.post("/api/v1/jobs/", json={"job_type": "evaluate", "dpr_id": str(dpr.id), "priority": 5})
+    assert response.status_code == 403
+
+    response = client.post("/api/v1/jobs/", json={"job_type": "evaluate", "dpr_id": str(dpr.id)})
+    assert response.status_code == 200, response.text
+    assert response.json()["priority"] == 0
+
+
+def test_job_priority_is_bounded(client, db, user):
+    user.is_admin = True
+    dpr = _dpr(db, user)
+
+    response = client.post("/api/v1/jobs/", json={"job_type": "evaluate", "dpr_id": str(dpr.id), "priority": 10})
+    assert response.status_code == 200, response.text
+
+    response = client.post("/api/v1/jobs/", json={"job_type": "evaluate", "dpr_id": str(dpr.id), "priority": 1000})
+    assert response.status_code == 422
@@ -0,0 +1,213 @@
+"""
+Background job queue on a local SQLite database
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.jobs import JobQueue
+from app.models.job import Job
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Job.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def _make_queue(session_factory, handler, failures=None, **options):
+    options = {"workers": 1, "poll_interval": 0.01, "retry_backoff": 0,
+               "lease_timeout": 60, "heartbeat_interval": 0.05, **options}
+    queue = JobQueue(session_factory, **options)
+
+    def on_failure(db, job, error):
+        failures.append((job.id, error))
+
+    queue.register("evaluate", handler, on_failure=on_failure if failures is not None else None)
+    return queue
+
+
+async def _done(db, job):
+    return {"ok": True}
+
+
+def _enqueue(queue, session_factory, **kwargs) -> str:
+    db = session_factory()
+    try:
+        return queue.enqueue(db, "evaluate", uuid.uuid4(), **kwargs).id
+    finally:
+        db.close()
+
+
+def _get(session_factory, job_id) -> Job:
+    db = session_factory()
+    try:
+        return db.query(Job).filter(Job.id == job_id).one()
+    finally:
+        db.close()
+
+
+def _expire_lease(session_factory, job_id, seconds=120):
+    db = session_factory()
+    try:
+        db.query(Job).filter(Job.id == job_id).update(
+            {"heartbeat_at": datetime.utcnow() - timedelta(seconds=seconds)}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_expired_lease_is_queued_again(session_factory):
+    queue = _make_queue(session_factory, _done)
+    job_id = _enqueue(queue, session_factory)
+    assert queue._claim() == job_id
+
+    # A fresh lease is left alone
+    assert queue.requeue_expired_jobs() == 0
+    assert _get(session_factory, job_id).status == "running"
+
+    _expire_lease(session_factory, job_id)
+    assert queue.requeue_expired_jobs() == 1
+    job = _get(session_factory, job_id)
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert job.heartbeat_at is None
+
+
+def test_expired_lease_without_attempts_left_fails(session_factory):
+    failures = []
+    queue = _make_queue(session_factory, _done, failures)
+    job_id = _enqueue(queue, session_factory, max_attempts=1)
+    assert queue._claim() == job_id
+
+    _expire_lease(session_factory, job_id)
+    assert queue.requeue_expired_jobs() == 1
+    job = _get(session_factory, job_id)
+    assert job.status == "failed"
+    assert job.finished_at is not None
+    assert failures == [(job_id, "Lease expired after attempt 1")]
+
+
+def test_running_job_renews_its_lease(session_factory):
+    leases = []
+
+    async def slow(db, job):
+        await asyncio.sleep(0.3)
+        leases.append(_get(session_factory, job.id).heartbeat_at)
+        return None
+
+    queue = _make_queue(session_factory, slow)
+    job_id = _enqueue(queue, session_factory)
+    assert queue._claim() == job_id
+    started_at = _get(session_factory, job_id).started_at
+
+    asyncio.run(queue.run_job(job_id))
+
+    assert leases[0] > started_at
+    job = _get(session_factory, job_id)
+    assert job.status == "completed"
+    assert job.heartbeat_at is None
+
+
+def test_workers_recover_jobs_of_a_crashed_process(session_factory):
+    queue = _make_queue(session_factory, _done)
+    job_id = _enqueue(queue, session_factory)
+    # Claimed by a process that died 2 minutes ago
+    assert queue._claim() == job_id
+    _expire_lease(session_factory, job_id)
+
+    async def run():
+        await queue.start()
+        try:
+            for _ in range(200):
+                if _get(session_factory, job_id).status == "completed":
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await queue.stop()
+
+    asyncio.run(run())
+    job = _get(session_factory, job_id)
+    assert job.status == "completed"
+    assert job.attempts == 2
+
+
+def test_stop_releases_running_jobs(session_factory):
+    started = []
+
+    async def forever(db, job):
+        started.append(job.id)
+        await asyncio.sleep(60)
+
+    queue = _make_queue(session_factory, forever)
+    job_id = _enqueue(queue, session_factory)
+
+    async def run():
+        await queue.start()
+        for _ in range(200):
+            if started:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(run())
+    job = _get(session_factory, job_id)
+    assert started == [job_id]
+    assert job.status == "queued"
+    assert job.attempts == 0
+
+
+def test_unstorable_result_fails_the_attempt(session_factory):
+    async def unserializable(db, job):
+        return {"at": object()}
+
+    queue = _make_queue(session_factory, unserializable)
+    job_id = _enqueue(queue, session_factory, max_attempts=1)
+    assert queue._claim() == job_id
+
+    asyncio.run(queue.run_job(job_id))
+
+    job = _get(session_factory, job_id)
+    assert job.status == "failed"
+    assert job.error.startswith("Could not store the result: ")
+
+
+def test_worker_survives_a_failing_commit(session_factory, monkeypatch):
+    queue = _make_queue(session_factory, _done)
+    first = _enqueue(queue, session_factory)
+    second = _enqueue(queue, session_factory)
+    broken = []
+
+    def record_failure(db, job, error):
+        broken.append(job.id)
+        raise RuntimeError("database went away")
+
+    def record_success(db, job, result):
+        if job.id == first:
+            raise RuntimeError("database went away")
+        JobQueue._record_success(queue, db, job, result)
+
+    monkeypatch.setattr(queue, "_record_success", record_success)
+    monkeypatch.setattr(queue, "_record_failure", record_failure)
+
+    async def run():
+        await queue.start()
+        try:
+            for _ in range(200):
+                if _get(session_factory, second).status == "completed":
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await queue.stop()
+
+    asyncio.run(run())
+    assert broken == [first]
+    # The first job keeps its lease until it expires; the worker went on to the next one
+    assert _get(session_factory, first).status == "running"
+    assert _get(session_factory, second).status == "completed"
@@ -0,0 +1,40 @@
+"""
+KeywordMatcher against one substring search per keyword
+"""
+import random
+
+import pytest
+
+from app.ml.matcher import TRIE_MIN_KEYWORDS, KeywordMatcher
+from benchmarks.bench_matcher import generate_keywords, generate_text, per_keyword_find
+
+
+@pytest.mark.parametrize("keywords, text", [
+    ([], "anything"),
+    (["end"], ""),
+    (["tbd", "tba"], "Budget TBD, schedule tba"),
+    # Prefixes, overlaps and keywords inside longer words
+    (["mile", "milestone", "stone", "one"], "Milestones are set"),
+    (["end", "ending", "spend"], "spending"),
+    (["ab", "bab", "abab"], "ababab"),
+    (["rs.", "inr"], "Cost in Rs. and INR"),
+    (["rs."], "rsx"),
+    (["to be filled", "be"], "To Be Filled"),
+])
+@pytest.mark.parametrize("trie_min_keywords", [0, TRIE_MIN_KEYWORDS])
+def test_find_matches_substring_checks(keywords, text, trie_min_keywords):
+    matcher = KeywordMatcher(keywords, trie_min_keywords=trie_min_keywords)
+    assert matcher.find(text) == per_keyword_find([k.lower() for k in keywords], text)
+
+
+@pytest.mark.parametrize("trie_min_keywords", [0, TRIE_MIN_KEYWORDS])
+@pytest.mark.parametrize("count", [1, 10, 100, 500])
+def test_find_matches_on_generated_text(count, trie_min_keywords):
+    rng = random.Random(count)
+    keywords = generate_keywords(count, seed=count)
+    # Add prefixes and infixes of existing keywords
+    keywords += [keyword[:rng.randint(1, len(keyword))] for keyword in rng.sample(keywords, count // 2)]
+    keywords += [keyword[1:-1] for keyword in keywords if len(keyword) > 3][:count // 2]
+    text = generate_text(4000, seed=count)
+    matcher = KeywordMatcher(keywords, trie_min_keywords=trie_min_keywords)
+    assert matcher.find(text) == per_keyword_find(keywords, text)
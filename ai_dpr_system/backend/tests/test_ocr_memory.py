@@ -0,0 +1,52 @@
+"""
+Peak memory of windowed PDF rasterization
+"""
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.pdfs import make_pdf
+
+pytestmark = pytest.mark.skipif(shutil.which("pdftoppm") is None, reason="poppler is not installed")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rasterizes and fingerprints every page like load_document does, with
+# Tesseract replaced by blank pages so only the rasterization is measured
+PEAK_RSS_SCRIPT = """
+import asyncio, resource, sys
+from app.ml import ocr
+
+async def blank_pages(images):
+    return [""] * len(images)
+
+ocr._ocr_images = blank_pages
+pages = int(sys.argv[2])
+asyncio.run(ocr._ocr_pdf_pages(sys.argv[1], list(range(1, pages + 1))))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024)
+"""
+
+
+def _peak_rss_mb(pdf_path: str, pages: int, cache_dir: str) -> int:
+    env = dict(os.environ, OCR_RASTER_WINDOW="4", DOCUMENT_CACHE_DIR=cache_dir)
+    output = subprocess.run(
+        [sys.executable, "-c", PEAK_RSS_SCRIPT, pdf_path, str(pages)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return int(output.stdout.strip().splitlines()[-1])
+
+
+def test_peak_memory_does_not_grow_with_page_count(tmp_path):
+    small = make_pdf(str(tmp_path / "small.pdf"), 20)
+    large = make_pdf(str(tmp_path / "large.pdf"), 200)
+
+    peak_small = _peak_rss_mb(small, 20, str(tmp_path / "cache-small"))
+    peak_large = _peak_rss_mb(large, 200, str(tmp_path / "cache-large"))
+
+    # Rendered all at once, the 200 pages would take over 2 GB (about
+    # 11 MB per A4 page at 200 dpi); windows of 4 pages stay flat
+    assert peak_large < peak_small + 64, (peak_small, peak_large)
+    assert peak_large < 768, peak_large
@@ -0,0 +1,48 @@
+"""
+Keyset pagination cursors
+"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from app.models.dpr import DPR
+from app.utils.pagination import decode_cursor, encode_cursor, paginate, split_page
+
+
+def test_cursor_timestamps_are_naive_utc():
+    id = uuid4()
+    aware = datetime(2024, 3, 1, 17, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+
+    assert decode_cursor(encode_cursor(aware, id)) == (datetime(2024, 3, 1, 12, 0), id)
+    assert decode_cursor(encode_cursor(datetime(2024, 3, 1, 12, 0), id)) == (datetime(2024, 3, 1, 12, 0), id)
+
+
+def test_pages_from_timezone_aware_rows(db, user):
+    start = datetime(2024, 1, 1)
+    for index in range(5):
+        db.add(DPR(
+            title=f"DPR {index}", file_path="x.pdf", uploaded_by=user.id,
+            created_at=start + timedelta(hours=index),
+        ))
+    db.commit()
+    expected = [dpr.id for dpr in db.execute(paginate(select(DPR), DPR, None, 10)).scalars()]
+
+    # Rows as a driver returning TIMESTAMP WITH TIME ZONE values (e.g. asyncpg) gives them
+    seen = []
+    cursor = None
+    while True:
+        query = paginate(select(DPR), DPR, cursor, 2)
+        bound = [value for value in query.compile().params.values() if isinstance(value, datetime)]
+        assert all(value.tzinfo is None for value in bound)
+        rows = [
+            SimpleNamespace(id=dpr.id, created_at=dpr.created_at.replace(tzinfo=timezone.utc))
+            for dpr in db.execute(query).scalars()
+        ]
+        page, cursor = split_page(rows, 2)
+        seen.extend(row.id for row in page)
+        if cursor is None:
+            break
+
+    assert seen == expected
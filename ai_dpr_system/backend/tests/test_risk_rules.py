@@ -0,0 +1,76 @@
+"""
+Risk rule table against the original hand-coded heuristic
+"""
+import pytest
+
+from app.ml import risk
+from app.ml.cache import SectionResultCache
+from app.ml.risk import RULES_PATH, RiskRuleEngine
+from benchmarks.bench_risk import baseline_predict_risk_heuristic, generate_risk_sections
+
+FIXTURES = [
+    {},
+    {"budget": "", "timeline": "", "full_text": "nothing extracted"},
+    {
+        "budget": "Detailed cost breakdown with a 10% Contingency.",
+        "timeline": "Each Milestone is dependent on land acquisition.",
+        "resources": "Staff are reassigned as needed; no special expertise.",
+        "environmental_impact": "Mitigation is planned.",
+        "scope": "Deliverables and project boundary.",
+    },
+    {
+        "budget": "Rs. 120 crore in total.",
+        "timeline": "36 months.",
+        "resources": "Skilled labour allocation.",
+        "environmental_impact": "An assessment was done.",
+        "scope": "Limitations apply.",
+    },
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return RiskRuleEngine.from_file(RULES_PATH)
+
+
+def _assert_same(actual, expected):
+    assert actual == expected
+    assert list(actual) == list(expected)
+    for key in ("risk_factors", "details", "recommendations"):
+        assert list(actual[key]) == list(expected[key])
+    # Missing sections score an int, scored sections a float, as before
+    for name, score in expected["risk_factors"].items():
+        assert type(actual["risk_factors"][name]) is type(score)
+
+
+@pytest.mark.parametrize("sections", FIXTURES + [generate_risk_sections(seed, 60) for seed in range(300)])
+def test_rules_match_the_original_heuristic(engine, sections):
+    _assert_same(engine.score(sections), baseline_predict_risk_heuristic(sections))
+
+
+def test_incremental_results_match(engine):
+    cache = SectionResultCache(1000)
+    for seed in range(50):
+        sections = generate_risk_sections(seed, 60)
+        expected = baseline_predict_risk_heuristic(sections)
+        _assert_same(engine.score_incremental(sections, cache)[0], expected)
+        results, recomputed = engine.score_incremental(sections, cache)
+        _assert_same(results, expected)
+        assert recomputed == []
+
+
+def test_results_are_not_shared_between_calls(engine):
+    sections = FIXTURES[3]
+    first = engine.score(sections)
+    first["details"]["cost_overrun"]["missing_contingency"] = "changed"
+    first["recommendations"].setdefault("budget", []).append("changed")
+    _assert_same(engine.score(sections), baseline_predict_risk_heuristic(sections))
+
+
+def test_results_beyond_the_memo_limit(monkeypatch):
+    monkeypatch.setattr(risk, "MAX_MEMOIZED_RESULTS", 2)
+    engine = RiskRuleEngine.from_file(RULES_PATH)
+    for seed in range(50):
+        sections = generate_risk_sections(seed, 60)
+        _assert_same(engine.score(sections), baseline_predict_risk_heuristic(sections))
+    assert len(engine._results) == 2
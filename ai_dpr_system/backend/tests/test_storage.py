@@ -0,0 +1,65 @@
+"""
+Storage backends and download headers
+"""
+import asyncio
+import io
+
+import pytest
+
+from app.core.storage import LocalStorage, S3Storage, StorageBackend
+from app.utils.file import content_disposition
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_storage_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StorageBackend()
+
+
+def test_local_stream_ranges_and_empty_file(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    full = storage._save(io.BytesIO(b"0123456789"), "digits", None)
+    empty = storage._save(io.BytesIO(b""), "empty", None)
+
+    assert asyncio.run(_collect(storage.stream(full))) == b"0123456789"
+    assert asyncio.run(_collect(storage.stream(full, 2, 4, chunk_size=2))) == b"234"
+    assert asyncio.run(_collect(storage.stream(empty))) == b""
+
+
+class _S3Client:
+    """
+    Records requests and serves one zero-byte object
+    """
+    def __init__(self):
+        self.calls = []
+
+    def head_object(self, **kwargs):
+        self.calls.append(("head_object", kwargs))
+        return {"ContentLength": 0}
+
+    def get_object(self, **kwargs):
+        self.calls.append(("get_object", kwargs))
+        raise AssertionError("No range request is needed for an empty object")
+
+
+def test_s3_stream_of_empty_object_skips_range_request():
+    storage = S3Storage("bucket")
+    storage._client = _S3Client()
+
+    assert asyncio.run(_collect(storage.stream("s3://bucket/empty.pdf"))) == b""
+    assert [name for name, _ in storage._client.calls] == ["head_object"]
+
+
+@pytest.mark.parametrize("file_name, expected", [
+    ("plan.pdf", "attachment; filename=\"plan.pdf\"; filename*=UTF-8''plan.pdf"),
+    (
+        "Résumé \"final\".pdf",
+        "attachment; filename=\"R_sum_ _final_.pdf\"; filename*=UTF-8''R%C3%A9sum%C3%A9%20%22final%22.pdf",
+    ),
+    ("a\r\nb;c.pdf", "attachment; filename=\"a__b;c.pdf\"; filename*=UTF-8''a%0D%0Ab%3Bc.pdf"),
+])
+def test_content_disposition(file_name, expected):
+    assert content_disposition(file_name) == expected
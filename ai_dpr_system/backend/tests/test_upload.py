@@ -0,0 +1,23 @@
+"""
+DPR upload endpoint
+"""
+from app.models.dpr import DPR
+from app.models.job import Job
+
+
+def test_upload_creates_dpr_and_queues_evaluation(client, db):
+    response = client.post(
+        "/api/v1/upload/",
+        params={"title": "Bridge DPR"},
+        files={"file": ("bridge.txt", b"1. Executive Summary\nA bridge.", "text/plain")},
+    )
+
+    assert response.status_code == 200, response.text
+    dpr = db.query(DPR).one()
+    assert str(dpr.id) == response.json()["id"]
+    assert dpr.status == "pending"
+
+    job = db.query(Job).one()
+    assert job.job_type == "evaluate"
+    assert job.dpr_id == str(dpr.id)
+    assert job.status == "queued"
@@ -35,12 +35,25 @@ CREATE TABLE IF NOT EXISTS evaluations (
     evaluated_by UUID REFERENCES users(id),
     compliance_score FLOAT NOT NULL,
     compliance_details JSONB NOT NULL,
-    extracted_sections JSONB NOT NULL,
+    section_refs JSONB,  -- Section name -> section_blobs.hash
+    extracted_sections JSONB,  -- Inline sections of evaluations stored before section_blobs
     status TEXT DEFAULT 'completed',
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Upgrade evaluations tables created before section_blobs
+ALTER TABLE evaluations ADD COLUMN IF NOT EXISTS section_refs JSONB;
+ALTER TABLE evaluations ALTER COLUMN extracted_sections DROP NOT NULL;
+
+-- Create content-addressed section text table
+CREATE TABLE IF NOT EXISTS section_blobs (
+    hash VARCHAR(64) PRIMARY KEY,  -- SHA-256 of content
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Create risk assessments table
 CREATE TABLE IF NOT EXISTS risk_assessments (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -54,11 +67,46 @@ CREATE TABLE IF NOT EXISTS risk_assessments (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Create background jobs table
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    dpr_id TEXT NOT NULL,
+    created_by TEXT,
+    priority INTEGER DEFAULT 0,
+    status TEXT DEFAULT 'queued',
+    attempts INTEGER DEFAULT 0,
+    max_attempts INTEGER DEFAULT 3,
+    run_after TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    payload JSONB,
+    result JSONB,
+    error TEXT,
+    started_at TIMESTAMP WITH TIME ZONE,
+    heartbeat_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Upgrade jobs tables created before job leases
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITH TIME ZONE;
+
 -- Create indexes
 CREATE INDEX IF NOT EXISTS dprs_uploaded_by_idx ON dprs(uploaded_by);
 CREATE INDEX IF NOT EXISTS dprs_status_idx ON dprs(status);
+CREATE INDEX IF NOT EXISTS dprs_uploaded_by_status_idx ON dprs(uploaded_by, status);
+-- Keyset pagination on (created_at, id), alone and under the list filters
+CREATE INDEX IF NOT EXISTS dprs_created_at_id_idx ON dprs(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS dprs_uploaded_by_created_at_id_idx ON dprs(uploaded_by, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS dprs_status_created_at_id_idx ON dprs(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS users_created_at_id_idx ON users(created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS evaluations_dpr_id_idx ON evaluations(dpr_id);
 CREATE INDEX IF NOT EXISTS risk_assessments_dpr_id_idx ON risk_assessments(dpr_id);
+-- Latest evaluation / risk assessment of each DPR
+CREATE INDEX IF NOT EXISTS evaluations_dpr_id_created_at_idx ON evaluations(dpr_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS risk_assessments_dpr_id_created_at_idx ON risk_assessments(dpr_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS jobs_dpr_id_idx ON jobs(dpr_id);
+CREATE INDEX IF NOT EXISTS jobs_queue_idx ON jobs(status, priority DESC, created_at);
 
 -- Create admin user (password: admin123)
 INSERT INTO users (email, full_name, hashed_password, is_admin, is_reviewer)
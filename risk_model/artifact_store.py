@@ -0,0 +1,433 @@
+"""
+Versioned store for fitted risk model artifacts
+
+Each published model version is an immutable directory holding the
+TF-IDF vocabulary and IDF weights and the SVD components as `.npy`
+arrays, plus an optional estimator and a manifest with content hashes
+and schema versions:
+
+    <root>/
+        CURRENT                  name of the active version
+        HISTORY                  activation stack, oldest first; rollback pops it
+        versions/<version>/
+            manifest.json
+            terms.npy
+            idf.npy
+            svd_components.npy
+            estimator.joblib     (optional)
+
+The SVD components and the arrays of the estimator are loaded with
+`mmap_mode='r'`, so every process serving the same version shares one
+page-cached copy of them. The vocabulary and IDF weights are small (one
+entry per TF-IDF feature) and are copied into each process, since
+TfidfVectorizer needs the vocabulary as a dict and keeps the IDF weights
+as a sparse diagonal matrix. Versions are published by renaming a
+complete temporary directory into place and activated by atomically
+replacing CURRENT and HISTORY, so readers never see a partial model.
+
+Usage:
+    python -m risk_model.artifact_store ROOT list
+    python -m risk_model.artifact_store ROOT activate VERSION
+    python -m risk_model.artifact_store ROOT rollback
+    python -m risk_model.artifact_store ROOT verify [VERSION]
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .config import get_config
+from .corpus import file_sha256
+from .feature_extraction import FeatureExtractor
+
+# Bump when the layout of a version directory changes
+MANIFEST_FORMAT = 1
+
+MANIFEST_FILE = "manifest.json"
+ESTIMATOR_FILE = "estimator.joblib"
+
+_VERSION_RE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+
+
+class LoadedModel:
+    """
+    A model version loaded from the artifact store.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        manifest: Dict[str, Any],
+        extractor: FeatureExtractor,
+        estimator: Optional[Any] = None,
+    ):
+        self.version = version
+        self.manifest = manifest
+        self.extractor = extractor
+        self.estimator = estimator
+
+
+class ArtifactStore:
+    """
+    Directory of immutable, versioned model artifacts with an active version pointer.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the store.
+
+        Args:
+            root: Root directory of the store, created on first publish
+        """
+        self.root = root
+        self.versions_dir = os.path.join(root, "versions")
+        self.current_path = os.path.join(root, "CURRENT")
+        self.history_path = os.path.join(root, "HISTORY")
+
+    def _version_dir(self, version: str) -> str:
+        if not _VERSION_RE.match(version):
+            raise ValueError(f"Invalid model version: {version!r}")
+        return os.path.join(self.versions_dir, version)
+
+    def list_versions(self) -> List[str]:
+        """
+        List the published versions, oldest first.
+        """
+        if not os.path.isdir(self.versions_dir):
+            return []
+        versions = [
+            name for name in os.listdir(self.versions_dir)
+            if _VERSION_RE.match(name)
+            and os.path.exists(os.path.join(self.versions_dir, name, MANIFEST_FILE))
+        ]
+        return sorted(versions)
+
+    def current_version(self) -> Optional[str]:
+        """
+        Get the active version, or None if no version was activated yet.
+        """
+        try:
+            with open(self.current_path, "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def read_manifest(self, version: str) -> Dict[str, Any]:
+        """
+        Read the manifest of a version.
+
+        Args:
+            version: Model version
+
+        Returns:
+            Manifest dictionary
+
+        Raises:
+            FileNotFoundError: If the version does not exist
+        """
+        path = os.path.join(self._version_dir(version), MANIFEST_FILE)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def publish(
+        self,
+        extractor: FeatureExtractor,
+        estimator: Optional[Any] = None,
+        version: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        activate: bool = True,
+    ) -> str:
+        """
+        Publish fitted vectorizers (and optionally an estimator) as a new version.
+
+        Args:
+            extractor: Feature extractor with fitted vectorizers
+            estimator: Optional fitted estimator, stored with joblib
+            version: Version name (defaults to a UTC timestamp)
+            metadata: Optional JSON-serializable metadata, e.g. training metrics
+            activate: Whether to make the new version the active one
+
+        Returns:
+            The published version
+        """
+        if not extractor.tfidf_vectorizer or not extractor.svd_transformer:
+            raise ValueError("Vectorizers are not fitted or loaded")
+
+        version = version or datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+        version_dir = self._version_dir(version)
+        if os.path.exists(version_dir):
+            raise ValueError(f"Model version already exists: {version}")
+
+        os.makedirs(self.versions_dir, exist_ok=True)
+        tmp_dir = os.path.join(self.versions_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            vectorizer = extractor.tfidf_vectorizer
+            vocabulary = vectorizer.vocabulary_
+            terms = sorted(vocabulary, key=vocabulary.get)
+
+            arrays = {
+                "terms.npy": np.array(terms, dtype=str),
+                "idf.npy": np.ascontiguousarray(vectorizer.idf_, dtype=np.float64),
+                "svd_components.npy": np.ascontiguousarray(
+                    extractor.svd_transformer.components_, dtype=np.float64
+                ),
+            }
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_dir, name), array)
+            if estimator is not None:
+                joblib.dump(estimator, os.path.join(tmp_dir, ESTIMATOR_FILE))
+
+            files = {}
+            for name in sorted(os.listdir(tmp_dir)):
+                path = os.path.join(tmp_dir, name)
+                files[name] = {"sha256": file_sha256(path), "bytes": os.path.getsize(path)}
+
+            schema = extractor.risk_schema
+            manifest = {
+                "format": MANIFEST_FORMAT,
+                "version": version,
+                "created_at": datetime.utcnow().isoformat() + "Z",
+                "feature_schema_version": schema.version,
+                "feature_schema": schema.to_dict(),
+                "tfidf_params": _tfidf_params(vectorizer),
+                "svd_n_components": int(extractor.svd_transformer.n_components),
+                "has_estimator": estimator is not None,
+                "files": files,
+                "metadata": metadata or {},
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+
+            # A directory rename is atomic: the version appears complete or not at all
+            os.rename(tmp_dir, version_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str) -> None:
+        """
+        Make a published version the active one.
+
+        Args:
+            version: Model version
+
+        Raises:
+            FileNotFoundError: If the version does not exist
+        """
+        self.read_manifest(version)
+        _replace_file(self.current_path, version + "\n")
+
+        with open(self.history_path, "a", encoding="utf-8") as f:
+            f.write(version + "\n")
+
+    def rollback(self) -> str:
+        """
+        Reactivate the version that was active before the current one.
+
+        The current activation is popped off HISTORY rather than a new one
+        appended, so repeated rollbacks walk further back through the
+        activations instead of toggling between the last two versions.
+
+        Returns:
+            The reactivated version
+
+        Raises:
+            ValueError: If there is no earlier version to roll back to
+        """
+        current = self.current_version()
+        history = []
+        if os.path.exists(self.history_path):
+            with open(self.history_path, "r", encoding="utf-8") as f:
+                history = [line.strip() for line in f if line.strip()]
+
+        # Drop the current activation, then find the most recent different version
+        while history and history[-1] == current:
+            history.pop()
+        if not history:
+            raise ValueError("No earlier model version to roll back to")
+
+        previous = history[-1]
+        self.read_manifest(previous)
+        _replace_file(self.current_path, previous + "\n")
+        _replace_file(self.history_path, "".join(version + "\n" for version in history))
+        return previous
+
+    def verify(self, version: str) -> None:
+        """
+        Check the files of a version against the hashes in its manifest.
+
+        Raises:
+            ValueError: If a file is missing or its content hash does not match
+        """
+        version_dir = self._version_dir(version)
+        manifest = self.read_manifest(version)
+        for name, info in manifest["files"].items():
+            path = os.path.join(version_dir, name)
+            if not os.path.exists(path):
+                raise ValueError(f"Model version {version} is missing {name}")
+            if file_sha256(path) != info["sha256"]:
+                raise ValueError(f"Model version {version} has a corrupted {name}")
+
+    def load(
+        self,
+        version: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        verify: bool = False,
+    ) -> LoadedModel:
+        """
+        Load a model version with its SVD components and estimator memory-mapped.
+
+        Args:
+            version: Model version (defaults to the active version)
+            config: Configuration dictionary (defaults to risk_model.config)
+            verify: Whether to check file hashes before loading
+
+        Returns:
+            The loaded model
+
+        Raises:
+            FileNotFoundError: If there is no such version or no active version
+            ValueError: If the version was built with a different feature schema
+        """
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"No active model version in {self.root}")
+
+        manifest = self.read_manifest(version)
+        if manifest.get("format") != MANIFEST_FORMAT:
+            raise ValueError(f"Unsupported model manifest format: {manifest.get('format')}")
+        if verify:
+            self.verify(version)
+
+        extractor = FeatureExtractor(config or get_config())
+        if manifest["feature_schema_version"] != extractor.risk_schema.version:
+            raise ValueError(
+                f"Risk feature schema mismatch: model {version} uses "
+                f"{manifest['feature_schema_version']}, current {extractor.risk_schema.version}"
+            )
+
+        version_dir = self._version_dir(version)
+        # The vocabulary and IDF weights end up copied into a dict and a
+        # sparse diagonal matrix anyway, so only the components are mapped
+        terms = np.load(os.path.join(version_dir, "terms.npy"))
+        idf = np.load(os.path.join(version_dir, "idf.npy"))
+        components = np.load(os.path.join(version_dir, "svd_components.npy"), mmap_mode='r')
+
+        params = dict(manifest["tfidf_params"])
+        params["ngram_range"] = tuple(params["ngram_range"])
+        params["dtype"] = np.dtype(params["dtype"]).type
+        vectorizer = TfidfVectorizer(
+            vocabulary={str(term): index for index, term in enumerate(terms)}, **params
+        )
+        vectorizer.idf_ = idf
+
+        svd = TruncatedSVD(n_components=manifest["svd_n_components"])
+        svd.components_ = components
+        svd.n_features_in_ = components.shape[1]
+
+        extractor.tfidf_vectorizer = vectorizer
+        extractor.svd_transformer = svd
+
+        estimator = None
+        if manifest.get("has_estimator"):
+            estimator = joblib.load(os.path.join(version_dir, ESTIMATOR_FILE), mmap_mode='r')
+
+        return LoadedModel(version, manifest, extractor, estimator)
+
+    def reload_if_changed(
+        self, loaded: Optional[LoadedModel], config: Optional[Dict[str, Any]] = None
+    ) -> Optional[LoadedModel]:
+        """
+        Load the active version if it differs from an already loaded model.
+
+        Cheap enough to call before every batch: it only reads CURRENT.
+
+        Args:
+            loaded: Currently loaded model, or None
+            config: Configuration dictionary (defaults to risk_model.config)
+
+        Returns:
+            The newly loaded model, `loaded` if the active version is unchanged,
+            or None if no version is active
+        """
+        version = self.current_version()
+        if version is None:
+            return None
+        if loaded is not None and loaded.version == version:
+            return loaded
+        return self.load(version, config=config)
+
+
+def _replace_file(path: str, content: str) -> None:
+    """
+    Atomically replace the content of a small text file.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _tfidf_params(vectorizer: TfidfVectorizer) -> Dict[str, Any]:
+    """
+    Get the JSON-serializable constructor parameters of a TF-IDF vectorizer.
+    """
+    params = {}
+    for name, value in vectorizer.get_params().items():
+        if name == "vocabulary":
+            continue
+        if name == "dtype":
+            params[name] = np.dtype(value).name
+            continue
+        if callable(value):
+            raise ValueError(f"Cannot store a TF-IDF vectorizer with a custom {name}")
+        params[name] = list(value) if isinstance(value, tuple) else value
+    return params
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Manage published risk model versions")
+    parser.add_argument("root", help="Artifact store directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List published versions")
+    activate_parser = subparsers.add_parser("activate", help="Activate a version")
+    activate_parser.add_argument("version")
+    subparsers.add_parser("rollback", help="Reactivate the previously active version")
+    verify_parser = subparsers.add_parser("verify", help="Check file hashes of a version")
+    verify_parser.add_argument("version", nargs="?")
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore(args.root)
+    if args.command == "list":
+        current = store.current_version()
+        for version in store.list_versions():
+            print(f"{'*' if version == current else ' '} {version}")
+    elif args.command == "activate":
+        store.activate(args.version)
+        print(f"Active version: {args.version}")
+    elif args.command == "rollback":
+        print(f"Active version: {store.rollback()}")
+    elif args.command == "verify":
+        version = args.version or store.current_version()
+        if version is None:
+            parser.error("no active version")
+        store.verify(version)
+        print(f"{version}: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Memory of two workers serving the same artifact store version
+
+Publishes a synthetic model with a large SVD component matrix, starts two
+worker processes that each load the active version and transform a few
+texts, and reads their memory from /proc/<pid>/smaps_rollup while both
+are alive. Run once as is (components memory-mapped, as ArtifactStore.load
+does) and once with --copy, where each worker copies the components into
+private memory, to see what the sharing saves. Linux only.
+
+Usage (from the repository root):
+    python -m risk_model.benchmarks.bench_artifact_rss [--terms 50000] [--components 300] [--copy]
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+from typing import Dict
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from ..artifact_store import ArtifactStore
+from ..config import get_config
+from ..feature_extraction import TFIDF_PARAMS, FeatureExtractor
+
+WORKER_SCRIPT = """
+import sys
+import numpy as np
+from risk_model.artifact_store import ArtifactStore
+
+loaded = ArtifactStore(sys.argv[1]).load()
+svd = loaded.extractor.svd_transformer
+if sys.argv[2] == "copy":
+    svd.components_ = np.array(svd.components_)
+texts = ["term00001 term00002 term00003", "term00010 term00020"] * 50
+svd.transform(loaded.extractor.tfidf_vectorizer.transform(texts))
+# Touch every page of the components, as a long-running worker eventually does
+float(np.asarray(svd.components_).sum())
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
+
+def publish_synthetic_model(root: str, num_terms: int, num_components: int) -> None:
+    rng = np.random.default_rng(0)
+    vectorizer = TfidfVectorizer(
+        vocabulary={f"term{index:05d}": index for index in range(num_terms)}, **TFIDF_PARAMS
+    )
+    vectorizer.idf_ = rng.uniform(1, 10, num_terms)
+    svd = TruncatedSVD(n_components=num_components)
+    svd.components_ = rng.standard_normal((num_components, num_terms))
+    svd.n_features_in_ = num_terms
+
+    extractor = FeatureExtractor(get_config())
+    extractor.tfidf_vectorizer = vectorizer
+    extractor.svd_transformer = svd
+    ArtifactStore(root).publish(extractor, version="synthetic")
+
+
+def read_memory_mb(pid: int) -> Dict[str, float]:
+    memory = {}
+    with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                memory[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return memory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure worker memory with shared model artifacts")
+    parser.add_argument("--terms", type=int, default=50000, help="TF-IDF vocabulary size")
+    parser.add_argument("--components", type=int, default=300, help="Number of SVD components")
+    parser.add_argument("--copy", action="store_true", help="Copy the components into each worker")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        publish_synthetic_model(root, args.terms, args.components)
+        size_mb = args.terms * args.components * 8 / (1024 * 1024)
+        print(f"svd_components.npy: {size_mb:.0f} MB, mode: {'copy' if args.copy else 'mmap'}")
+
+        workers = [
+            subprocess.Popen(
+                [sys.executable, "-c", WORKER_SCRIPT, root, "copy" if args.copy else "mmap"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+            )
+            for _ in range(2)
+        ]
+        try:
+            for worker in workers:
+                if worker.stdout.readline().strip() != "ready":
+                    raise RuntimeError("Worker failed to load the model")
+
+            print(f"{'worker':>6} {'rss':>8} {'pss':>8} {'shared':>8} {'private':>8}")
+            total_pss = 0.0
+            for index, worker in enumerate(workers):
+                memory = read_memory_mb(worker.pid)
+                shared = memory["Shared_Clean"] + memory["Shared_Dirty"]
+                private = memory["Private_Clean"] + memory["Private_Dirty"]
+                total_pss += memory["Pss"]
+                print(
+                    f"{index:>6} {memory['Rss']:>6.0f}MB {memory['Pss']:>6.0f}MB "
+                    f"{shared:>6.0f}MB {private:>6.0f}MB"
+                )
+            print(f"total pss of both workers: {total_pss:.0f} MB")
+        finally:
+            for worker in workers:
+                worker.stdin.close()
+                worker.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Tokenize-once preprocessing on multi-section DPRs
+
+Times DPRDocumentProcessor.process_text, which tokenizes and lemmatizes
+the document once and slices each section's tokens by offset, against
+the original pipeline, which ran NLTK word_tokenize and the WordNet
+lemmatizer over the whole document and then again over every section,
+without memoizing lemmas. Needs the NLTK punkt, stopwords and wordnet
+data.
+
+Usage (from the repository root):
+    python -m risk_model.benchmarks.bench_preprocessing [--sizes-kb 100,1000,5000]
+"""
+import argparse
+import time
+from typing import Any, Dict, List
+
+from .. import resources
+from ..config import get_config
+from ..data_preprocessing import DPRDocumentProcessor
+from .documents import generate_document
+
+
+def baseline_tokenize_and_lemmatize(text: str) -> List[str]:
+    """
+    tokenize_and_lemmatize before the tokenize-once pipeline
+    """
+    from nltk.tokenize import word_tokenize
+
+    stop_words = resources.get_stopwords()
+    lemmatizer = resources.get_lemmatizer()
+    return [
+        lemmatizer.lemmatize(token)
+        for token in word_tokenize(text)
+        if token not in stop_words and len(token) > 2
+    ]
+
+
+def baseline_process_text(processor: DPRDocumentProcessor, raw_text: str) -> Dict[str, Any]:
+    """
+    process_document before the tokenize-once pipeline, on already extracted text
+    """
+    scorer = processor._get_risk_scorer(processor.config["RISK_KEYWORDS"])
+    preprocessed_text = processor.preprocess_text(raw_text)
+    sections = processor.extract_sections(preprocessed_text)
+    return {
+        "sections": sections,
+        "risk_indicators": scorer.score_tokens(baseline_tokenize_and_lemmatize(preprocessed_text)),
+        "section_risk_indicators": {
+            section_name: scorer.score_tokens(baseline_tokenize_and_lemmatize(section_text))
+            for section_name, section_text in sections.items()
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time document preprocessing, old and new")
+    parser.add_argument("--sizes-kb", default="100,1000,5000", help="Comma-separated document sizes")
+    args = parser.parse_args()
+
+    # Keep resource loading out of the timings
+    resources.warm_up(resources.PROCESSOR_RESOURCES)
+    config = get_config()
+
+    print(f"{'size':>8} {'tokens':>9} {'original':>10} {'tokenize once':>14} {'tokens/s':>10} {'speedup':>8}")
+    for size_kb in (int(size) for size in args.sizes_kb.split(",")):
+        raw_text = generate_document(size_kb * 1024)
+
+        start = time.perf_counter()
+        baseline_process_text(DPRDocumentProcessor(config), raw_text)
+        old = time.perf_counter() - start
+
+        # A fresh processor, so the lemma cache starts empty
+        start = time.perf_counter()
+        result = DPRDocumentProcessor(config).process_text(raw_text)
+        new = time.perf_counter() - start
+
+        stats = result["processing_stats"]
+        print(
+            f"{size_kb:>6}KB {stats['token_count']:>9} {old:>9.2f}s {new:>13.2f}s "
+            f"{stats['tokens_per_sec']:>10,.0f} {old / new:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Risk keyword scoring microbenchmark
+
+Scores tokenized DPR texts with RiskKeywordScorer (one frequency table
+per text) and with the original loop (one `tokens.count` list scan per
+keyword), and checks that both give the same scores.
+
+Usage (from the repository root):
+    python -m risk_model.benchmarks.bench_risk_scoring [--tokens 1000,10000,100000] [--batch 1000]
+"""
+import argparse
+import time
+
+from ..config import RISK_KEYWORDS
+from ..risk_scoring import RiskKeywordScorer
+from ..tests.test_risk_scoring import baseline_risk_indicators
+from .documents import generate_document
+
+
+def _best(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time risk keyword scoring, old and new")
+    parser.add_argument("--tokens", default="1000,10000,100000", help="Comma-separated token counts per text")
+    parser.add_argument("--batch", type=int, default=1000, help="Texts of 1000 tokens scored with score_batch")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported")
+    args = parser.parse_args()
+
+    scorer = RiskKeywordScorer(RISK_KEYWORDS)
+
+    print(f"{'tokens':>8} {'original':>10} {'scorer':>10} {'speedup':>8} {'same':>5}")
+    for count in (int(count) for count in args.tokens.split(",")):
+        tokens = generate_document(count * 8).lower().split()[:count]
+        old = _best(lambda: baseline_risk_indicators(tokens, RISK_KEYWORDS), args.repeat)
+        new = _best(lambda: scorer.score_tokens(tokens), args.repeat)
+        same = scorer.score_tokens(tokens) == baseline_risk_indicators(tokens, RISK_KEYWORDS)
+        print(f"{len(tokens):>8} {old * 1000:>8.2f}ms {new * 1000:>8.2f}ms {old / new:>7.1f}x {str(same):>5}")
+
+    token_lists = [generate_document(8000, seed=seed).lower().split()[:1000] for seed in range(args.batch)]
+    old = _best(lambda: [baseline_risk_indicators(tokens, RISK_KEYWORDS) for tokens in token_lists], args.repeat)
+    new = _best(lambda: scorer.score_batch(token_lists), args.repeat)
+    print(f"batch of {args.batch}: original {args.batch / old:,.0f} texts/s, scorer {args.batch / new:,.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+DPRDocumentProcessor.extract_sections on 1 MB to 20 MB documents
+
+Times the single header-index pass against the original implementation,
+which re-ran every other section pattern over a fresh slice of the text
+for each section. The original also ran a full spaCy parse whose result
+was unused; it is only included with --with-spacy (spaCy refuses texts
+over nlp.max_length, 1M characters by default, so that mode raises the
+limit).
+
+Usage (from the repository root):
+    python -m risk_model.benchmarks.bench_sections [--sizes-mb 1,5,10,20]
+"""
+import argparse
+import re
+import time
+from typing import Dict
+
+from ..config import get_config
+from ..data_preprocessing import SECTION_PATTERNS, DPRDocumentProcessor
+from .documents import generate_document
+
+
+def baseline_extract_sections(text: str, nlp=None) -> Dict[str, str]:
+    """
+    extract_sections before the single-pass rewrite
+    """
+    sections = {}
+    if nlp is not None:
+        nlp(text)
+
+    for section_name, pattern in SECTION_PATTERNS.items():
+        matches = list(re.finditer(pattern, text, re.IGNORECASE))
+        if matches:
+            start_idx = matches[0].end()
+            next_section_starts = []
+            for next_pattern in SECTION_PATTERNS.values():
+                if next_pattern != pattern:
+                    next_matches = list(re.finditer(next_pattern, text[start_idx:], re.IGNORECASE))
+                    if next_matches:
+                        next_section_starts.append(start_idx + next_matches[0].start())
+            if next_section_starts:
+                sections[section_name] = text[start_idx:min(next_section_starts)].strip()
+            else:
+                sections[section_name] = text[start_idx:].strip()
+    return sections
+
+
+def _time(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time section extraction, old and new")
+    parser.add_argument("--sizes-mb", default="1,5,10,20", help="Comma-separated document sizes")
+    parser.add_argument("--with-spacy", action="store_true", help="Include the original's unused spaCy parse")
+    args = parser.parse_args()
+
+    processor = DPRDocumentProcessor(get_config())
+    nlp = None
+    if args.with_spacy:
+        from .. import resources
+        nlp = resources.get_nlp()
+
+    print(f"{'size':>6} {'original':>10} {'single pass':>12} {'speedup':>8} {'same':>5}")
+    for size_mb in (float(size) for size in args.sizes_mb.split(",")):
+        text = generate_document(int(size_mb * 2**20)).lower()
+        if nlp is not None:
+            nlp.max_length = max(nlp.max_length, len(text) + 1)
+
+        old = _time(baseline_extract_sections, text, nlp)
+        new = _time(processor.extract_sections, text)
+        same = processor.extract_sections(text) == baseline_extract_sections(text)
+        print(f"{size_mb:>4g}MB {old:>9.3f}s {new:>11.3f}s {old / new:>7.1f}x {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
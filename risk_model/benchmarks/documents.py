@@ -0,0 +1,48 @@
+"""
+Synthetic DPR texts for the risk_model benchmarks and tests
+"""
+import random
+from typing import List
+
+from ..config import RISK_KEYWORDS
+
+HEADERS = [
+    "Executive Summary",
+    "Project Description",
+    "Budget Estimation",
+    "Technical Specifications",
+    "Implementation Plan",
+    "Environmental Impact",
+    "Risk Assessment",
+]
+
+COMMON_WORDS = (
+    "the project will be completed by the state agency in three phases with the "
+    "district administration and local bodies providing land road bridge water "
+    "supply drainage school hospital village town river works contractor crore "
+    "lakh month year phase plan report survey data site"
+).split()
+
+# Risk keywords, without those that are section headers on their own
+KEYWORDS = sorted({keyword for keywords in RISK_KEYWORDS.values() for keyword in keywords} - {"budget"})
+
+
+def generate_document(size: int, seed: int = 0, keyword_rate: float = 0.1) -> str:
+    """
+    Generate a DPR text of about `size` characters
+
+    The sections of HEADERS are spread evenly, and about `keyword_rate`
+    of the words are risk keywords.
+    """
+    rng = random.Random(seed)
+    per_section = max(1, size // len(HEADERS))
+    parts = []
+    for header in HEADERS:
+        words: List[str] = []
+        length = 0
+        while length < per_section:
+            word = rng.choice(KEYWORDS) if rng.random() < keyword_rate else rng.choice(COMMON_WORDS)
+            words.append(word)
+            length += len(word) + 1
+        parts.append(f"{header}\n" + " ".join(words) + ".")
+    return "\n\n".join(parts) + "\n"
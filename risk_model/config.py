@@ -83,6 +83,13 @@ MODEL_PARAMS = {
     }
 }
 
+# Maximum number of memoized lemmas per document processor
+LEMMA_CACHE_SIZE = 100000
+
+# Value of risk features for sections or categories missing from a document
+# (0.0, or float("nan") for models that handle missing values)
+RISK_FEATURE_FILL_VALUE = 0.0
+
 # File types supported for DPR analysis
 SUPPORTED_FILE_TYPES = [
     ".pdf", 
@@ -92,4 +99,12 @@ SUPPORTED_FILE_TYPES = [
 ]
 
 # Maximum file size in MB
-MAX_FILE_SIZE_MB = 50
\ No newline at end of file
+MAX_FILE_SIZE_MB = 50
+
+
+def get_config() -> Dict[str, Any]:
+    """
+    Get the configuration settings as a dictionary, as expected by
+    DPRDocumentProcessor and FeatureExtractor.
+    """
+    return {name: value for name, value in globals().items() if name.isupper()}
\ No newline at end of file
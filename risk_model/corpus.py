@@ -0,0 +1,340 @@
+"""
+Batch processing of DPR document corpora
+
+Walks a directory of DPR documents, processes them on a pool of worker
+processes and appends the processed documents to a JSONL file. Files are
+identified by the SHA-256 of their content, so an interrupted run can be
+resumed and duplicate files are only processed once.
+
+A worker that dies (e.g. killed for running out of memory, or crashing in
+a native library) breaks the whole pool. The files that were in flight
+are then run again one at a time in a fresh pool, so that only the file
+that kills its worker again is recorded as failed, and the run continues.
+
+Usage:
+    python -m risk_model.corpus INPUT_DIR OUTPUT.jsonl [--workers N]
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from . import resources
+from .config import get_config
+from .data_preprocessing import DPRDocumentProcessor
+
+# Document processor of the current worker process
+_processor: Optional[DPRDocumentProcessor] = None
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """
+    Create the worker's document processor.
+
+    With the fork start method the NLP resources were already loaded by the
+    parent and are shared copy-on-write, so warming them here is a no-op;
+    otherwise each worker loads them once.
+    """
+    global _processor
+    resources.warm_up(resources.PROCESSOR_RESOURCES)
+    _processor = DPRDocumentProcessor(config)
+
+
+def _process_file(task: Tuple[str, str]) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Process one file in a worker.
+
+    Args:
+        task: Tuple of (file path, file hash)
+
+    Returns:
+        Tuple of (success, processed document or failure record)
+    """
+    file_path, file_hash = task
+    try:
+        document = _processor.process_document(file_path)
+    except Exception as e:
+        return False, {
+            "file_path": file_path,
+            "file_hash": file_hash,
+            "error": f"{type(e).__name__}: {e}",
+        }
+
+    document["file_hash"] = file_hash
+    return True, document
+
+
+def file_sha256(file_path: str) -> str:
+    """
+    Compute the SHA-256 of a file, reading it in chunks.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_corpus_files(input_dir: str, extensions: List[str]) -> Iterator[str]:
+    """
+    Walk a directory and yield supported document paths in a stable order.
+
+    Args:
+        input_dir: Root directory of the corpus
+        extensions: Supported file extensions, e.g. [".pdf", ".docx"]
+
+    Yields:
+        Paths of supported files
+    """
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in extensions:
+                yield os.path.join(root, name)
+
+
+def _read_hashes(path: str) -> Set[str]:
+    """
+    Read the file hashes recorded in a JSONL file, ignoring a torn last line.
+    """
+    hashes = set()
+    if not os.path.exists(path):
+        return hashes
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                hashes.add(json.loads(line)["file_hash"])
+            except (ValueError, KeyError):
+                continue
+    return hashes
+
+
+def _drop_torn_line(path: str) -> None:
+    """
+    Cut a JSONL file back to its last complete line.
+
+    A run that was killed mid-write leaves a partial last line; records
+    appended after it would share its line and be unreadable too.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        size = end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            f.truncate(end)
+
+
+def _run_pool(
+    tasks: Deque[Tuple[str, str]],
+    workers: int,
+    config: Dict[str, Any],
+    on_result: Callable[[bool, Dict[str, Any]], None],
+) -> List[Tuple[str, str]]:
+    """
+    Process tasks from the left of a queue on a new pool until the queue is empty or the pool breaks.
+
+    At most two tasks per worker are submitted at a time, so that a broken
+    pool only loses those.
+
+    Args:
+        tasks: Queue of (file path, file hash); consumed as tasks are submitted
+        workers: Number of worker processes
+        config: Configuration dictionary for the workers
+        on_result: Called with (success, record) for every finished task
+
+    Returns:
+        The tasks that were lost when a worker died (empty if none did)
+    """
+    in_flight: Dict[Future, Tuple[str, str]] = {}
+    lost: List[Tuple[str, str]] = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(config,)) as executor:
+        while (tasks or in_flight) and not lost:
+            while tasks and len(in_flight) < 2 * workers:
+                try:
+                    future = executor.submit(_process_file, tasks[0])
+                except BrokenProcessPool:
+                    if not in_flight:
+                        # An idle worker died; the caller starts a new pool
+                        return lost
+                    # Broken since the last wait; the futures in flight will say so
+                    break
+                in_flight[future] = tasks.popleft()
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = in_flight.pop(future)
+                try:
+                    success, record = future.result()
+                except BrokenProcessPool:
+                    lost.append(task)
+                    continue
+                except Exception as e:
+                    # e.g. a result that could not be sent back from the worker
+                    success, record = False, {
+                        "file_path": task[0],
+                        "file_hash": task[1],
+                        "error": f"{type(e).__name__}: {e}",
+                    }
+                on_result(success, record)
+        # The rest of the futures of a broken pool fail as well
+        lost.extend(in_flight.values())
+    return lost
+
+
+def _json_default(value: Any) -> Any:
+    # NumPy scalars and arrays
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def process_corpus(
+    input_dir: str,
+    output_path: str,
+    workers: Optional[int] = None,
+    retry_failed: bool = False,
+    config: Optional[Dict[str, Any]] = None,
+    report_every: int = 100,
+) -> Dict[str, Any]:
+    """
+    Process every supported document under a directory.
+
+    Processed documents are appended to `output_path` and failures to
+    `<output_path>.failures.jsonl`. Files whose hash is already recorded
+    in either file are skipped (failures only unless `retry_failed`).
+    A file whose worker process dies, even when it is run on its own, is
+    recorded as failed.
+
+    Args:
+        input_dir: Root directory of the corpus
+        output_path: JSONL file to append processed documents to
+        workers: Number of worker processes (defaults to the CPU count)
+        retry_failed: Whether to retry files that failed in a previous run
+        config: Configuration dictionary (defaults to risk_model.config)
+        report_every: Print progress every this many files
+
+    Returns:
+        Dictionary with run statistics
+    """
+    config = config or get_config()
+    failures_path = f"{output_path}.failures.jsonl"
+
+    done = _read_hashes(output_path)
+    if not retry_failed:
+        done |= _read_hashes(failures_path)
+
+    # Hash files up front so that finished and duplicate files are skipped
+    tasks = []
+    skipped = 0
+    total_bytes = 0
+    for file_path in iter_corpus_files(input_dir, config["SUPPORTED_FILE_TYPES"]):
+        file_hash = file_sha256(file_path)
+        if file_hash in done:
+            skipped += 1
+            continue
+        done.add(file_hash)
+        tasks.append((file_path, file_hash))
+        total_bytes += os.path.getsize(file_path)
+
+    stats = {
+        "processed": 0,
+        "failed": 0,
+        "skipped": skipped,
+        "queued": len(tasks),
+        "bytes": total_bytes,
+        "broken_pools": 0,
+    }
+    print(f"Processing {len(tasks)} files ({skipped} already done or duplicates)")
+
+    # Load the NLP resources before the pool forks so workers share them
+    if tasks and multiprocessing.get_start_method() == "fork":
+        stats["warm_up_seconds"] = resources.warm_up(resources.PROCESSOR_RESOURCES)
+
+    start_time = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    _drop_torn_line(output_path)
+    _drop_torn_line(failures_path)
+    with open(output_path, "a", encoding="utf-8") as output_file, \
+            open(failures_path, "a", encoding="utf-8") as failures_file:
+
+        def on_result(success: bool, record: Dict[str, Any]) -> None:
+            if success:
+                output_file.write(json.dumps(record, default=_json_default) + "\n")
+                output_file.flush()
+                stats["processed"] += 1
+            else:
+                failures_file.write(json.dumps(record) + "\n")
+                failures_file.flush()
+                stats["failed"] += 1
+                print(f"Failed: {record['file_path']}: {record['error']}")
+
+            finished = stats["processed"] + stats["failed"]
+            if finished % report_every == 0:
+                elapsed = time.perf_counter() - start_time
+                print(f"{finished}/{len(tasks)} files, {finished / elapsed:.2f} files/sec")
+
+        queue = deque(tasks)
+        while queue:
+            lost = _run_pool(queue, workers or os.cpu_count() or 1, config, on_result)
+            if not lost:
+                continue
+            stats["broken_pools"] += 1
+            print(f"A worker process died; running {len(lost)} files again one at a time")
+            for task in lost:
+                if _run_pool(deque([task]), 1, config, on_result):
+                    stats["broken_pools"] += 1
+                    on_result(False, {
+                        "file_path": task[0],
+                        "file_hash": task[1],
+                        "error": "BrokenProcessPool: the worker process died",
+                    })
+
+    elapsed = time.perf_counter() - start_time
+    stats["elapsed_seconds"] = elapsed
+    stats["files_per_sec"] = (stats["processed"] + stats["failed"]) / elapsed if elapsed > 0 else 0.0
+    stats["mb_per_sec"] = total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Process a corpus of DPR documents into JSONL")
+    parser.add_argument("input_dir", help="Directory containing DPR documents")
+    parser.add_argument("output", help="JSONL file to append processed documents to")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--retry-failed", action="store_true", help="Retry files that failed previously")
+    args = parser.parse_args(argv)
+
+    stats = process_corpus(
+        args.input_dir,
+        args.output,
+        workers=args.workers,
+        retry_failed=args.retry_failed,
+    )
+    print(
+        f"Done: {stats['processed']} processed, {stats['failed']} failed, "
+        f"{stats['skipped']} skipped in {stats['elapsed_seconds']:.1f}s "
+        f"({stats['files_per_sec']:.2f} files/sec, {stats['mb_per_sec']:.2f} MB/sec)"
+    )
+
+
+if __name__ == "__main__":
+    main()
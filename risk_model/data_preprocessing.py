@@ -1,40 +1,36 @@
 """
 Data preprocessing module for DPR documents
 """
+import time
+
+_IMPORT_START = time.perf_counter()
+
+import bisect
 import os
 import re
 import string
+from functools import lru_cache
 from typing import Dict, List, Any, Tuple, Optional, Union
 
-import numpy as np
-import pandas as pd
-import nltk
-import spacy
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
-import PyPDF2
-import docx
-import openpyxl
+from . import resources
+from .risk_scoring import RiskKeywordScorer
 
-# Download NLTK resources
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
+# Common sections in DPR documents
+SECTION_PATTERNS = {
+    "executive_summary": r'executive\s+summary|summary',
+    "project_description": r'project\s+description|about\s+the\s+project',
+    "budget_estimation": r'budget|cost\s+estimation|financial\s+plan',
+    "technical_specifications": r'technical\s+specifications|technical\s+details',
+    "implementation_plan": r'implementation\s+plan|execution\s+plan',
+    "environmental_impact": r'environmental\s+impact|environmental\s+assessment',
+    "risk_assessment": r'risk\s+assessment|risk\s+analysis'
+}
 
-# Initialize the SpaCy model (you'll need to download this with: python -m spacy download en_core_web_sm)
-try:
-    nlp = spacy.load('en_core_web_sm')
-except OSError:
-    import sys
-    print("SpaCy model 'en_core_web_sm' is not installed. Please install it using:")
-    print("python -m spacy download en_core_web_sm")
-    sys.exit(1)
+# All section headers combined into one pattern so a document is scanned once
+_SECTION_HEADER_RE = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_PATTERNS.items()),
+    re.IGNORECASE
+)
 
 
 class DPRDocumentProcessor:
@@ -51,8 +47,27 @@ class DPRDocumentProcessor:
             config: Configuration dictionary with processing parameters
         """
         self.config = config
-        self.stopwords = set(stopwords.words('english'))
-        self.lemmatizer = WordNetLemmatizer()
+        self._lemmatize = lru_cache(maxsize=config.get("LEMMA_CACHE_SIZE", 100000))(
+            self._lemmatize_uncached
+        )
+        self._risk_scorers = {}
+    
+    @property
+    def stopwords(self):
+        """English stopwords, loaded on first use"""
+        return resources.get_stopwords()
+    
+    @property
+    def lemmatizer(self):
+        """WordNet lemmatizer, loaded on first use"""
+        return resources.get_lemmatizer()
+    
+    @property
+    def _word_tokenizer(self):
+        return resources.get_word_tokenizer()
+    
+    def _lemmatize_uncached(self, token: str) -> str:
+        return self.lemmatizer.lemmatize(token)
     
     def extract_text_from_file(self, file_path: str) -> str:
         """
@@ -92,6 +107,8 @@ class DPRDocumentProcessor:
     def _extract_text_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF files"""
         text = ""
+        import PyPDF2
+        
         try:
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
@@ -105,6 +122,8 @@ class DPRDocumentProcessor:
     
     def _extract_text_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX files"""
+        import docx
+        
         text = ""
         try:
             doc = docx.Document(file_path)
@@ -123,6 +142,8 @@ class DPRDocumentProcessor:
     
     def _extract_text_from_xlsx(self, file_path: str) -> str:
         """Extract text from XLSX files"""
+        import openpyxl
+        
         text = ""
         try:
             workbook = openpyxl.load_workbook(file_path, data_only=True)
@@ -186,17 +207,34 @@ class DPRDocumentProcessor:
         Returns:
             List of tokens
         """
-        # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stopwords and lemmatize
-        tokens = [
-            self.lemmatizer.lemmatize(token) 
-            for token in tokens 
-            if token not in self.stopwords and len(token) > 2
-        ]
+        return self.tokenize_with_offsets(text)[0]
+    
+    def tokenize_with_offsets(self, text: str) -> Tuple[List[str], List[int]]:
+        """
+        Tokenize and lemmatize text, keeping the character offset of each token.
         
-        return tokens
+        The offsets let callers derive the tokens of any span of the text
+        (such as a section) by slicing instead of tokenizing it again.
+        Lemmas are memoized in a bounded LRU cache.
+        
+        Args:
+            text: Preprocessed text
+            
+        Returns:
+            Tuple of (tokens, start offsets of the tokens in `text`)
+        """
+        tokens = []
+        offsets = []
+        stop_words = self.stopwords
+        
+        # Tokenize, then remove stopwords and lemmatize
+        for start, end in self._word_tokenizer.span_tokenize(text):
+            token = text[start:end]
+            if token not in stop_words and len(token) > 2:
+                tokens.append(self._lemmatize(token))
+                offsets.append(start)
+        
+        return tokens, offsets
     
     def extract_sections(self, text: str) -> Dict[str, str]:
         """
@@ -208,45 +246,70 @@ class DPRDocumentProcessor:
         Returns:
             Dictionary with section names as keys and section content as values
         """
-        # Common sections in DPR documents
-        section_patterns = {
-            "executive_summary": r'executive\s+summary|summary',
-            "project_description": r'project\s+description|about\s+the\s+project',
-            "budget_estimation": r'budget|cost\s+estimation|financial\s+plan',
-            "technical_specifications": r'technical\s+specifications|technical\s+details',
-            "implementation_plan": r'implementation\s+plan|execution\s+plan',
-            "environmental_impact": r'environmental\s+impact|environmental\s+assessment',
-            "risk_assessment": r'risk\s+assessment|risk\s+analysis'
+        return {
+            section_name: text[start_idx:end_idx]
+            for section_name, (start_idx, end_idx) in self.extract_section_spans(text).items()
         }
+    
+    def extract_section_spans(self, text: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Locate the different sections of the document.
+        
+        All section headers are located in a single pass of one compiled
+        pattern. Each section runs from the end of its first header to the
+        start of the next header belonging to a different section.
+        
+        Args:
+            text: Preprocessed document text
+            
+        Returns:
+            Dictionary with section names as keys and (start, end) character
+            offsets of the section content, with surrounding whitespace excluded
+        """
+        headers = [
+            (match.start(), match.end(), match.lastgroup)
+            for match in _SECTION_HEADER_RE.finditer(text)
+        ]
         
-        sections = {}
-        doc = nlp(text)
+        first_header = {}
+        for index, (_, _, section_name) in enumerate(headers):
+            first_header.setdefault(section_name, index)
         
-        # Process each section using SpaCy for better paragraph detection
-        for section_name, pattern in section_patterns.items():
-            # Find all matches for the section header
-            matches = list(re.finditer(pattern, text, re.IGNORECASE))
+        spans = {}
+        for section_name in SECTION_PATTERNS:
+            if section_name not in first_header:
+                continue
+            
+            index = first_header[section_name]
+            start_idx = headers[index][1]
+            
+            # Find the next section start
+            end_idx = len(text)
+            for next_start, _, next_name in headers[index + 1:]:
+                if next_name != section_name:
+                    end_idx = next_start
+                    break
             
-            if matches:
-                # Take the first match for simplicity
-                start_idx = matches[0].end()
-                
-                # Try to find the next section start
-                next_section_starts = []
-                for next_pattern in section_patterns.values():
-                    if next_pattern != pattern:
-                        next_matches = list(re.finditer(next_pattern, text[start_idx:], re.IGNORECASE))
-                        if next_matches:
-                            next_section_starts.append(start_idx + next_matches[0].start())
-                
-                # Get the content between this section start and the next section start
-                if next_section_starts:
-                    end_idx = min(next_section_starts)
-                    sections[section_name] = text[start_idx:end_idx].strip()
-                else:
-                    sections[section_name] = text[start_idx:].strip()
-        
-        return sections
+            # Exclude surrounding whitespace, as str.strip() would
+            while start_idx < end_idx and text[start_idx].isspace():
+                start_idx += 1
+            while end_idx > start_idx and text[end_idx - 1].isspace():
+                end_idx -= 1
+            
+            spans[section_name] = (start_idx, end_idx)
+        
+        return spans
+    
+    def _get_risk_scorer(self, risk_keywords: Dict[str, List[str]]) -> RiskKeywordScorer:
+        """
+        Get a compiled scorer for a keyword dictionary, reusing it across calls.
+        """
+        cache_key = tuple((category, tuple(keywords)) for category, keywords in risk_keywords.items())
+        scorer = self._risk_scorers.get(cache_key)
+        if scorer is None:
+            scorer = RiskKeywordScorer(risk_keywords)
+            self._risk_scorers[cache_key] = scorer
+        return scorer
     
     def extract_risk_indicators(self, text: str, risk_keywords: Dict[str, List[str]]) -> Dict[str, float]:
         """
@@ -260,65 +323,120 @@ class DPRDocumentProcessor:
             Dictionary with risk categories and their normalized frequency scores
         """
         tokens = self.tokenize_and_lemmatize(text)
-        token_count = len(tokens)
-        
-        if token_count == 0:
-            return {category: 0.0 for category in risk_keywords}
-        
-        risk_indicators = {}
+        return self._get_risk_scorer(risk_keywords).score_tokens(tokens)
+    
+    def extract_risk_indicators_batch(
+        self, texts: List[str], risk_keywords: Dict[str, List[str]]
+    ) -> List[Dict[str, float]]:
+        """
+        Extract risk indicators for many texts at once.
         
-        for category, keywords in risk_keywords.items():
-            # Count occurrences of each keyword
-            keyword_count = sum(tokens.count(keyword) for keyword in keywords)
-            
-            # Normalize by token count and keyword list length
-            normalized_score = keyword_count / (token_count * len(keywords))
+        Args:
+            texts: Preprocessed texts
+            risk_keywords: Dictionary of risk categories and their associated keywords
             
-            # Apply sigmoid function to smooth scores between 0 and 1
-            risk_indicators[category] = 1 / (1 + np.exp(-10 * (normalized_score - 0.01)))
-        
-        return risk_indicators
+        Returns:
+            List of risk indicator dictionaries, in input order
+        """
+        scorer = self._get_risk_scorer(risk_keywords)
+        return scorer.score_batch(self.tokenize_and_lemmatize(text) for text in texts)
     
     def process_document(self, file_path: str) -> Dict[str, Any]:
         """
         Process a document and extract structured information.
         
+        The document is tokenized and lemmatized once; the tokens of each
+        section are taken from the document tokens by their offsets.
+        
         Args:
             file_path: Path to the DPR document
             
         Returns:
             Dictionary with processed document information
         """
-        # Extract and preprocess text
         raw_text = self.extract_text_from_file(file_path)
+        return self.process_text(
+            raw_text,
+            file_name=os.path.basename(file_path),
+            file_path=file_path,
+            file_size_mb=os.path.getsize(file_path) / (1024 * 1024),
+        )
+    
+    def process_text(
+        self,
+        raw_text: str,
+        file_name: Optional[str] = None,
+        file_path: Optional[str] = None,
+        file_size_mb: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process already extracted document text, e.g. from the backend's OCR.
+        
+        Args:
+            raw_text: Raw text of the document
+            file_name: Name of the source file, if any
+            file_path: Path of the source file, if any
+            file_size_mb: Size of the source file (defaults to the UTF-8 size of the text)
+            
+        Returns:
+            Dictionary with processed document information, as returned by process_document
+        """
+        if file_size_mb is None:
+            file_size_mb = len(raw_text.encode("utf-8")) / (1024 * 1024)
+        
         preprocessed_text = self.preprocess_text(raw_text)
         
+        # Tokenize the whole document once
+        tokenize_start = time.perf_counter()
+        tokens, offsets = self.tokenize_with_offsets(preprocessed_text)
+        tokenize_seconds = time.perf_counter() - tokenize_start
+        
         # Extract sections
-        sections = self.extract_sections(preprocessed_text)
+        section_spans = self.extract_section_spans(preprocessed_text)
+        sections = {
+            section_name: preprocessed_text[start_idx:end_idx]
+            for section_name, (start_idx, end_idx) in section_spans.items()
+        }
         
         # Extract risk indicators for the whole document
-        risk_indicators = self.extract_risk_indicators(
-            preprocessed_text, 
-            self.config["RISK_KEYWORDS"]
-        )
+        scorer = self._get_risk_scorer(self.config["RISK_KEYWORDS"])
+        risk_indicators = scorer.score_tokens(tokens)
         
-        # Extract risk indicators for each section
+        # Extract risk indicators for each section from its slice of the tokens
         section_risk_indicators = {}
-        for section_name, section_text in sections.items():
-            section_risk_indicators[section_name] = self.extract_risk_indicators(
-                section_text,
-                self.config["RISK_KEYWORDS"]
-            )
+        for section_name, (start_idx, end_idx) in section_spans.items():
+            first = bisect.bisect_left(offsets, start_idx)
+            last = bisect.bisect_left(offsets, end_idx)
+            section_risk_indicators[section_name] = scorer.score_tokens(tokens[first:last])
+        
+        lemma_cache = self._lemmatize.cache_info()
+        lemma_lookups = lemma_cache.hits + lemma_cache.misses
         
         # Create document features
         document_features = {
-            "file_name": os.path.basename(file_path),
+            "file_name": file_name,
             "file_path": file_path,
-            "file_size_mb": os.path.getsize(file_path) / (1024 * 1024),
+            "file_size_mb": file_size_mb,
             "document_length": len(raw_text),
             "sections": sections,
             "risk_indicators": risk_indicators,
-            "section_risk_indicators": section_risk_indicators
+            "section_risk_indicators": section_risk_indicators,
+            "processing_stats": {
+                "token_count": len(tokens),
+                "tokenize_seconds": tokenize_seconds,
+                "tokens_per_sec": len(tokens) / tokenize_seconds if tokenize_seconds > 0 else 0.0,
+                "lemma_cache_hit_rate": lemma_cache.hits / lemma_lookups if lemma_lookups else 0.0,
+            }
         }
         
-        return document_features
\ No newline at end of file
+        return document_features
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards compatible access to the spaCy pipeline, loaded on first use
+    if name == "nlp":
+        return resources.get_nlp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+resources.record_import_time(__name__, time.perf_counter() - _IMPORT_START)
@@ -1,15 +1,171 @@
 """
 Feature extraction module for risk prediction
 """
+import json
 import os
 import re
+import sys
+import time
+from collections import Counter
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Tuple, Optional, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Tuple, Optional, Union
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.decomposition import TruncatedSVD
 import joblib
 
+from .feature_schema import RiskFeatureSchema
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# TF-IDF and SVD parameters shared by the in-memory and streaming fits
+TFIDF_PARAMS = {
+    "max_features": 1000,
+    "min_df": 2,
+    "max_df": 0.85,
+    "ngram_range": (1, 2),
+}
+SVD_COMPONENTS = 100
+
+NUMERICAL_FEATURE_COLUMNS = ["file_size_mb", "doc_length", "num_sections", "avg_section_length"]
+
+# Number of documents transformed at once by create_feature_dataframe
+DEFAULT_CHUNK_SIZE = 1000
+
+def iter_jsonl_documents(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read processed documents from a JSONL file, skipping unreadable lines.
+    
+    Args:
+        path: Path to the JSONL file
+        
+    Yields:
+        Processed document dictionaries
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                document = json.loads(line)
+            except ValueError:
+                # Torn last line of an interrupted run
+                continue
+            if isinstance(document, dict) and 'sections' in document:
+                yield document
+
+
+def _select_vocabulary(
+    term_counts: Counter, document_counts: Counter, num_texts: int
+) -> Tuple[Dict[str, int], np.ndarray]:
+    """
+    Select the vocabulary and compute IDF weights the way TfidfVectorizer.fit does.
+    
+    Terms outside [min_df, max_df] are dropped and the max_features most
+    frequent remaining terms are kept. Ties at that cutoff are broken the
+    way scikit-learn's _limit_features does (checked against 1.3), by the
+    same unstable argsort of the negated total counts of the
+    alphabetically ordered terms, so the vocabulary matches the in-memory
+    fit. The vocabulary is indexed in
+    sorted order. IDF uses the smooth_idf formula ln((1 + n) / (1 + df)) + 1.
+    """
+    min_df = TFIDF_PARAMS["min_df"]
+    max_df = TFIDF_PARAMS["max_df"]
+    min_count = min_df if isinstance(min_df, int) else min_df * num_texts
+    max_count = max_df if isinstance(max_df, int) else max_df * num_texts
+    if max_count < min_count:
+        raise ValueError("max_df corresponds to < documents than min_df")
+    
+    candidates = sorted(
+        term for term, count in document_counts.items() if min_count <= count <= max_count
+    )
+    if not candidates:
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+    
+    max_features = TFIDF_PARAMS["max_features"]
+    if max_features is not None and len(candidates) > max_features:
+        # float64 like the summed count matrix, so argsort sees the same array
+        tfs = np.array([term_counts[term] for term in candidates], dtype=np.float64)
+        candidates = [candidates[index] for index in (-tfs).argsort()[:max_features]]
+    
+    terms = sorted(candidates)
+    vocabulary = {term: index for index, term in enumerate(terms)}
+    df = np.array([document_counts[term] for term in terms], dtype=np.float64)
+    idf = np.log((1 + num_texts) / (1 + df)) + 1
+    return vocabulary, idf
+
+
+def _prune_counts(term_counts: Counter, document_counts: Counter, max_terms: int) -> int:
+    """
+    Drop the rarest terms until at most half of `max_terms` are tracked.
+    
+    Terms are dropped by increasing document count (first those seen in one
+    text so far, then two, ...). Returns the number of terms dropped.
+    """
+    dropped = 0
+    threshold = 1
+    while len(document_counts) > max_terms // 2:
+        rare = [term for term, count in document_counts.items() if count <= threshold]
+        for term in rare:
+            del document_counts[term]
+            del term_counts[term]
+        dropped += len(rare)
+        threshold += 1
+    return dropped
+
+
+def _svd_from_gram(
+    gram: np.ndarray, column_sums: np.ndarray, num_rows: int, n_components: int
+) -> TruncatedSVD:
+    """
+    Build a fitted TruncatedSVD from the Gram matrix X^T X of its training data.
+    
+    The right singular vectors of X are the eigenvectors of X^T X and the
+    singular values the square roots of its eigenvalues. The sign of each
+    component is arbitrary; it is chosen so that its largest absolute
+    loading is positive. That is TruncatedSVD's convention from
+    scikit-learn 1.5; earlier versions choose signs from the left singular
+    vectors, which are never computed here, so some components may be
+    flipped relative to them (singular values and |components| agree).
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(gram)
+    order = np.argsort(eigenvalues)[::-1][:n_components]
+    eigenvalues = np.clip(eigenvalues[order], 0, None)
+    components = eigenvectors[:, order].T
+    
+    max_abs = np.argmax(np.abs(components), axis=1)
+    signs = np.sign(components[np.arange(n_components), max_abs])
+    signs[signs == 0] = 1
+    components *= signs[:, np.newaxis]
+    
+    # Variance of each projected column and of the original features
+    means = column_sums / num_rows
+    explained_variance = eigenvalues / num_rows - (components @ means) ** 2
+    full_variance = np.sum(np.diag(gram) / num_rows - means ** 2)
+    
+    svd = TruncatedSVD(n_components=n_components)
+    svd.components_ = components
+    svd.explained_variance_ = explained_variance
+    svd.explained_variance_ratio_ = explained_variance / full_variance
+    svd.singular_values_ = np.sqrt(eigenvalues)
+    svd.n_features_in_ = gram.shape[0]
+    return svd
+
+
+def _peak_memory_mb() -> Optional[float]:
+    """
+    Get the peak resident memory of this process in MB, where supported.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
 class FeatureExtractor:
     """
     Class for extracting features from processed DPR documents for risk analysis.
@@ -25,6 +181,7 @@ class FeatureExtractor:
         self.config = config
         self.tfidf_vectorizer = None
         self.svd_transformer = None
+        self.risk_schema = RiskFeatureSchema.from_config(config)
     
     def fit_vectorizers(self, documents: List[Dict[str, Any]]) -> None:
         """
@@ -43,18 +200,131 @@ class FeatureExtractor:
             raise ValueError("No text content available to fit vectorizers")
         
         # Fit TF-IDF vectorizer
-        self.tfidf_vectorizer = TfidfVectorizer(
-            max_features=1000,
-            min_df=2,
-            max_df=0.85,
-            ngram_range=(1, 2)
-        )
+        self.tfidf_vectorizer = TfidfVectorizer(**TFIDF_PARAMS)
         tfidf_matrix = self.tfidf_vectorizer.fit_transform(all_texts)
         
         # Fit SVD transformer for dimensionality reduction
-        self.svd_transformer = TruncatedSVD(n_components=100)
+        self.svd_transformer = TruncatedSVD(n_components=SVD_COMPONENTS)
         self.svd_transformer.fit(tfidf_matrix)
     
+    def fit_vectorizers_streaming(
+        self,
+        documents: Union[str, Callable[[], Iterable[Dict[str, Any]]], Iterable[Dict[str, Any]]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_tracked_terms: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fit the TF-IDF vectorizer and SVD transformer without holding the corpus in memory.
+        
+        The documents are read twice. The first pass counts term and document
+        frequencies with the same analyzer as `fit_vectorizers` and selects the
+        vocabulary with the same min_df, max_df and max_features rules, so the
+        vocabulary and IDF weights are those of `fit_vectorizers`. The second
+        pass accumulates the Gram matrix X^T X of the TF-IDF matrix chunk by
+        chunk, whose top eigenvectors are the SVD components: the singular
+        values and the absolute components match an exact SVD of the
+        in-memory TF-IDF matrix, the signs may differ (see `_svd_from_gram`).
+        
+        The texts are never held in memory, but the first pass keeps a count
+        for every distinct unigram and bigram, which grows with the corpus
+        (roughly with the square root of its size for natural text). With
+        `max_tracked_terms`, the rarest terms are dropped whenever more are
+        tracked, bounding that table. Their earlier occurrences are then
+        lost, so terms near the min_df or max_features cutoffs may be
+        selected differently from the exact fit. The second pass only keeps
+        the vocabulary-sized Gram matrix.
+        
+        The fitted objects are regular TfidfVectorizer and TruncatedSVD
+        instances, so they can be saved with `save_vectorizers` and used by
+        the rest of the extractor unchanged.
+        
+        Args:
+            documents: Path to a JSONL file of processed documents (as written
+                by risk_model.corpus), a function returning a new iterator of
+                documents on each call, or a re-iterable collection of documents
+            chunk_size: Number of section texts transformed at once in the second pass
+            max_tracked_terms: Bound on the terms counted in the first pass (None for an exact count)
+            
+        Returns:
+            Dictionary with fit statistics, including fit time and peak memory
+        """
+        if isinstance(documents, str):
+            path = documents
+            open_documents = lambda: iter_jsonl_documents(path)
+        elif callable(documents):
+            open_documents = documents
+        elif iter(documents) is documents:
+            raise ValueError("Streaming fit needs two passes; pass a generator function instead of an iterator")
+        else:
+            collection = documents
+            open_documents = lambda: collection
+        
+        start_time = time.perf_counter()
+        
+        # Pass 1: term and document frequencies
+        analyzer = TfidfVectorizer(**TFIDF_PARAMS).build_analyzer()
+        term_counts = Counter()
+        document_counts = Counter()
+        num_documents = 0
+        num_texts = 0
+        pruned_terms = 0
+        for document in open_documents():
+            num_documents += 1
+            for section_text in document['sections'].values():
+                terms = analyzer(section_text)
+                term_counts.update(terms)
+                document_counts.update(set(terms))
+                num_texts += 1
+            if max_tracked_terms is not None and len(document_counts) > max_tracked_terms:
+                pruned_terms += _prune_counts(term_counts, document_counts, max_tracked_terms)
+        tracked_terms = len(document_counts)
+        
+        if not num_texts:
+            raise ValueError("No text content available to fit vectorizers")
+        
+        vocabulary, idf = _select_vocabulary(term_counts, document_counts, num_texts)
+        del term_counts, document_counts
+        
+        self.tfidf_vectorizer = TfidfVectorizer(vocabulary=vocabulary, **TFIDF_PARAMS)
+        self.tfidf_vectorizer.idf_ = idf
+        
+        # Pass 2: Gram matrix and column sums of the TF-IDF matrix
+        num_features = len(vocabulary)
+        if SVD_COMPONENTS >= num_features:
+            raise ValueError(
+                f"n_components ({SVD_COMPONENTS}) must be lower than the number of features ({num_features})"
+            )
+        gram = np.zeros((num_features, num_features))
+        column_sums = np.zeros(num_features)
+        chunk = []
+        for document in open_documents():
+            chunk.extend(document['sections'].values())
+            if len(chunk) >= chunk_size:
+                self._accumulate_gram(chunk, gram, column_sums)
+                chunk = []
+        if chunk:
+            self._accumulate_gram(chunk, gram, column_sums)
+        
+        self.svd_transformer = _svd_from_gram(gram, column_sums, num_texts, SVD_COMPONENTS)
+        
+        fit_seconds = time.perf_counter() - start_time
+        stats = {
+            "documents": num_documents,
+            "texts": num_texts,
+            "vocabulary_size": num_features,
+            "tracked_terms": tracked_terms,
+            "pruned_terms": pruned_terms,
+            "fit_seconds": fit_seconds,
+            "texts_per_sec": num_texts / fit_seconds if fit_seconds > 0 else 0.0,
+            "peak_memory_mb": _peak_memory_mb(),
+        }
+        return stats
+    
+    def _accumulate_gram(self, texts: List[str], gram: np.ndarray, column_sums: np.ndarray) -> None:
+        tfidf_matrix = self.tfidf_vectorizer.transform(texts)
+        gram += (tfidf_matrix.T @ tfidf_matrix).toarray()
+        column_sums += np.asarray(tfidf_matrix.sum(axis=0)).ravel()
+    
     def save_vectorizers(self, output_dir: str) -> None:
         """
         Save fitted vectorizers to disk.
@@ -69,6 +339,11 @@ class FeatureExtractor:
         
         joblib.dump(self.tfidf_vectorizer, tfidf_path)
         joblib.dump(self.svd_transformer, svd_path)
+        
+        # Record the risk feature layout the vectorizers were saved with
+        schema_path = os.path.join(output_dir, "feature_schema.json")
+        with open(schema_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.risk_schema.version, **self.risk_schema.to_dict()}, f, indent=2)
     
     def load_vectorizers(self, input_dir: str) -> None:
         """
@@ -83,6 +358,17 @@ class FeatureExtractor:
         if not os.path.exists(tfidf_path) or not os.path.exists(svd_path):
             raise FileNotFoundError(f"Vectorizer files not found in {input_dir}")
         
+        # Vectorizers saved before the schema was recorded have no schema file
+        schema_path = os.path.join(input_dir, "feature_schema.json")
+        if os.path.exists(schema_path):
+            with open(schema_path, "r", encoding="utf-8") as f:
+                saved_version = json.load(f).get("version")
+            if saved_version != self.risk_schema.version:
+                raise ValueError(
+                    f"Risk feature schema mismatch: saved {saved_version}, "
+                    f"current {self.risk_schema.version}"
+                )
+        
         self.tfidf_vectorizer = joblib.load(tfidf_path)
         self.svd_transformer = joblib.load(svd_path)
     
@@ -145,23 +431,7 @@ class FeatureExtractor:
         Returns:
             NumPy array of features
         """
-        # Overall risk indicators
-        risk_indicators = document.get('risk_indicators', {})
-        
-        # Extract values for each risk category
-        risk_features = []
-        for category in self.config["RISK_CATEGORIES"].keys():
-            risk_features.append(risk_indicators.get(category, 0.0))
-        
-        # Section-specific risk indicators
-        section_risk = document.get('section_risk_indicators', {})
-        
-        # Extract section-specific risk values
-        for section_name, section_risks in section_risk.items():
-            for category in self.config["RISK_CATEGORIES"].keys():
-                risk_features.append(section_risks.get(category, 0.0))
-        
-        return np.array(risk_features)
+        return self.risk_schema.transform([document])[0]
     
     def extract_features(self, document: Dict[str, Any]) -> np.ndarray:
         """
@@ -173,62 +443,101 @@ class FeatureExtractor:
         Returns:
             NumPy array of all features
         """
-        # Concatenate all text sections
-        all_text = " ".join(document.get('sections', {}).values())
+        return self.extract_features_batch([document])[0]
+    
+    def extract_features_batch(self, documents: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Extract all features from many processed documents at once.
         
-        # Extract different feature types
-        text_features = self.extract_text_features(all_text)
-        numerical_features = self.extract_numerical_features(document)
-        risk_features = self.extract_risk_features(document)
+        Args:
+            documents: List of processed documents
+            
+        Returns:
+            NumPy float32 array with one row of features per document
+        """
+        if not self.tfidf_vectorizer or not self.svd_transformer:
+            raise ValueError("Vectorizers are not fitted or loaded")
         
-        # Combine all features
-        all_features = np.concatenate([
-            text_features, 
-            numerical_features, 
-            risk_features
-        ])
+        features = np.empty((len(documents), self.feature_count), dtype=self.risk_schema.dtype)
+        self._fill_features(documents, features)
+        return features
+    
+    @property
+    def feature_count(self) -> int:
+        """Number of features per document"""
+        return self.svd_transformer.n_components + len(NUMERICAL_FEATURE_COLUMNS) + self.risk_schema.width
+    
+    def _fill_features(self, documents: List[Dict[str, Any]], out: np.ndarray) -> None:
+        """
+        Write the features of many documents into the rows of a preallocated matrix.
         
-        return all_features
+        The texts of all documents go through the TF-IDF vectorizer and SVD
+        transformer in one sparse-matrix call, and the numerical and risk
+        features are written straight into their column blocks.
+        """
+        if not documents:
+            return
+        
+        num_text = self.svd_transformer.n_components
+        num_numerical = len(NUMERICAL_FEATURE_COLUMNS)
+        
+        # Text features for all documents in one transform
+        texts = [" ".join(document.get('sections', {}).values()) for document in documents]
+        out[:, :num_text] = self.svd_transformer.transform(self.tfidf_vectorizer.transform(texts))
+        
+        numerical = out[:, num_text:num_text + num_numerical]
+        risk = out[:, num_text + num_numerical:]
+        numerical.fill(0)
+        risk.fill(self.risk_schema.fill_value)
+        for row, document in enumerate(documents):
+            sections = document.get('sections', {})
+            numerical[row, 0] = document.get('file_size_mb', 0)
+            numerical[row, 1] = document.get('document_length', 0)
+            numerical[row, 2] = len(sections)
+            if sections:
+                numerical[row, 3] = sum(len(section) for section in sections.values()) / len(sections)
+            self.risk_schema.fill_row(document, risk[row])
     
-    def create_feature_dataframe(self, documents: List[Dict[str, Any]]) -> pd.DataFrame:
+    def get_feature_names(self) -> List[str]:
+        """
+        Get the feature column names, in the order produced by extract_features.
+        
+        Returns:
+            List of column names
+        """
+        if not self.svd_transformer:
+            raise ValueError("Vectorizers are not fitted or loaded")
+        
+        text_feature_cols = [f"text_feat_{i}" for i in range(self.svd_transformer.n_components)]
+        return text_feature_cols + NUMERICAL_FEATURE_COLUMNS + self.risk_schema.column_names
+    
+    def create_feature_dataframe(
+        self, documents: List[Dict[str, Any]], chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE
+    ) -> pd.DataFrame:
         """
         Create a DataFrame with features for multiple documents.
         
+        Documents are transformed in chunks of `chunk_size`, so the memory
+        used by the intermediate TF-IDF matrices stays bounded.
+        
         Args:
             documents: List of processed documents
+            chunk_size: Number of documents per chunk (None for a single chunk)
             
         Returns:
             Pandas DataFrame with features for each document
         """
-        all_features = []
-        file_names = []
-        
-        for document in documents:
-            features = self.extract_features(document)
-            all_features.append(features)
-            file_names.append(document.get('file_name', 'unknown'))
-        
-        # Create feature column names
-        text_feature_cols = [f"text_feat_{i}" for i in range(100)]
-        numerical_feature_cols = ["file_size_mb", "doc_length", "num_sections", "avg_section_length"]
-        risk_feature_cols = []
-        
-        # Overall risk feature names
-        for category in self.config["RISK_CATEGORIES"].keys():
-            risk_feature_cols.append(f"risk_{category}")
-        
-        # Section risk feature names
-        for section in ["executive_summary", "project_description", "budget_estimation", 
-                         "technical_specifications", "implementation_plan", "environmental_impact", 
-                         "risk_assessment"]:
-            for category in self.config["RISK_CATEGORIES"].keys():
-                risk_feature_cols.append(f"risk_{section}_{category}")
+        all_columns = self.get_feature_names()
+        chunk_size = chunk_size or max(len(documents), 1)
         
-        # Combine all column names
-        all_columns = text_feature_cols + numerical_feature_cols + risk_feature_cols
+        # One contiguous matrix, filled chunk by chunk
+        all_features = np.empty((len(documents), len(all_columns)), dtype=self.risk_schema.dtype)
+        for start in range(0, len(documents), chunk_size):
+            chunk = documents[start:start + chunk_size]
+            self._fill_features(chunk, all_features[start:start + len(chunk)])
         
         # Create DataFrame
-        feature_df = pd.DataFrame(all_features, columns=all_columns)
-        feature_df.insert(0, "file_name", file_names)
+        feature_df = pd.DataFrame(all_features, columns=all_columns, copy=False)
+        feature_df.insert(0, "file_name", [document.get('file_name', 'unknown') for document in documents])
         
-        return feature_df
\ No newline at end of file
+        return feature_df
@@ -0,0 +1,178 @@
+"""
+Fixed-layout schema for risk indicator feature vectors
+"""
+import hashlib
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .data_preprocessing import SECTION_PATTERNS
+
+# Sections with per-section risk features, in column order
+FEATURE_SECTIONS = list(SECTION_PATTERNS.keys())
+
+# Bump when the way documents are mapped to slots changes
+SCHEMA_FORMAT = 1
+
+
+class RiskFeatureSchema:
+    """
+    Fixed layout of the risk indicator features of a document.
+
+    The vector has one block of category slots for the overall risk
+    indicators, followed by one block per section in `sections` order.
+    Every document maps to a vector of the same width, whatever sections
+    it contains; missing sections and categories are set to `fill_value`.
+    The version id identifies the layout, so vectors and models built with
+    different schemas are never mixed.
+    """
+
+    dtype = np.float32
+
+    def __init__(
+        self,
+        categories: Sequence[str],
+        sections: Sequence[str] = FEATURE_SECTIONS,
+        fill_value: float = 0.0,
+    ):
+        """
+        Initialize the schema.
+
+        Args:
+            categories: Risk categories, in slot order
+            sections: Sections with per-section risk features, in block order
+            fill_value: Value of missing slots, e.g. 0.0 or NaN
+        """
+        self.categories = tuple(categories)
+        self.sections = tuple(sections)
+        self.fill_value = float(fill_value)
+
+        self._category_index = {category: i for i, category in enumerate(self.categories)}
+        self._section_offsets = {
+            section: (i + 1) * len(self.categories) for i, section in enumerate(self.sections)
+        }
+        self.width = (1 + len(self.sections)) * len(self.categories)
+        self.version = self._compute_version()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RiskFeatureSchema":
+        """
+        Create the schema for a risk_model configuration dictionary.
+
+        Args:
+            config: Configuration dictionary with RISK_CATEGORIES
+
+        Returns:
+            Schema instance
+        """
+        return cls(
+            list(config["RISK_CATEGORIES"].keys()),
+            fill_value=config.get("RISK_FEATURE_FILL_VALUE", 0.0),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get a JSON-serializable description of the schema.
+        """
+        return {
+            "format": SCHEMA_FORMAT,
+            "categories": list(self.categories),
+            "sections": list(self.sections),
+            # JSON has no NaN
+            "fill_value": "nan" if math.isnan(self.fill_value) else self.fill_value,
+            "dtype": np.dtype(self.dtype).name,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RiskFeatureSchema":
+        """
+        Recreate a schema from the output of `to_dict`.
+        """
+        if data.get("format") != SCHEMA_FORMAT:
+            raise ValueError(f"Unsupported risk feature schema format: {data.get('format')}")
+        return cls(data["categories"], data["sections"], float(data["fill_value"]))
+
+    def _compute_version(self) -> str:
+        payload = json.dumps(self.to_dict(), sort_keys=True).encode("utf-8")
+        return f"risk-v{SCHEMA_FORMAT}-{hashlib.sha256(payload).hexdigest()[:12]}"
+
+    @property
+    def column_names(self) -> List[str]:
+        """
+        Feature column names, in slot order.
+        """
+        columns = [f"risk_{category}" for category in self.categories]
+        for section in self.sections:
+            for category in self.categories:
+                columns.append(f"risk_{section}_{category}")
+        return columns
+
+    def slot(self, category: str, section: Optional[str] = None) -> int:
+        """
+        Get the index of a slot.
+
+        Args:
+            category: Risk category
+            section: Section name, or None for the overall risk indicators
+
+        Returns:
+            Index of the slot in the feature vector
+        """
+        offset = self._section_offsets[section] if section is not None else 0
+        return offset + self._category_index[category]
+
+    def allocate(self, num_documents: int) -> np.ndarray:
+        """
+        Allocate a feature matrix with every slot set to the fill value.
+
+        Args:
+            num_documents: Number of rows
+
+        Returns:
+            Contiguous array of shape (num_documents, width)
+        """
+        return np.full((num_documents, self.width), self.fill_value, dtype=self.dtype)
+
+    def fill_row(self, document: Dict[str, Any], out: np.ndarray) -> None:
+        """
+        Write the risk features of a document into a row of the fill value.
+
+        Args:
+            document: Processed document dictionary
+            out: Row to write to, with `width` elements
+        """
+        category_index = self._category_index
+
+        # Overall risk indicators
+        for category, value in document.get('risk_indicators', {}).items():
+            index = category_index.get(category)
+            if index is not None:
+                out[index] = value
+
+        # Section-specific risk indicators; unknown sections have no slots
+        for section, section_risks in document.get('section_risk_indicators', {}).items():
+            offset = self._section_offsets.get(section)
+            if offset is None:
+                continue
+            for category, value in section_risks.items():
+                index = category_index.get(category)
+                if index is not None:
+                    out[offset + index] = value
+
+    def transform(self, documents: Iterable[Dict[str, Any]]) -> np.ndarray:
+        """
+        Build the risk feature matrix of many documents.
+
+        Args:
+            documents: Processed documents
+
+        Returns:
+            Array of shape (number of documents, width)
+        """
+        documents = list(documents)
+        features = self.allocate(len(documents))
+        for row, document in enumerate(documents):
+            self.fill_row(document, features[row])
+        return features
@@ -0,0 +1,150 @@
+"""
+Lazily loaded NLP resources shared by the risk model modules
+
+spaCy and NLTK resources are loaded on first use instead of at import
+time. Call `warm_up()` in a parent process before forking workers so the
+loaded resources are shared copy-on-write instead of being reloaded in
+every worker.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Resources used by DPRDocumentProcessor
+PROCESSOR_RESOURCES = ("stopwords", "lemmatizer", "word_tokenizer")
+
+_lock = threading.RLock()
+_resources: Dict[str, Any] = {}
+_load_seconds: Dict[str, float] = {}
+_import_seconds: Dict[str, float] = {}
+
+
+def _ensure_nltk_data(path: str, package: str) -> None:
+    import nltk
+
+    try:
+        nltk.data.find(path)
+    except LookupError:
+        nltk.download(package, quiet=True)
+
+
+def _load_nlp() -> Any:
+    import spacy
+
+    try:
+        return spacy.load('en_core_web_sm')
+    except OSError as e:
+        raise RuntimeError(
+            "SpaCy model 'en_core_web_sm' is not installed. Please install it using: "
+            "python -m spacy download en_core_web_sm"
+        ) from e
+
+
+def _load_stopwords() -> Any:
+    _ensure_nltk_data('corpora/stopwords', 'stopwords')
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words('english'))
+
+
+def _load_lemmatizer() -> Any:
+    _ensure_nltk_data('corpora/wordnet', 'wordnet')
+    from nltk.stem import WordNetLemmatizer
+
+    lemmatizer = WordNetLemmatizer()
+    # WordNet itself is loaded on the first lookup; do it now so that it
+    # is part of the warmed-up state
+    lemmatizer.lemmatize("resources")
+    return lemmatizer
+
+
+def _load_word_tokenizer() -> Any:
+    from nltk.tokenize import NLTKWordTokenizer
+
+    return NLTKWordTokenizer()
+
+
+_LOADERS: Dict[str, Callable[[], Any]] = {
+    "nlp": _load_nlp,
+    "stopwords": _load_stopwords,
+    "lemmatizer": _load_lemmatizer,
+    "word_tokenizer": _load_word_tokenizer,
+}
+
+
+def get_resource(name: str) -> Any:
+    """
+    Get a shared resource, loading it on first use.
+
+    Args:
+        name: One of "nlp", "stopwords", "lemmatizer" or "word_tokenizer"
+
+    Returns:
+        The loaded resource
+    """
+    resource = _resources.get(name)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(name)
+            if resource is None:
+                start = time.perf_counter()
+                resource = _LOADERS[name]()
+                _load_seconds[name] = time.perf_counter() - start
+                _resources[name] = resource
+    return resource
+
+
+def get_nlp() -> Any:
+    """Get the spaCy English pipeline"""
+    return get_resource("nlp")
+
+
+def get_stopwords() -> Any:
+    """Get the set of English stopwords"""
+    return get_resource("stopwords")
+
+
+def get_lemmatizer() -> Any:
+    """Get the WordNet lemmatizer"""
+    return get_resource("lemmatizer")
+
+
+def get_word_tokenizer() -> Any:
+    """Get the NLTK word tokenizer"""
+    return get_resource("word_tokenizer")
+
+
+def warm_up(names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    Load resources ahead of time, e.g. before forking worker processes.
+
+    Args:
+        names: Resources to load (defaults to all of them)
+
+    Returns:
+        Dictionary with the load time in seconds of each resource
+    """
+    names = list(names) if names is not None else list(_LOADERS)
+    for name in names:
+        get_resource(name)
+    return {name: _load_seconds.get(name, 0.0) for name in names}
+
+
+def record_import_time(module: str, seconds: float) -> None:
+    """Record how long a module took to import"""
+    _import_seconds[module] = seconds
+
+
+def get_metrics() -> Dict[str, Any]:
+    """
+    Get import-time and load-time metrics.
+
+    Returns:
+        Dictionary with module import times, resource load times and the
+        names of the resources loaded so far
+    """
+    return {
+        "import_seconds": dict(_import_seconds),
+        "load_seconds": dict(_load_seconds),
+        "loaded": sorted(_resources),
+    }
@@ -0,0 +1,95 @@
+"""
+Keyword-based risk indicator scoring
+"""
+from collections import Counter
+from typing import Dict, Iterable, List
+
+
+class RiskKeywordScorer:
+    """
+    Scores token lists against risk keyword categories in a single pass.
+
+    The keyword lists are compiled once into a keyword -> category index,
+    so scoring a text costs one token frequency count plus one lookup per
+    distinct token, instead of one full list scan per keyword.
+    """
+
+    def __init__(self, risk_keywords: Dict[str, List[str]]):
+        """
+        Initialize the scorer.
+
+        Args:
+            risk_keywords: Dictionary of risk categories and their associated keywords
+        """
+        self.categories = list(risk_keywords.keys())
+        self.keyword_list_sizes = {
+            category: len(keywords) for category, keywords in risk_keywords.items()
+        }
+
+        # keyword -> [(category, multiplicity)], so keywords listed twice
+        # count twice, exactly as summing list.count() per keyword does
+        index: Dict[str, Dict[str, int]] = {}
+        for category, keywords in risk_keywords.items():
+            for keyword in keywords:
+                categories = index.setdefault(keyword, {})
+                categories[category] = categories.get(category, 0) + 1
+        self.keyword_index = {
+            keyword: list(categories.items()) for keyword, categories in index.items()
+        }
+
+    def score_tokens(self, tokens: List[str]) -> Dict[str, float]:
+        """
+        Score a list of tokens.
+
+        Args:
+            tokens: Tokenized and lemmatized text
+
+        Returns:
+            Dictionary with risk categories and their normalized frequency scores
+        """
+        token_count = len(tokens)
+
+        if token_count == 0:
+            return {category: 0.0 for category in self.categories}
+
+        # Imported here so that importing risk_model.data_preprocessing does
+        # not load numpy; np.exp (rather than math.exp, which can differ in
+        # the last bit) keeps the scores identical to the original ones
+        import numpy as np
+
+        keyword_counts = dict.fromkeys(self.categories, 0)
+        frequencies = Counter(tokens)
+
+        # Walk whichever side is smaller: the distinct tokens or the keyword index
+        if len(frequencies) < len(self.keyword_index):
+            for token, frequency in frequencies.items():
+                for category, multiplicity in self.keyword_index.get(token, ()):
+                    keyword_counts[category] += frequency * multiplicity
+        else:
+            for keyword, categories in self.keyword_index.items():
+                frequency = frequencies.get(keyword)
+                if frequency:
+                    for category, multiplicity in categories:
+                        keyword_counts[category] += frequency * multiplicity
+
+        risk_indicators = {}
+        for category in self.categories:
+            # Normalize by token count and keyword list length
+            normalized_score = keyword_counts[category] / (token_count * self.keyword_list_sizes[category])
+
+            # Apply sigmoid function to smooth scores between 0 and 1
+            risk_indicators[category] = 1 / (1 + np.exp(-10 * (normalized_score - 0.01)))
+
+        return risk_indicators
+
+    def score_batch(self, token_lists: Iterable[List[str]]) -> List[Dict[str, float]]:
+        """
+        Score many token lists with the same compiled keyword index.
+
+        Args:
+            token_lists: Iterable of tokenized texts
+
+        Returns:
+            List of risk indicator dictionaries, in input order
+        """
+        return [self.score_tokens(tokens) for tokens in token_lists]
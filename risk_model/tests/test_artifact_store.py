@@ -0,0 +1,59 @@
+"""
+ArtifactStore activation history and loading
+"""
+import numpy as np
+import pytest
+
+from ..artifact_store import ArtifactStore
+from ..benchmarks.documents import HEADERS, generate_document
+from ..config import get_config
+from ..feature_extraction import FeatureExtractor
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    documents = []
+    for seed in range(40):
+        text = generate_document(2000, seed=seed)
+        bodies = [part.split("\n", 1)[1] for part in text.strip().split("\n\n")]
+        documents.append({"sections": dict(zip(HEADERS, bodies))})
+    extractor = FeatureExtractor(get_config())
+    extractor.fit_vectorizers(documents)
+    return extractor
+
+
+def test_rollback_walks_back_through_activations(tmp_path, extractor):
+    store = ArtifactStore(str(tmp_path))
+    for version in ("v1", "v2", "v3"):
+        store.publish(extractor, version=version)
+
+    assert store.rollback() == "v2"
+    assert store.rollback() == "v1"
+    assert store.current_version() == "v1"
+    with pytest.raises(ValueError):
+        store.rollback()
+
+
+def test_rollback_after_reactivation(tmp_path, extractor):
+    store = ArtifactStore(str(tmp_path))
+    store.publish(extractor, version="v1")
+    store.publish(extractor, version="v2")
+    store.activate("v1")
+
+    assert store.rollback() == "v2"
+    assert store.rollback() == "v1"
+
+
+def test_load_maps_components_and_matches_extractor(tmp_path, extractor):
+    store = ArtifactStore(str(tmp_path))
+    store.publish(extractor, version="v1")
+    loaded = store.load()
+
+    svd = loaded.extractor.svd_transformer
+    assert isinstance(svd.components_, np.memmap)
+    texts = ["risk of delay in land acquisition", "budget estimation for the bridge"]
+    expected = extractor.svd_transformer.transform(extractor.tfidf_vectorizer.transform(texts))
+    actual = svd.transform(loaded.extractor.tfidf_vectorizer.transform(texts))
+    assert np.allclose(actual, expected)
+    # Transforming must not have replaced the mapped array with a copy
+    assert isinstance(svd.components_, np.memmap)
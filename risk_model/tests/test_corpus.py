@@ -0,0 +1,127 @@
+"""
+Corpus processing: resume by hash, duplicate files, failures and dead workers
+"""
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from .. import corpus, resources
+
+# The workers get the test processor below by inheriting the patched module
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="needs the fork start method"
+)
+
+
+class _Processor:
+    """
+    Document processor that reads the text, and fails or kills its worker when the text says so
+
+    Keeps these tests about the corpus bookkeeping rather than the NLP
+    pipeline (and its NLTK data).
+    """
+    def __init__(self, config):
+        pass
+
+    def process_document(self, file_path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        if "FAIL" in text:
+            raise ValueError("unreadable document")
+        if "CRASH" in text:
+            os._exit(1)
+        return {"file_path": file_path, "sections": {"full_text": text}}
+
+
+@pytest.fixture(autouse=True)
+def processor(monkeypatch):
+    monkeypatch.setattr(corpus, "DPRDocumentProcessor", _Processor)
+    monkeypatch.setattr(resources, "warm_up", lambda names: 0.0)
+
+
+def _write(directory, name, text):
+    path = directory / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def _records(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.endswith("\n")]
+
+
+def _run(input_dir, output, **options):
+    return corpus.process_corpus(str(input_dir), str(output), workers=2, **options)
+
+
+def test_resume_by_hash_and_skip_duplicates(tmp_path):
+    documents = tmp_path / "documents"
+    documents.mkdir()
+    first = _write(documents, "a.txt", "Bridge DPR")
+    second = _write(documents, "b.txt", "Road DPR")
+    _write(documents, "copy_of_a.txt", "Bridge DPR")
+    _write(documents, "notes.md", "Not a supported file type")
+    output = tmp_path / "out" / "corpus.jsonl"
+
+    stats = _run(documents, output)
+    assert (stats["processed"], stats["failed"], stats["skipped"]) == (2, 0, 1)
+    records = _records(output)
+    assert sorted(record["sections"]["full_text"] for record in records) == ["Bridge DPR", "Road DPR"]
+    assert {record["file_hash"] for record in records} == {corpus.file_sha256(first), corpus.file_sha256(second)}
+
+    # An interrupted write leaves a torn last line, which is ignored
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"file_hash": "torn')
+    _write(documents, "c.txt", "Canal DPR")
+    stats = _run(documents, output)
+    assert (stats["queued"], stats["processed"], stats["skipped"]) == (1, 1, 3)
+
+    stats = _run(documents, output)
+    assert (stats["queued"], stats["skipped"]) == (0, 4)
+
+
+def test_failures_file(tmp_path):
+    documents = tmp_path / "documents"
+    documents.mkdir()
+    _write(documents, "good.txt", "Bridge DPR")
+    bad = _write(documents, "bad.txt", "FAIL")
+    output = tmp_path / "corpus.jsonl"
+    failures = f"{output}.failures.jsonl"
+
+    stats = _run(documents, output)
+    assert (stats["processed"], stats["failed"]) == (1, 1)
+    assert _records(failures) == [{
+        "file_path": bad,
+        "file_hash": corpus.file_sha256(bad),
+        "error": "ValueError: unreadable document",
+    }]
+
+    # Failed files are skipped unless retried
+    assert _run(documents, output)["queued"] == 0
+    stats = _run(documents, output, retry_failed=True)
+    assert (stats["queued"], stats["failed"]) == (1, 1)
+    assert len(_records(failures)) == 2
+
+
+def test_dead_worker_only_fails_its_file(tmp_path):
+    documents = tmp_path / "documents"
+    documents.mkdir()
+    for index in range(8):
+        _write(documents, f"doc{index}.txt", f"DPR {index}")
+    crash = _write(documents, "doc3_crash.txt", "CRASH")
+    output = tmp_path / "corpus.jsonl"
+
+    stats = _run(documents, output)
+    assert (stats["processed"], stats["failed"]) == (8, 1)
+    # The pool that ran the file, and the pool that ran it on its own
+    assert stats["broken_pools"] == 2
+    assert len({record["file_hash"] for record in _records(output)}) == 8
+    [failure] = _records(f"{output}.failures.jsonl")
+    assert failure["file_path"] == crash
+    assert failure["error"].startswith("BrokenProcessPool")
+
+    assert _run(documents, output)["queued"] == 0
@@ -0,0 +1,130 @@
+"""
+Streaming vectorizer fit against the in-memory fit
+"""
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+
+from .. import feature_extraction
+from ..benchmarks.bench_features import generate_processed_documents
+from ..config import get_config
+from ..feature_extraction import TFIDF_PARAMS, FeatureExtractor
+
+SVD_COMPONENTS = 10
+
+
+@pytest.fixture
+def documents() -> List[Dict[str, Any]]:
+    return generate_processed_documents(200, 1500)
+
+
+def _texts(documents: List[Dict[str, Any]]) -> List[str]:
+    return [text for document in documents for text in document["sections"].values()]
+
+
+def _sorted_totals(texts: List[str]) -> np.ndarray:
+    """
+    Total counts of the terms within [min_df, max_df], most frequent first
+    """
+    counts = CountVectorizer(
+        ngram_range=TFIDF_PARAMS["ngram_range"], min_df=TFIDF_PARAMS["min_df"], max_df=TFIDF_PARAMS["max_df"]
+    ).fit_transform(texts)
+    return np.sort(np.asarray(counts.sum(axis=0)).ravel())[::-1]
+
+
+def _cutoff_without_tie(texts: List[str], near: int) -> int:
+    """
+    A max_features value near `near` whose last kept term is strictly more frequent than the next
+    """
+    totals = _sorted_totals(texts)
+    return next(k for k in range(near, len(totals)) if totals[k - 1] > totals[k])
+
+
+def _cutoff_in_tie(texts: List[str], near: int) -> int:
+    """
+    A max_features value near `near` in the middle of the largest group of equally frequent terms
+    """
+    totals = _sorted_totals(texts)
+    _, starts, sizes = np.unique(totals[near // 2:near * 2], return_index=True, return_counts=True)
+    largest = np.argmax(sizes)
+    assert sizes[largest] >= 10
+    return int(near // 2 + starts[largest] + sizes[largest] // 2)
+
+
+def _fit_both(documents, **streaming_options):
+    in_memory = FeatureExtractor(get_config())
+    in_memory.fit_vectorizers(documents)
+    streaming = FeatureExtractor(get_config())
+    stats = streaming.fit_vectorizers_streaming(documents, chunk_size=97, **streaming_options)
+    return in_memory, streaming, stats
+
+
+@pytest.fixture
+def small_fit(monkeypatch):
+    monkeypatch.setattr(feature_extraction, "SVD_COMPONENTS", SVD_COMPONENTS)
+
+    def set_max_features(value):
+        monkeypatch.setitem(TFIDF_PARAMS, "max_features", value)
+
+    return set_max_features
+
+
+def test_vocabulary_and_idf_match_without_ties(documents, small_fit):
+    small_fit(_cutoff_without_tie(_texts(documents), 200))
+    in_memory, streaming, stats = _fit_both(documents)
+
+    assert streaming.tfidf_vectorizer.vocabulary_ == in_memory.tfidf_vectorizer.vocabulary_
+    np.testing.assert_allclose(streaming.tfidf_vectorizer.idf_, in_memory.tfidf_vectorizer.idf_, rtol=1e-12)
+    assert stats["texts"] == len(_texts(documents))
+    assert stats["pruned_terms"] == 0
+
+
+def test_vocabulary_matches_with_ties_at_the_cutoff(documents, small_fit):
+    small_fit(_cutoff_in_tie(_texts(documents), 200))
+    in_memory, streaming, _ = _fit_both(documents)
+
+    assert streaming.tfidf_vectorizer.vocabulary_ == in_memory.tfidf_vectorizer.vocabulary_
+
+
+def test_svd_matches_exact_svd(documents, small_fit):
+    small_fit(_cutoff_without_tie(_texts(documents), 200))
+    _, streaming, _ = _fit_both(documents)
+
+    tfidf = streaming.tfidf_vectorizer.transform(_texts(documents)).toarray()
+    _, singular_values, components = np.linalg.svd(tfidf, full_matrices=False)
+    svd = streaming.svd_transformer
+    np.testing.assert_allclose(svd.singular_values_, singular_values[:SVD_COMPONENTS], rtol=1e-8)
+    np.testing.assert_allclose(np.abs(svd.components_), np.abs(components[:SVD_COMPONENTS]), atol=1e-6)
+    # Largest absolute loading of every component is positive
+    largest = svd.components_[np.arange(SVD_COMPONENTS), np.argmax(np.abs(svd.components_), axis=1)]
+    assert (largest > 0).all()
+
+
+def test_jsonl_input_and_bounded_term_counts(documents, small_fit, tmp_path):
+    small_fit(200)
+    path = tmp_path / "documents.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for document in documents:
+            f.write(json.dumps(document) + "\n")
+        f.write('{"torn')
+
+    from_collection = FeatureExtractor(get_config())
+    from_collection.fit_vectorizers_streaming(documents)
+    from_file = FeatureExtractor(get_config())
+    stats = from_file.fit_vectorizers_streaming(str(path))
+    assert stats["documents"] == len(documents)
+    assert from_file.tfidf_vectorizer.vocabulary_ == from_collection.tfidf_vectorizer.vocabulary_
+
+    bounded = FeatureExtractor(get_config())
+    stats = bounded.fit_vectorizers_streaming(str(path), max_tracked_terms=500)
+    assert stats["pruned_terms"] > 0
+    assert stats["tracked_terms"] <= 500
+    assert len(bounded.tfidf_vectorizer.vocabulary_) == 200
+
+
+def test_iterator_is_rejected(documents):
+    with pytest.raises(ValueError):
+        FeatureExtractor(get_config()).fit_vectorizers_streaming(iter(documents))
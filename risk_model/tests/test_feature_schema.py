@@ -0,0 +1,124 @@
+"""
+RiskFeatureSchema layout, versioning and the schema check when loading vectorizers
+"""
+import json
+import math
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from ..benchmarks.documents import HEADERS, generate_document
+from ..config import get_config
+from ..feature_extraction import FeatureExtractor
+from ..feature_schema import FEATURE_SECTIONS, RiskFeatureSchema
+
+CATEGORIES = ["financial", "environmental", "technical"]
+SECTIONS = ["budget_estimation", "environmental_impact"]
+
+
+def _document(risk_indicators=None, section_risk_indicators=None):
+    return {
+        "risk_indicators": risk_indicators or {},
+        "section_risk_indicators": section_risk_indicators or {},
+    }
+
+
+def test_fixed_width_whatever_the_sections():
+    schema = RiskFeatureSchema(CATEGORIES, SECTIONS)
+    documents = [
+        _document(),
+        _document({"financial": 0.5}),
+        _document({"technical": 0.1}, {"budget_estimation": {"financial": 0.9}}),
+        _document({}, {section: {category: 1.0 for category in CATEGORIES} for section in SECTIONS}),
+    ]
+
+    features = schema.transform(documents)
+    assert features.shape == (len(documents), schema.width)
+    assert schema.width == (1 + len(SECTIONS)) * len(CATEGORIES) == len(schema.column_names)
+    assert features.dtype == np.float32
+    assert features[2, schema.slot("technical")] == np.float32(0.1)
+    assert features[2, schema.slot("financial", "budget_estimation")] == np.float32(0.9)
+    assert schema.column_names[schema.slot("financial", "budget_estimation")] == "risk_budget_estimation_financial"
+    assert (features[3, len(CATEGORIES):] == 1.0).all()
+
+
+def test_unknown_sections_and_categories_are_ignored():
+    schema = RiskFeatureSchema(CATEGORIES, SECTIONS)
+    known = _document({"financial": 0.5}, {"environmental_impact": {"environmental": 0.7}})
+    noisy = _document(
+        {"financial": 0.5, "political": 0.9},
+        {
+            "environmental_impact": {"environmental": 0.7, "social": 0.3},
+            "appendix": {"financial": 1.0},
+        },
+    )
+
+    np.testing.assert_array_equal(schema.transform([noisy]), schema.transform([known]))
+
+
+def test_nan_fill_and_dict_round_trip():
+    schema = RiskFeatureSchema(CATEGORIES, SECTIONS, fill_value=float("nan"))
+    row = schema.transform([_document({"financial": 0.5})])[0]
+    assert row[schema.slot("financial")] == np.float32(0.5)
+    assert np.isnan(np.delete(row, schema.slot("financial"))).all()
+
+    # The description is plain JSON and recreates the same schema
+    data = json.loads(json.dumps(schema.to_dict()))
+    assert data["fill_value"] == "nan"
+    restored = RiskFeatureSchema.from_dict(data)
+    assert restored.categories == schema.categories
+    assert restored.sections == schema.sections
+    assert math.isnan(restored.fill_value)
+    assert restored.version == schema.version
+
+    with pytest.raises(ValueError):
+        RiskFeatureSchema.from_dict({**data, "format": data["format"] + 1})
+
+
+def test_version_is_stable():
+    # Pinned: the default layout must keep its id across processes and releases
+    assert RiskFeatureSchema.from_config(get_config()).version == "risk-v1-dd1faa0fa26e"
+    assert RiskFeatureSchema(CATEGORIES, SECTIONS).version == RiskFeatureSchema(CATEGORIES, SECTIONS).version
+
+    versions = {
+        RiskFeatureSchema(CATEGORIES, SECTIONS).version,
+        RiskFeatureSchema(CATEGORIES[::-1], SECTIONS).version,
+        RiskFeatureSchema(CATEGORIES, SECTIONS[::-1]).version,
+        RiskFeatureSchema(CATEGORIES, FEATURE_SECTIONS).version,
+        RiskFeatureSchema(CATEGORIES, SECTIONS, fill_value=float("nan")).version,
+    }
+    assert len(versions) == 5
+
+
+@pytest.fixture(scope="module")
+def saved_vectorizers(tmp_path_factory):
+    documents = []
+    for seed in range(20):
+        text = generate_document(1000, seed=seed)
+        bodies = [part.split("\n", 1)[1] for part in text.strip().split("\n\n")]
+        documents.append({"sections": dict(zip(HEADERS, bodies))})
+    extractor = FeatureExtractor(get_config())
+    extractor.fit_vectorizers(documents)
+    directory = str(tmp_path_factory.mktemp("vectorizers"))
+    extractor.save_vectorizers(directory)
+    return directory
+
+
+def test_load_vectorizers_checks_the_schema(saved_vectorizers):
+    FeatureExtractor(get_config()).load_vectorizers(saved_vectorizers)
+
+    config = get_config()
+    config["RISK_CATEGORIES"] = {**config["RISK_CATEGORIES"], "social": 0.1}
+    with pytest.raises(ValueError, match="schema mismatch"):
+        FeatureExtractor(config).load_vectorizers(saved_vectorizers)
+
+
+def test_load_vectorizers_without_a_schema_file(saved_vectorizers, tmp_path):
+    # Vectorizers saved before the schema was recorded still load
+    for name in ("tfidf_vectorizer.joblib", "svd_transformer.joblib"):
+        shutil.copy(os.path.join(saved_vectorizers, name), tmp_path / name)
+    extractor = FeatureExtractor(get_config())
+    extractor.load_vectorizers(str(tmp_path))
+    assert extractor.tfidf_vectorizer is not None
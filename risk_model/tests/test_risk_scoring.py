@@ -0,0 +1,56 @@
+"""
+RiskKeywordScorer against the original per-keyword list scans
+"""
+from typing import Dict, List
+
+import numpy as np
+import pytest
+
+from ..benchmarks.documents import generate_document
+from ..config import RISK_KEYWORDS
+from ..risk_scoring import RiskKeywordScorer
+
+
+def baseline_risk_indicators(tokens: List[str], risk_keywords: Dict[str, List[str]]) -> Dict[str, float]:
+    """
+    extract_risk_indicators before the scorer, on already tokenized text
+    """
+    token_count = len(tokens)
+    if token_count == 0:
+        return {category: 0.0 for category in risk_keywords}
+
+    risk_indicators = {}
+    for category, keywords in risk_keywords.items():
+        keyword_count = sum(tokens.count(keyword) for keyword in keywords)
+        normalized_score = keyword_count / (token_count * len(keywords))
+        risk_indicators[category] = 1 / (1 + np.exp(-10 * (normalized_score - 0.01)))
+    return risk_indicators
+
+
+def sample_token_lists() -> List[List[str]]:
+    token_lists = [[], ["budget"], ["nothing", "relevant", "here"]]
+    for seed in range(20):
+        for size in (200, 5000):
+            for rate in (0.0, 0.05, 0.3):
+                token_lists.append(generate_document(size, seed=seed, keyword_rate=rate).lower().split())
+    return token_lists
+
+
+@pytest.mark.parametrize("risk_keywords", [
+    RISK_KEYWORDS,
+    # Keywords listed twice, and in several categories, count every time
+    {"money": ["budget", "cost", "budget"], "time": ["delay", "cost"], "empty_hits": ["zzz"]},
+])
+def test_scores_match_the_original(risk_keywords):
+    scorer = RiskKeywordScorer(risk_keywords)
+    for tokens in sample_token_lists():
+        expected = baseline_risk_indicators(tokens, risk_keywords)
+        actual = scorer.score_tokens(tokens)
+        assert list(actual) == list(expected)
+        assert actual == expected
+
+
+def test_batch_matches_single_scores():
+    scorer = RiskKeywordScorer(RISK_KEYWORDS)
+    token_lists = sample_token_lists()
+    assert scorer.score_batch(token_lists) == [scorer.score_tokens(tokens) for tokens in token_lists]